@@ -4,17 +4,18 @@ Inicialización de la aplicación Flask
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
-from flask_jwt_extended import JWTManager
 from config.config import Config
+from app.utils.replica import RoutingSession
+from app.utils.batch import BatchJWTManager
 
 # Inicialización de extensiones
-db = SQLAlchemy()
-jwt = JWTManager()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+jwt = BatchJWTManager()
 
-def create_app():
+def create_app(config_class=Config):
     """Factory para crear la aplicación Flask"""
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(config_class)
     
     # Inicializar extensiones
     db.init_app(app)
@@ -23,7 +24,50 @@ def create_app():
     
     # Importar modelos dentro del contexto de la app para evitar importaciones circulares
     with app.app_context():
-        from app.models import Role, User, Client, Vehicle, WorkOrder
+        from app.models import Role, User, Client, Vehicle, WorkOrder, WorkOrderArchive, WorkOrderListing, Job, RevokedToken
+    
+    # Claims de rol en el JWT y verificación de la versión del token
+    from app.utils.auth import init_auth
+    init_auth(app)
+    
+    # Política de hash de contraseñas y pool de verificación
+    from app.utils.passwords import init_passwords
+    init_passwords(app)
+    
+    # Revocación de tokens por jti (logout)
+    from app.utils.revocation import init_revocation
+    init_revocation(app)
+    
+    # Modelo de lectura de órdenes (se mantiene en cada flush)
+    from app.utils import read_model  # noqa: F401
+    
+    # Eventos de órdenes de trabajo (SSE)
+    from app.utils.events import init_events
+    init_events(app)
+    
+    # Trabajos en segundo plano (exportaciones y reportes)
+    from app.utils.jobs import init_jobs
+    init_jobs(app)
+    
+    # Índice en memoria para /api/autocomplete
+    from app.utils.autocomplete import init_autocomplete
+    init_autocomplete(app)
+    
+    # Límite de intentos de login (antes de ocupar una plaza de admisión)
+    from app.utils.throttle import init_login_throttle
+    init_login_throttle(app)
+    
+    # Control de admisión (503 + Retry-After con el pool saturado)
+    from app.utils.admission import init_admission
+    init_admission(app)
+    
+    # Rutas GET en transacciones de solo lectura, sin autoflush
+    from app.utils.read_only import init_read_only
+    init_read_only(app)
+    
+    # Perfilado bajo demanda de una petición (solo Administrador)
+    from app.utils.profiling import init_profiling
+    init_profiling(app)
     
     # Registrar blueprints
     from app.routes import main_routes
@@ -0,0 +1,461 @@
+"""
+Modo ASGI opcional para las rutas de lectura de la API.
+
+Sirve los GET de clientes, vehículos, órdenes de trabajo y usuarios con
+SQLAlchemy asíncrono (asyncpg en PostgreSQL, aiosqlite en SQLite), usando
+los mismos modelos y el mismo contrato JSON que las rutas Flask. Cualquier
+otra ruta (login, escrituras, init-db...) se delega a la app Flask, igual
+que las peticiones con parámetros que solo implementa Flask
+(``FLASK_ONLY_ARGS``: IDs, conteos, paginación, archivo, fechas) y las que
+piden perfilado (``X-Profile: 1`` o ``?profile=1``).
+
+Con ``DATABASE_REPLICA_URL`` las lecturas usan un segundo engine asíncrono
+sobre la réplica, con las mismas reglas que ``RoutingSession`` (ventana tras
+escribir, ``X-DB-Target: primary`` y control de retraso).
+
+Requiere las dependencias de ``requirements-async.txt``.
+"""
+import functools
+import json
+from contextlib import asynccontextmanager
+import jwt as pyjwt
+from a2wsgi import WSGIMiddleware
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import joinedload
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, QueryParams
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse
+from starlette.routing import Mount, Route
+from app import create_app
+from app.models import Role, User, Client, Vehicle, WorkOrder, WorkOrderListing
+from app.utils.admission import DETAIL, LIST, OVERLOADED_ERROR, pool_saturated
+from app.utils.auth import token_version_failed_response, token_version_valid
+from app.utils.counts import TOTAL_HEADER
+from app.utils.profiling import HEADER as PROFILE_HEADER, QUERY_ARG as PROFILE_QUERY_ARG
+from app.utils.replica import REPLICA, REPLICA_BIND, choose_target
+from app.utils.revocation import get_revocations, revoked_token_response
+from app.utils.serializers import client_to_dict, user_to_dict, vehicle_to_dict, work_order_to_dict, work_order_listing_to_dict
+from config.config import Config
+
+
+def async_database_url(url):
+    """Convertir la URL síncrona de ``Config`` a su equivalente con driver asíncrono"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+
+    if backend == 'postgresql':
+        # asyncpg no entiende los parámetros de libpq/pgbouncer
+        query = dict(url.query)
+        sslmode = query.pop('sslmode', None)
+        query.pop('pgbouncer', None)
+        query.pop('channel_binding', None)
+        if sslmode:
+            query['ssl'] = sslmode
+        return url.set(drivername='postgresql+asyncpg', query=query)
+
+    if backend == 'sqlite':
+        return url.set(drivername='sqlite+aiosqlite')
+
+    return url
+
+
+def async_engine_options(config):
+    """``SQLALCHEMY_ENGINE_OPTIONS`` sin ``connect_args``, que son del driver síncrono (psycopg)"""
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    options.pop('connect_args', None)
+    return options
+
+
+# Parámetros de las rutas de lectura que las rutas ASGI no implementan
+FLASK_ONLY_ARGS = frozenset({'ids', 'count_only', 'estimate', 'limit', 'offset', 'include_archived', 'from', 'to'})
+
+
+def _flask_only(scope):
+    """La petición usa ``FLASK_ONLY_ARGS`` o pide perfilado (cProfile y SQL de la app Flask)"""
+    query = QueryParams(scope['query_string'])
+    if not FLASK_ONLY_ARGS.isdisjoint(query):
+        return True
+    return query.get(PROFILE_QUERY_ARG) == '1' or Headers(scope=scope).get(PROFILE_HEADER) == '1'
+
+
+class FlaskOnlyMiddleware:
+    """Delegar a Flask, antes del enrutamiento, las peticiones que solo atiende Flask"""
+
+    def __init__(self, app, flask_app):
+        self.app = app
+        self.flask_app = flask_app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and _flask_only(scope):
+            await self.flask_app(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+class FlaskJSONResponse(JSONResponse):
+    """Mismo formato que ``jsonify`` de Flask (claves ordenadas, compacto)"""
+
+    def render(self, content):
+        body = json.dumps(content, ensure_ascii=True, separators=(',', ':'), sort_keys=True)
+        return f'{body}\n'.encode('utf-8')
+
+
+def _overloaded(config):
+    """Mismo ``503`` con ``Retry-After`` que ``app.utils.admission``"""
+    return FlaskJSONResponse(
+        {'success': False, 'error': OVERLOADED_ERROR}, 503,
+        headers={'Retry-After': str(config['ADMISSION_RETRY_AFTER'])}
+    )
+
+
+# ========================================
+# AUTENTICACIÓN JWT
+# ========================================
+
+async def _jwt_error(request):
+    """Validar el token como lo hace ``@jwt_required()``; retorna la respuesta de error o None"""
+    config = request.app.state.config
+    header = request.headers.get('Authorization')
+
+    if not header:
+        return FlaskJSONResponse({'msg': 'Missing Authorization Header'}, 401)
+
+    parts = header.split()
+    if len(parts) != 2 or parts[0] != 'Bearer':
+        return FlaskJSONResponse({
+            'msg': "Bad Authorization header. Expected 'Authorization: Bearer <JWT>'"
+        }, 422)
+
+    try:
+        claims = pyjwt.decode(
+            parts[1],
+            config['JWT_SECRET_KEY'],
+            algorithms=[config['JWT_ALGORITHM']]
+        )
+    except pyjwt.ExpiredSignatureError:
+        return FlaskJSONResponse({'msg': 'Token has expired'}, 401)
+    except pyjwt.InvalidSignatureError:
+        return FlaskJSONResponse({'msg': 'Signature verification failed'}, 422)
+    except pyjwt.InvalidTokenError as e:
+        return FlaskJSONResponse({'msg': str(e)}, 422)
+
+    if claims.get('type') != 'access':
+        return FlaskJSONResponse({'msg': 'Only non-refresh tokens are allowed'}, 422)
+
+    # Puede consultar la base de datos (síncrona): fuera del event loop
+    error = await run_in_threadpool(_token_error, request.app.state.flask_app, claims)
+    if error is not None:
+        return error
+
+    request.state.jwt_identity = claims.get('sub')
+    return None
+
+
+def _token_error(flask_app, claims):
+    """Revocación del ``jti`` y versión ``ver``, como ``init_revocation`` e ``init_auth``"""
+    with flask_app.app_context():
+        if 'jti' in claims and get_revocations(flask_app).is_revoked(claims['jti']):
+            response, status = revoked_token_response()
+        elif not token_version_valid(claims):
+            response, status = token_version_failed_response()
+        else:
+            return None
+        return FlaskJSONResponse(response.get_json(), status)
+
+
+def jwt_required(handler):
+    """Equivalente asíncrono de ``@jwt_required()``; elige además primario o réplica"""
+    @functools.wraps(handler)
+    async def wrapper(request):
+        error = await _jwt_error(request)
+        if error is not None:
+            return error
+        request.state.sessionmaker = await _sessionmaker_for(request)
+        return await handler(request)
+    return wrapper
+
+
+# ========================================
+# RÉPLICA DE LECTURA
+# ========================================
+
+async def _sessionmaker_for(request):
+    """Sesiones del primario o de la réplica, como ``RoutingSession`` en Flask"""
+    state = request.app.state
+    if state.replica_sessionmaker is None:
+        return state.sessionmaker
+
+    # El control de retraso usa el engine síncrono de la réplica
+    target = await run_in_threadpool(
+        _db_target, state.flask_app, request.method, request.headers, request.state.jwt_identity
+    )
+    return state.replica_sessionmaker if target == REPLICA else state.sessionmaker
+
+
+def _db_target(flask_app, method, headers, identity):
+    with flask_app.app_context():
+        return choose_target(method, headers, identity)
+
+
+def _replica_url(config):
+    """URL del bind ``replica`` o None si no hay réplica configurada"""
+    bind = (config.get('SQLALCHEMY_BINDS') or {}).get(REPLICA_BIND)
+    if isinstance(bind, dict):
+        return bind.get('url')
+    return bind
+
+
+# ========================================
+# CONTROL DE ADMISIÓN
+# ========================================
+
+def admitted(route):
+    """Ocupar una plaza del ``AdmissionController`` de Flask; 503 si no la hay"""
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(request):
+            state = request.app.state
+            controller = state.admission
+            if controller is None:
+                return await handler(request)
+
+            config = state.config
+            # Con el pool agotado los listados se rechazan sin esperar
+            engine = request.state.sessionmaker.kw['bind'].sync_engine
+            if route == LIST and pool_saturated(engine, config.get('SQLALCHEMY_ENGINE_OPTIONS')):
+                controller.rejected[route] += 1
+                return _overloaded(config)
+
+            # ``acquire`` puede esperar: fuera del event loop
+            if not await run_in_threadpool(controller.acquire, route, config['ADMISSION_WAIT_SECONDS']):
+                return _overloaded(config)
+            try:
+                return await handler(request)
+            finally:
+                controller.release()
+        return wrapper
+    return decorator
+
+
+# ========================================
+# RUTAS DE LECTURA
+# ========================================
+
+async def _list_response(request, stmt, serialize):
+    try:
+        async with request.state.sessionmaker() as session:
+            rows = await session.scalars(stmt)
+            result = [serialize(row) for row in rows]
+
+        return FlaskJSONResponse({
+            'success': True,
+            'data': result,
+            'count': len(result)
+        }, 200, headers={TOTAL_HEADER: str(len(result))})
+
+    except PoolTimeout:
+        return _overloaded(request.app.state.config)
+    except Exception as e:
+        return FlaskJSONResponse({'success': False, 'error': str(e)}, 500)
+
+
+async def _detail_response(request, stmt, serialize, not_found):
+    try:
+        async with request.state.sessionmaker() as session:
+            row = (await session.scalars(stmt)).first()
+            data = serialize(row) if row else None
+
+        if data is None:
+            return FlaskJSONResponse({'success': False, 'error': not_found}, 404)
+
+        return FlaskJSONResponse({'success': True, 'data': data}, 200)
+
+    except PoolTimeout:
+        return _overloaded(request.app.state.config)
+    except Exception as e:
+        return FlaskJSONResponse({'success': False, 'error': str(e)}, 500)
+
+
+def _vehicles():
+    return select(Vehicle).options(joinedload(Vehicle.client)).where(Vehicle.deleted_at.is_(None))
+
+
+def _work_orders():
+    return select(WorkOrder).options(
+        joinedload(WorkOrder.vehicle), joinedload(WorkOrder.user)
+    ).where(WorkOrder.deleted_at.is_(None))
+
+
+def _work_order_listings():
+    return select(WorkOrderListing).where(WorkOrderListing.deleted_at.is_(None)).order_by(WorkOrderListing.ID)
+
+
+@jwt_required
+@admitted(LIST)
+async def get_clients(request):
+    stmt = select(Client).where(Client.deleted_at.is_(None))
+    return await _list_response(request, stmt, client_to_dict)
+
+
+@jwt_required
+@admitted(DETAIL)
+async def get_client(request):
+    stmt = select(Client).where(Client.ID == request.path_params['client_id'], Client.deleted_at.is_(None))
+    return await _detail_response(request, stmt, client_to_dict, 'Cliente no encontrado')
+
+
+@jwt_required
+@admitted(LIST)
+async def get_users(request):
+    stmt = select(User).where(User.deleted_at.is_(None))
+    return await _list_response(request, stmt, user_to_dict)
+
+
+@jwt_required
+@admitted(LIST)
+async def get_mechanics(request):
+    try:
+        async with request.state.sessionmaker() as session:
+            mechanic_role = (await session.scalars(select(Role).where(Role.Name == 'Mecánico'))).first()
+
+            if not mechanic_role:
+                return FlaskJSONResponse({
+                    'success': False,
+                    'error': 'Rol de Mecánico no encontrado'
+                }, 404)
+
+            rows = await session.scalars(
+                select(User).where(User.RoleID == mechanic_role.ID, User.deleted_at.is_(None))
+            )
+            result = [{**user_to_dict(user), 'RoleName': mechanic_role.Name} for user in rows]
+
+        return FlaskJSONResponse({
+            'success': True,
+            'data': result,
+            'count': len(result)
+        }, 200)
+
+    except PoolTimeout:
+        return _overloaded(request.app.state.config)
+    except Exception as e:
+        return FlaskJSONResponse({'success': False, 'error': str(e)}, 500)
+
+
+@jwt_required
+@admitted(DETAIL)
+async def get_user(request):
+    stmt = select(User).where(User.ID == request.path_params['user_id'], User.deleted_at.is_(None))
+    return await _detail_response(request, stmt, user_to_dict, 'Usuario no encontrado')
+
+
+@jwt_required
+@admitted(LIST)
+async def get_vehicles(request):
+    return await _list_response(request, _vehicles(), vehicle_to_dict)
+
+
+@jwt_required
+@admitted(DETAIL)
+async def get_vehicle(request):
+    stmt = _vehicles().where(Vehicle.ID == request.path_params['vehicle_id'])
+    return await _detail_response(request, stmt, vehicle_to_dict, 'Vehículo no encontrado')
+
+
+@jwt_required
+@admitted(LIST)
+async def get_vehicles_by_client(request):
+    stmt = _vehicles().where(Vehicle.ClientID == request.path_params['client_id'])
+    return await _list_response(request, stmt, vehicle_to_dict)
+
+
+@jwt_required
+@admitted(LIST)
+async def get_work_orders(request):
+    return await _list_response(request, _work_order_listings(), work_order_listing_to_dict)
+
+
+@jwt_required
+@admitted(DETAIL)
+async def get_work_order(request):
+    stmt = _work_orders().where(WorkOrder.ID == request.path_params['order_id'])
+    return await _detail_response(request, stmt, work_order_to_dict, 'Orden de trabajo no encontrada')
+
+
+@jwt_required
+@admitted(LIST)
+async def get_work_orders_by_vehicle(request):
+    stmt = _work_order_listings().where(WorkOrderListing.VehicleID == request.path_params['vehicle_id'])
+    return await _list_response(request, stmt, work_order_listing_to_dict)
+
+
+@jwt_required
+@admitted(LIST)
+async def get_work_orders_by_user(request):
+    stmt = _work_order_listings().where(WorkOrderListing.UserID == request.path_params['user_id'])
+    return await _list_response(request, stmt, work_order_listing_to_dict)
+
+
+READ_ROUTES = [
+    Route('/api/clients', get_clients, methods=['GET']),
+    Route('/api/clients/{client_id:int}', get_client, methods=['GET']),
+    Route('/api/users', get_users, methods=['GET']),
+    Route('/api/users/mechanics', get_mechanics, methods=['GET']),
+    Route('/api/users/{user_id:int}', get_user, methods=['GET']),
+    Route('/api/vehicles', get_vehicles, methods=['GET']),
+    Route('/api/vehicles/{vehicle_id:int}', get_vehicle, methods=['GET']),
+    Route('/api/vehicles/client/{client_id:int}', get_vehicles_by_client, methods=['GET']),
+    Route('/api/work-orders', get_work_orders, methods=['GET']),
+    Route('/api/work-orders/{order_id:int}', get_work_order, methods=['GET']),
+    Route('/api/work-orders/vehicle/{vehicle_id:int}', get_work_orders_by_vehicle, methods=['GET']),
+    Route('/api/work-orders/user/{user_id:int}', get_work_orders_by_user, methods=['GET']),
+]
+
+
+def create_asgi_app(config_class=Config):
+    """Factory para crear la aplicación ASGI"""
+    flask_app = create_app(config_class)
+    config = flask_app.config
+
+    engine_options = async_engine_options(config)
+    engine = create_async_engine(async_database_url(config['SQLALCHEMY_DATABASE_URI']), **engine_options)
+
+    replica_url = _replica_url(config)
+    replica_engine = None
+    if replica_url:
+        replica_engine = create_async_engine(async_database_url(replica_url), **engine_options)
+
+    # Todo lo demás (login, escrituras, POST sobre las mismas rutas) lo atiende Flask
+    flask_wsgi = WSGIMiddleware(flask_app)
+    routes = READ_ROUTES + [Mount('/', app=flask_wsgi)]
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        await engine.dispose()
+        if replica_engine is not None:
+            await replica_engine.dispose()
+
+    asgi_app = Starlette(
+        routes=routes,
+        middleware=[
+            Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*']),
+            Middleware(FlaskOnlyMiddleware, flask_app=flask_wsgi)
+        ],
+        lifespan=lifespan
+    )
+    asgi_app.state.config = config
+    asgi_app.state.engine = engine
+    asgi_app.state.sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+    asgi_app.state.replica_engine = replica_engine
+    asgi_app.state.replica_sessionmaker = (
+        async_sessionmaker(replica_engine, expire_on_commit=False) if replica_engine is not None else None
+    )
+    asgi_app.state.flask_app = flask_app
+    asgi_app.state.admission = flask_app.extensions.get('admission')
+    return asgi_app
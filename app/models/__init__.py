@@ -20,5 +20,9 @@ from .user import User
 from .client import Client
 from .vehicle import Vehicle
 from .work_order import WorkOrder
+from .work_order_archive import WorkOrderArchive
+from .work_order_listing import WorkOrderListing
+from .job import Job
+from .revoked_token import RevokedToken
 
-__all__ = ['Role', 'User', 'Client', 'Vehicle', 'WorkOrder', 'BaseModel']
\ No newline at end of file
+__all__ = ['Role', 'User', 'Client', 'Vehicle', 'WorkOrder', 'WorkOrderArchive', 'WorkOrderListing', 'Job', 'RevokedToken', 'BaseModel']
\ No newline at end of file
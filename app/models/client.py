@@ -4,6 +4,14 @@ Modelo Client - Clientes del lubricentro
 from app import db
 from datetime import datetime
 from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.orm import validates
+from app.utils.normalize import normalize_run
+
+
+def _run_default(context):
+    """RUT canónico también en inserts masivos (Core/executemany)"""
+    return normalize_run(context.get_current_parameters().get('RUN'))
+
 
 class Client(db.Model):
     __tablename__ = 'clients'
@@ -13,6 +21,8 @@ class Client(db.Model):
     
     # Campo único
     RUN = Column(String(20), unique=True, nullable=False)
+    # RUT canónico (sin puntos ni ceros a la izquierda, '12345678-K') para búsquedas y duplicados
+    RunNormalized = Column(String(12), unique=True, index=True, nullable=True, default=_run_default)
     
     # Información personal
     FirstName = Column(String(50), nullable=False)
@@ -22,11 +32,16 @@ class Client(db.Model):
     
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)
     deleted_at = Column(DateTime, nullable=True)
     
     # Relaciones
     vehicles = db.relationship('Vehicle', back_populates='client')
     
+    @validates('RUN')
+    def _normalize_run(self, key, value):
+        self.RunNormalized = normalize_run(value)
+        return value
+    
     def __repr__(self):
         return f'<Client {self.FirstName} {self.LastName}>'
\ No newline at end of file
@@ -0,0 +1,40 @@
+"""
+Modelo Job - Trabajos en segundo plano (exportaciones y reportes)
+
+El estado y el resultado se guardan en la base de datos para que cualquier
+worker pueda responder la consulta de estado y la descarga, aunque el
+trabajo se haya ejecutado en otro proceso.
+"""
+from app import db
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Text, LargeBinary
+from sqlalchemy.orm import deferred
+
+class Job(db.Model):
+    __tablename__ = 'jobs'
+    
+    # Primary Key
+    ID = Column(Integer, primary_key=True)
+    
+    # Tipo de trabajo y parámetros (JSON)
+    Type = Column(String(50), nullable=False)
+    Params = Column(Text, nullable=True)
+    Status = Column(String(20), nullable=False, default='queued', index=True)
+    
+    # Usuario que lo solicitó (solo él puede consultarlo)
+    UserID = Column(Integer, nullable=False, index=True)
+    
+    # Resultado (puede pesar varios MB: solo se carga al descargarlo)
+    Result = deferred(Column(LargeBinary, nullable=True))
+    ResultMimetype = Column(String(100), nullable=True)
+    ResultFilename = Column(String(255), nullable=True)
+    Error = Column(Text, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=True, index=True)  # El resultado se elimina después
+    
+    def __repr__(self):
+        return f'<Job {self.ID} {self.Type} - {self.Status}>'
@@ -0,0 +1,28 @@
+"""
+Modelo RevokedToken - Tokens JWT revocados (logout) por su ``jti``
+
+Las filas se pueden eliminar una vez que el token habría expirado de todas
+formas (``ExpiresAt``).
+"""
+from app import db
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime
+
+class RevokedToken(db.Model):
+    __tablename__ = 'revoked_tokens'
+    
+    # Primary Key
+    ID = Column(Integer, primary_key=True)
+    
+    # Identificador único del token (claim jti)
+    Jti = Column(String(64), unique=True, index=True, nullable=False)
+    UserID = Column(Integer, nullable=True)
+    
+    # Expiración original del token
+    ExpiresAt = Column(DateTime, nullable=False, index=True)
+    
+    # Timestamps (los procesos leen las revocaciones nuevas por created_at)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    
+    def __repr__(self):
+        return f'<RevokedToken {self.Jti}>'
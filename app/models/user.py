@@ -4,6 +4,14 @@ Modelo User - Usuarios del sistema (mecánicos, administradores, etc.)
 from app import db
 from datetime import datetime
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.orm import validates
+from app.utils.normalize import normalize_run
+
+
+def _run_default(context):
+    """RUT canónico también en inserts masivos (Core/executemany)"""
+    return normalize_run(context.get_current_parameters().get('RUN'))
+
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -13,6 +21,8 @@ class User(db.Model):
     
     # Campos únicos
     RUN = Column(String(20), unique=True, nullable=False)
+    # RUT canónico (sin puntos ni ceros a la izquierda, '12345678-K') para búsquedas y duplicados
+    RunNormalized = Column(String(12), unique=True, index=True, nullable=True, default=_run_default)
     Email = Column(String(100), unique=True, nullable=False)
     
     # Información personal
@@ -23,15 +33,29 @@ class User(db.Model):
     
     # Foreign Key
     RoleID = Column(Integer, ForeignKey('roles.ID'), nullable=False)
+    
+    # Versión de los tokens emitidos; al cambiar el rol aumenta y los tokens anteriores se rechazan
+    TokenVersion = Column(Integer, nullable=False, default=0, server_default='0')
 
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)
     deleted_at = Column(DateTime, nullable=True)
     
     # Relaciones
     role = db.relationship('Role', back_populates='users')
     work_orders = db.relationship('WorkOrder', back_populates='user')
     
+    @validates('RoleID')
+    def _bump_token_version(self, key, value):
+        if self.RoleID is not None and value is not None and int(value) != self.RoleID:
+            self.TokenVersion = (self.TokenVersion or 0) + 1
+        return value
+    
+    @validates('RUN')
+    def _normalize_run(self, key, value):
+        self.RunNormalized = normalize_run(value)
+        return value
+    
     def __repr__(self):
         return f'<User {self.FirstName} {self.LastName}>'
\ No newline at end of file
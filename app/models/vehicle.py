@@ -4,6 +4,14 @@ Modelo Vehicle - Vehículos de los clientes
 from app import db
 from datetime import datetime
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.orm import validates
+from app.utils.normalize import normalize_plate
+
+
+def _plate_default(context):
+    """Patente canónica también en inserts masivos (Core/executemany)"""
+    return normalize_plate(context.get_current_parameters().get('LicensePlate'))
+
 
 class Vehicle(db.Model):
     __tablename__ = 'vehicles'
@@ -13,6 +21,8 @@ class Vehicle(db.Model):
     
     # Campo único
     LicensePlate = Column(String(10), unique=True, nullable=False)
+    # Patente canónica (mayúsculas, sin guiones ni espacios) para búsquedas y duplicados
+    PlateNormalized = Column(String(10), unique=True, index=True, nullable=True, default=_plate_default)
     
     # Información del vehículo
     Color = Column(String(30), nullable=True)
@@ -25,12 +35,17 @@ class Vehicle(db.Model):
     
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)
     deleted_at = Column(DateTime, nullable=True)
     
     # Relaciones
     client = db.relationship('Client', back_populates='vehicles')
     work_orders = db.relationship('WorkOrder', back_populates='vehicle')
     
+    @validates('LicensePlate')
+    def _normalize_plate(self, key, value):
+        self.PlateNormalized = normalize_plate(value)
+        return value
+    
     def __repr__(self):
         return f'<Vehicle {self.LicensePlate} - {self.Brand} {self.Model}>'
\ No newline at end of file
@@ -7,12 +7,15 @@ from sqlalchemy import Column, Integer, String, DateTime, Text, Date, ForeignKey
 
 class WorkOrder(db.Model):
     __tablename__ = 'work_orders'
+    # SQLite sin AUTOINCREMENT reutiliza el ID más alto tras archivarlo, y el
+    # archivo (work_orders_archive) conserva el ID original como clave
+    __table_args__ = {'sqlite_autoincrement': True}
     
     # Primary Key
     ID = Column(Integer, primary_key=True)
     
     # Información de la orden
-    OrderDate = Column(Date, nullable=False)
+    OrderDate = Column(Date, nullable=False, index=True)  # Clave de partición en PostgreSQL
     Status = Column(String(50), nullable=False, default='Pendiente')
     Description = Column(Text, nullable=True)  # Descripción de los servicios
     
@@ -22,7 +25,7 @@ class WorkOrder(db.Model):
 
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)
     deleted_at = Column(DateTime, nullable=True)
     
     # Relaciones
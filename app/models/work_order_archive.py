@@ -0,0 +1,46 @@
+"""
+Modelo WorkOrderArchive - Órdenes de trabajo archivadas
+
+Órdenes eliminadas (soft delete) o cerradas que superaron el período de
+retención. Se mueven aquí desde ``work_orders`` para mantener la tabla
+principal pequeña; se consultan solo con ``include_archived``.
+"""
+from app import db
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Text, Date
+
+class WorkOrderArchive(db.Model):
+    __tablename__ = 'work_orders_archive'
+    
+    # Primary Key (mismo ID que tenía en work_orders)
+    ID = Column(Integer, primary_key=True, autoincrement=False)
+    
+    # Información de la orden
+    OrderDate = Column(Date, nullable=False, index=True)
+    Status = Column(String(50), nullable=False)
+    Description = Column(Text, nullable=True)
+    
+    # Sin Foreign Keys: el historial no bloquea cambios en vehículos/usuarios
+    VehicleID = Column(Integer, nullable=False, index=True)
+    UserID = Column(Integer, nullable=False, index=True)
+
+    # Timestamps
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    deleted_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)  # Feed de cambios
+    
+    # Relaciones (solo lectura)
+    vehicle = db.relationship(
+        'Vehicle',
+        primaryjoin='foreign(WorkOrderArchive.VehicleID) == Vehicle.ID',
+        viewonly=True
+    )
+    user = db.relationship(
+        'User',
+        primaryjoin='foreign(WorkOrderArchive.UserID) == User.ID',
+        viewonly=True
+    )
+    
+    def __repr__(self):
+        return f'<WorkOrderArchive {self.ID} - {self.Status}>'
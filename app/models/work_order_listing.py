@@ -0,0 +1,44 @@
+"""
+Modelo WorkOrderListing - Modelo de lectura de órdenes de trabajo
+
+Copia desnormalizada de ``work_orders`` con la patente, el cliente y el
+técnico ya resueltos, para que los listados lean una sola tabla sin joins.
+La mantiene ``app/utils/read_model.py`` en la misma transacción de cada
+escritura; ``migrations/rebuild_work_order_listings.py`` la verifica y la
+reconstruye.
+"""
+from app import db
+from sqlalchemy import Column, Integer, String, DateTime, Text, Date, Index
+
+class WorkOrderListing(db.Model):
+    __tablename__ = 'work_order_listings'
+    
+    # Primary Key (mismo ID que en work_orders)
+    ID = Column(Integer, primary_key=True, autoincrement=False)
+    
+    # Información de la orden
+    OrderDate = Column(Date, nullable=False, index=True)
+    Status = Column(String(50), nullable=False)
+    Description = Column(Text, nullable=True)
+    
+    # Datos desnormalizados de vehículo, cliente y técnico (sin Foreign Keys)
+    VehicleID = Column(Integer, nullable=False)
+    LicensePlate = Column(String(10), nullable=True)
+    ClientID = Column(Integer, nullable=True, index=True)
+    ClientName = Column(String(101), nullable=True)
+    UserID = Column(Integer, nullable=False)
+    TechnicianName = Column(String(101), nullable=True)
+
+    # Timestamps (los de la orden)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    deleted_at = Column(DateTime, nullable=True)
+    
+    # Índices de los listados por vehículo y por técnico (con filtro de fechas)
+    __table_args__ = (
+        Index('ix_work_order_listings_vehicle_date', 'VehicleID', 'OrderDate'),
+        Index('ix_work_order_listings_user_date', 'UserID', 'OrderDate'),
+    )
+    
+    def __repr__(self):
+        return f'<WorkOrderListing {self.ID} - {self.Status}>'
@@ -1,19 +1,48 @@
 """
 Rutas principales de la API
 """
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+import time
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
 from app import db
 from app.models.client import Client
 from app.models.user import User
 from app.models.role import Role
 from app.models.vehicle import Vehicle
 from app.models.work_order import WorkOrder
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.models.work_order_archive import WorkOrderArchive
+from app.models.work_order_listing import WorkOrderListing
+from sqlalchemy import select
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.orm import joinedload
+from app.utils.auth import create_user_token, role_required
+from app.utils.autocomplete import TYPES as AUTOCOMPLETE_TYPES, get_autocomplete
+from app.utils.batch import InvalidSubRequest, run_batch, validate_subrequests
+from app.utils.change_feed import InvalidChangeToken, collect_changes
+from app.utils.counts import (
+    count_only_requested, count_response, exact_count, invalid_page_response, list_response, page_args, paginate
+)
+from app.utils.events import format_sse, get_broker
+from app.utils.normalize import is_valid_run, normalize_plate, normalize_run
+from app.utils.passwords import PasswordPoolBusy, get_password_pool, hash_password
+from app.utils.profiling import FORMATS as PROFILE_FORMATS, get_profiles
+from app.utils.lookups import job_for_user, lookup
+from app.utils.jobs import InvalidJob, JobQueueFull, JOB_TYPES, SUCCEEDED, FAILED, get_runner, job_to_dict
+from app.utils.read_only import fetch_dicts, read_write
+from app.utils.replica import use_primary
+from app.utils.revocation import revoke_token
+from app.utils.rows import CLIENT_ROWS, USER_ROWS, VEHICLE_ROWS, WORK_ORDER_LISTING_ROWS
+from app.utils.throttle import reset_login_attempts
+from app.utils.partitions import add_months
+from app.utils.reports import MONTHLY_SECTIONS, iter_report, parse_month
+from app.utils.spreadsheet import FORMATS
+from app.utils.serializers import client_to_dict, user_to_dict, vehicle_to_dict, work_order_to_dict, work_order_listing_to_dict
 from datetime import datetime
 
 bp = Blueprint('main', __name__)
 
+# Las rutas dejan pasar PoolTimeout: admission.py responde 503 con Retry-After
+
 
 # ========================================
 # RUTA PRINCIPAL
@@ -34,11 +63,23 @@ def home():
             'register': '/api/auth/register (POST) - Registro público',
             'login': '/api/auth/login (POST)',
             'me': '/api/auth/me (GET) - Requiere token',
+            'logout': '/api/auth/logout (POST) - Revoca el token actual - Requiere token',
+            'revoke_user_tokens': '/api/users/<id>/revoke-tokens (POST) - Solo Administrador',
+            'password_hashing': '/api/metrics/password-hashing (GET) - Solo Administrador',
+            'profiles': '/api/profiles/<id>?format=json|text|pstats|collapsed (GET) - Perfil de una petición con X-Profile: 1 - Solo Administrador',
             'roles': '/api/roles (GET) - Requiere token',
             'users': '/api/users (GET/POST) - Requiere token',
             'clients': '/api/clients (GET/POST) - Requiere token',
+            'client_by_run': '/api/clients/run/<rut> (GET) - Requiere token',
             'vehicles': '/api/vehicles (GET/POST) - Requiere token',
-            'work_orders': '/api/work-orders (GET/POST) - Requiere token'
+            'vehicle_by_plate': '/api/vehicles/plate/<patente> (GET) - Requiere token',
+            'work_orders': '/api/work-orders (GET/POST) - Requiere token',
+            'autocomplete': '/api/autocomplete?q=<texto>&type=plate|client|run (GET) - Requiere token',
+            'changes': '/api/changes?since=<token> (GET) - Requiere token',
+            'work_order_events': '/api/work-orders/events (GET, text/event-stream) - Requiere token',
+            'batch': '/api/batch (POST) - Varias peticiones en una - Requiere token',
+            'jobs': '/api/jobs (POST) - Exportaciones y reportes en segundo plano - Requiere token',
+            'reports': '/api/reports/work-orders/<by-status|by-mechanic|by-brand>?from=YYYY-MM&to=YYYY-MM&format=csv|xlsx - Requiere token'
         },
         'info': {
             'first_time_setup': 'Llama a /api/init-data para crear roles y usuario de prueba',
@@ -51,6 +92,8 @@ def home():
 
 
 @bp.route('/api/init-db', methods=['GET', 'POST'])
+@read_write
+@use_primary
 def init_database():
     """Endpoint para inicializar la base de datos (llamar una vez después del deploy)"""
     try:
@@ -59,6 +102,8 @@ def init_database():
             "message": "Base de datos inicializada correctamente", 
             "success": True
         }), 200
+    except PoolTimeout:
+        raise
     except Exception as e:
         return jsonify({
             "message": f"Error al inicializar: {str(e)}", 
@@ -67,6 +112,8 @@ def init_database():
 
 
 @bp.route('/api/init-data', methods=['GET', 'POST'])
+@read_write
+@use_primary
 def init_data():
     """
     Endpoint para inicializar datos de prueba (roles y usuario admin)
@@ -101,7 +148,7 @@ def init_data():
                 Email='admin@lubricentro.com',
                 FirstName='Administrador',
                 LastName='Sistema',
-                Password=generate_password_hash('password123'),
+                Password=hash_password('password123'),
                 Phone='+56912345678',
                 RoleID=admin_role.ID if admin_role else 1
             )
@@ -122,6 +169,8 @@ def init_data():
             } if user_created else "Usuario ya existe"
         }), 200
         
+    except PoolTimeout:
+        raise
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -131,6 +180,8 @@ def init_data():
 
 
 @bp.route('/api/reset-db', methods=['GET'])
+@read_write
+@use_primary
 def reset_database():
     """
     Endpoint para resetear completamente la base de datos
@@ -160,7 +211,7 @@ def reset_database():
             Email='test@lubricentro.com',
             FirstName='Usuario',
             LastName='Prueba',
-            Password=generate_password_hash('password123'),
+            Password=hash_password('password123'),
             Phone='+56912345678',
             RoleID=mechanic_role.ID
         )
@@ -183,6 +234,8 @@ def reset_database():
             }
         }), 200
         
+    except PoolTimeout:
+        raise
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -195,6 +248,17 @@ def reset_database():
 # RUTAS DE AUTENTICACIÓN
 # ========================================
 
+def _password_pool_busy(error):
+    """503 con Retry-After cuando el pool de hashes de contraseñas está lleno"""
+    response = jsonify({
+        'success': False,
+        'error': str(error)
+    })
+    response.status_code = 503
+    response.headers['Retry-After'] = str(current_app.config['PASSWORD_RETRY_AFTER'])
+    return response
+
+
 @bp.route('/api/auth/register', methods=['POST'])
 def register():
     """
@@ -222,8 +286,14 @@ def register():
                     'error': f'El campo {field} es obligatorio'
                 }), 400
         
-        # Verificar si el RUT ya existe
-        existing_user_run = User.query.filter_by(RUN=data['rut']).first()
+        if not is_valid_run(data['rut']):
+            return jsonify({
+                'success': False,
+                'error': 'RUT inválido'
+            }), 400
+        
+        # Verificar si el RUT ya existe (con o sin puntos, guion o ceros a la izquierda)
+        existing_user_run = User.query.filter_by(RunNormalized=normalize_run(data['rut'])).first()
         if existing_user_run:
             return jsonify({
                 'success': False,
@@ -250,7 +320,7 @@ def register():
             Email=data['email'],
             FirstName=data['firstName'],
             LastName=data['lastName'],
-            Password=generate_password_hash(data['password']),
+            Password=hash_password(data['password']),
             Phone=data.get('phone'),
             RoleID=role_id
         )
@@ -259,7 +329,7 @@ def register():
         db.session.commit()
         
         # Crear token para el nuevo usuario
-        access_token = create_access_token(identity=str(new_user.ID))
+        access_token = create_user_token(new_user)
         
         # Obtener información del rol
         role = Role.query.get(role_id)
@@ -281,6 +351,11 @@ def register():
             }
         }), 201
         
+    except PasswordPoolBusy as e:
+        db.session.rollback()
+        return _password_pool_busy(e)
+    except PoolTimeout:
+        raise
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -329,8 +404,10 @@ def login():
                 'error': 'La contraseña es obligatoria'
             }), 400
         
-        # Buscar el usuario por RUT (solo usuarios no eliminados)
-        user = User.query.filter_by(RUN=rut, deleted_at=None).first()
+        # Buscar el usuario por RUT canónico (solo usuarios no eliminados); el
+        # dígito verificador no se valida para no bloquear cuentas antiguas.
+        # Los RUN sin normalizar (migrations/normalize_runs.py) se buscan tal cual
+        user = lookup('user_by_run', normalize_run(rut)) or lookup('user_by_legacy_run', str(rut).strip())
         
         if not user:
             return jsonify({
@@ -338,15 +415,28 @@ def login():
                 'error': 'Credenciales inválidas'
             }), 401
         
-        # Verificar la contraseña
-        if not check_password_hash(user.Password, password):
+        # Verificar la contraseña en el pool de hashes (fuera del hilo de la petición)
+        try:
+            valid, new_hash = get_password_pool().verify_and_update(user.Password, password)
+        except PasswordPoolBusy as e:
+            return _password_pool_busy(e)
+        
+        if not valid:
             return jsonify({
                 'success': False,
                 'error': 'Credenciales inválidas'
             }), 401
         
-        # Crear el token JWT con el ID del usuario (convertido a string)
-        access_token = create_access_token(identity=str(user.ID))
+        # El hash usa otros parámetros que PASSWORD_HASH_METHOD: guardar el recalculado
+        if new_hash:
+            user.Password = new_hash
+            db.session.commit()
+        
+        # Los intentos fallidos previos de este RUT ya no cuentan
+        reset_login_attempts(rut)
+        
+        # Crear el token JWT con el ID del usuario y los claims de rol y nombre
+        access_token = create_user_token(user)
         
         # Obtener información del rol
         role_name = user.role.Name if user.role else None
@@ -366,7 +456,38 @@ def login():
             }
         }), 200
         
+    except PoolTimeout:
+        raise
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@bp.route('/api/auth/logout', methods=['POST'])
+@jwt_required()
+def logout():
+    """
+    Cerrar sesión revocando el token actual - RUTA PROTEGIDA
+    POST /api/auth/logout
+    Headers: Authorization: Bearer <token>
+    El token deja de ser aceptado en todos los workers (a más tardar tras
+    REVOCATION_REFRESH_SECONDS en los demás procesos).
+    """
+    try:
+        revoke_token(get_jwt())
+        
+        return jsonify({
+            'success': True,
+            'message': 'Sesión cerrada'
+        }), 200
+        
+    except PoolTimeout:
+        raise
     except Exception as e:
+        db.session.rollback()
         return jsonify({
             'success': False,
             'error': str(e)
@@ -375,6 +496,7 @@ def login():
 
 @bp.route('/api/auth/me', methods=['GET'])
 @jwt_required()
+@use_primary
 def get_current_user():
     """
     Obtener información del usuario autenticado (ruta protegida - ejemplo)
@@ -385,10 +507,10 @@ def get_current_user():
         # Obtener el ID del usuario desde el token JWT (convertir a int)
         current_user_id = int(get_jwt_identity())
         
-        # Buscar el usuario en la base de datos
-        user = User.query.get(current_user_id)
+        # Buscar el usuario en la base de datos (con su rol en la misma consulta)
+        user = lookup('user_with_role_by_id', current_user_id)
         
-        if not user or user.deleted_at is not None:
+        if not user:
             return jsonify({
                 'success': False,
                 'error': 'Usuario no encontrado'
@@ -411,6 +533,8 @@ def get_current_user():
             }
         }), 200
         
+    except PoolTimeout:
+        raise
     except Exception as e:
         return jsonify({
             'success': False,
@@ -431,14 +555,8 @@ def get_roles():
     Headers: Authorization: Bearer <token>
     """
     try:
-        roles = Role.query.all()
-        
-        result = []
-        for role in roles:
-            result.append({
-                'ID': role.ID,
-                'Name': role.Name
-            })
+        # Filas de Core: sin instancias del ORM que la petición no modifica
+        result = fetch_dicts(select(Role.ID, Role.Name).order_by(Role.ID))
         
         return jsonify({
             'success': True,
@@ -446,6 +564,8 @@ def get_roles():
             'count': len(result)
         }), 200
         
+    except PoolTimeout:
+        raise
     except Exception as e:
         return jsonify({
             'success': False,
@@ -453,6 +573,60 @@ def get_roles():
         }), 500
 
 
+# ========================================
+# CONSULTA POR LISTA DE IDS
+# ========================================
+
+MAX_IDS_PER_REQUEST = 1000
+
+
+def _requested_ids():
+    """
+    IDs pedidos en ``?ids=1,2,3`` (GET) o en el body ``{"ids": [1, 2, 3]}`` (POST),
+    sin duplicados y en el orden pedido. None si no se pidieron IDs.
+    Lanza ValueError/TypeError si la lista no es válida.
+    """
+    if request.method == 'POST':
+        raw = (request.get_json(silent=True) or {}).get('ids')
+        # Solo enteros JSON: ``true``, ``2.5`` o ``"7"`` no son IDs
+        valid = lambda value: isinstance(value, int) and not isinstance(value, bool)
+    else:
+        raw = request.args.get('ids')
+        if raw is not None:
+            raw = [part.strip() for part in raw.split(',') if part.strip()]
+        valid = lambda value: value.isascii() and value.isdigit()
+    
+    if raw is None:
+        return None
+    if not isinstance(raw, list) or len(raw) > MAX_IDS_PER_REQUEST:
+        raise ValueError('Lista de IDs inválida')
+    if not all(valid(value) for value in raw):
+        raise ValueError('Lista de IDs inválida')
+    return list(dict.fromkeys(int(value) for value in raw))
+
+
+def _multi_get_response(query, model, serialize):
+    """Resolver todos los IDs pedidos con una sola consulta ``IN``"""
+    try:
+        ids = _requested_ids() or []
+    except (ValueError, TypeError):
+        return jsonify({
+            'success': False,
+            'error': f'Lista de IDs inválida (máximo {MAX_IDS_PER_REQUEST} números enteros)'
+        }), 400
+    
+    rows = query.filter(model.ID.in_(ids), model.deleted_at.is_(None)).all() if ids else []
+    by_id = {row.ID: row for row in rows}
+    result = [serialize(by_id[row_id]) for row_id in ids if row_id in by_id]
+    
+    return jsonify({
+        'success': True,
+        'data': result,
+        'missing': [row_id for row_id in ids if row_id not in by_id],
+        'count': len(result)
+    }), 200
+
+
 # ========================================
 # RUTAS DE CLIENTES
 # ========================================
@@ -462,31 +636,51 @@ def get_roles():
 def get_clients():
     """
     Listar todos los clientes (excluyendo eliminados) - RUTA PROTEGIDA
-    GET /api/clients
+    GET /api/clients[?ids=1,2,3 | ?limit=50&offset=0 | ?count_only=true[&estimate=true]]
     Headers: Authorization: Bearer <token>
     """
     try:
-        clients = Client.query.filter(Client.deleted_at.is_(None)).all()
-        
-        result = []
-        for client in clients:
-            result.append({
-                'ID': client.ID,
-                'RUN': client.RUN,
-                'FirstName': client.FirstName,
-                'LastName': client.LastName,
-                'Phone': client.Phone,
-                'Email': client.Email,
-                'created_at': client.created_at.isoformat() if client.created_at else None,
-                'updated_at': client.updated_at.isoformat() if client.updated_at else None
-            })
+        if 'ids' in request.args:
+            return _multi_get_response(Client.query, Client, client_to_dict)
+        
+        criteria = [Client.deleted_at.is_(None)]
+        if count_only_requested():
+            return count_response(Client, criteria)
+        
+        try:
+            page = page_args()
+        except ValueError:
+            return invalid_page_response()
+        
+        clients, total = paginate(CLIENT_ROWS, criteria, page)
+        
+        result = [client_to_dict(client) for client in clients]
+        
+        return list_response(result, total)
         
+    except PoolTimeout:
+        raise
+    except Exception as e:
         return jsonify({
-            'success': True,
-            'data': result,
-            'count': len(result)
-        }), 200
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@bp.route('/api/clients/by-ids', methods=['POST'])
+@jwt_required()
+def get_clients_by_ids():
+    """
+    Obtener varios clientes por lista de IDs (para listas largas) - RUTA PROTEGIDA
+    POST /api/clients/by-ids
+    Headers: Authorization: Bearer <token>
+    Body: {"ids": [1, 2, 3]}
+    """
+    try:
+        return _multi_get_response(Client.query, Client, client_to_dict)
         
+    except PoolTimeout:
+        raise
     except Exception as e:
         return jsonify({
             'success': False,
@@ -531,8 +725,14 @@ def create_client():
                 'error': 'El apellido es obligatorio'
             }), 400
         
-        # Verificar si el RUN ya existe
-        existing_client = Client.query.filter_by(RUN=data['RUN']).first()
+        if not is_valid_run(data['RUN']):
+            return jsonify({
+                'success': False,
+                'error': 'RUN inválido'
+            }), 400
+        
+        # Verificar si el RUN ya existe (con o sin puntos, guion o ceros a la izquierda)
+        existing_client = Client.query.filter_by(RunNormalized=normalize_run(data['RUN'])).first()
         if existing_client:
             return jsonify({
                 'success': False,
@@ -565,6 +765,8 @@ def create_client():
             }
         }), 201
         
+    except PoolTimeout:
+        raise
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -582,7 +784,7 @@ def get_client(client_id):
     Headers: Authorization: Bearer <token>
     """
     try:
-        client = Client.query.filter_by(ID=client_id, deleted_at=None).first()
+        client = lookup('client_by_id', client_id)
         
         if not client:
             return jsonify({
@@ -592,18 +794,43 @@ def get_client(client_id):
         
         return jsonify({
             'success': True,
-            'data': {
-                'ID': client.ID,
-                'RUN': client.RUN,
-                'FirstName': client.FirstName,
-                'LastName': client.LastName,
-                'Phone': client.Phone,
-                'Email': client.Email,
-                'created_at': client.created_at.isoformat() if client.created_at else None,
-                'updated_at': client.updated_at.isoformat() if client.updated_at else None
-            }
+            'data': client_to_dict(client)
         }), 200
         
+    except PoolTimeout:
+        raise
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@bp.route('/api/clients/run/<run>', methods=['GET'])
+@jwt_required()
+def get_client_by_run(run):
+    """
+    Buscar un cliente por RUN - RUTA PROTEGIDA
+    GET /api/clients/run/<rut>
+    Headers: Authorization: Bearer <token>
+    Acepta el RUN con o sin puntos, guion o ceros a la izquierda (12.345.678-k = 12345678-K).
+    """
+    try:
+        client = lookup('client_by_run', normalize_run(run))
+        
+        if not client:
+            return jsonify({
+                'success': False,
+                'error': 'Cliente no encontrado'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'data': client_to_dict(client)
+        }), 200
+        
+    except PoolTimeout:
+        raise
     except Exception as e:
         return jsonify({
             'success': False,
@@ -620,32 +847,51 @@ def get_client(client_id):
 def get_users():
     """
     Listar todos los usuarios (excluyendo eliminados) - RUTA PROTEGIDA
-    GET /api/users
+    GET /api/users[?ids=1,2,3 | ?limit=50&offset=0 | ?count_only=true[&estimate=true]]
     Headers: Authorization: Bearer <token>
     """
     try:
-        users = User.query.filter(User.deleted_at.is_(None)).all()
-        
-        result = []
-        for user in users:
-            result.append({
-                'ID': user.ID,
-                'RUN': user.RUN,
-                'Email': user.Email,
-                'FirstName': user.FirstName,
-                'LastName': user.LastName,
-                'Phone': user.Phone,
-                'RoleID': user.RoleID,
-                'created_at': user.created_at.isoformat() if user.created_at else None,
-                'updated_at': user.updated_at.isoformat() if user.updated_at else None
-            })
+        if 'ids' in request.args:
+            return _multi_get_response(User.query, User, user_to_dict)
+        
+        criteria = [User.deleted_at.is_(None)]
+        if count_only_requested():
+            return count_response(User, criteria)
+        
+        try:
+            page = page_args()
+        except ValueError:
+            return invalid_page_response()
+        
+        users, total = paginate(USER_ROWS, criteria, page)
         
+        result = [user_to_dict(user) for user in users]
+        
+        return list_response(result, total)
+        
+    except PoolTimeout:
+        raise
+    except Exception as e:
         return jsonify({
-            'success': True,
-            'data': result,
-            'count': len(result)
-        }), 200
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@bp.route('/api/users/by-ids', methods=['POST'])
+@jwt_required()
+def get_users_by_ids():
+    """
+    Obtener varios usuarios por lista de IDs (para listas largas) - RUTA PROTEGIDA
+    POST /api/users/by-ids
+    Headers: Authorization: Bearer <token>
+    Body: {"ids": [1, 2, 3]}
+    """
+    try:
+        return _multi_get_response(User.query, User, user_to_dict)
         
+    except PoolTimeout:
+        raise
     except Exception as e:
         return jsonify({
             'success': False,
@@ -672,25 +918,12 @@ def get_mechanics():
             }), 404
         
         # Obtener usuarios con rol de Mecánico
-        mechanics = User.query.filter_by(
-            RoleID=mechanic_role.ID,
-            deleted_at=None
-        ).all()
-        
-        result = []
-        for user in mechanics:
-            result.append({
-                'ID': user.ID,
-                'RUN': user.RUN,
-                'Email': user.Email,
-                'FirstName': user.FirstName,
-                'LastName': user.LastName,
-                'Phone': user.Phone,
-                'RoleID': user.RoleID,
-                'RoleName': mechanic_role.Name,
-                'created_at': user.created_at.isoformat() if user.created_at else None,
-                'updated_at': user.updated_at.isoformat() if user.updated_at else None
-            })
+        mechanics = USER_ROWS.load(USER_ROWS.select(User.RoleID == mechanic_role.ID, User.deleted_at.is_(None)))
+        
+        result = [
+            {**user_to_dict(user), 'RoleName': mechanic_role.Name}
+            for user in mechanics
+        ]
         
         return jsonify({
             'success': True,
@@ -698,6 +931,8 @@ def get_mechanics():
             'count': len(result)
         }), 200
         
+    except PoolTimeout:
+        raise
     except Exception as e:
         return jsonify({
             'success': False,
@@ -734,8 +969,14 @@ def create_user():
                     'error': f'El campo {field} es obligatorio'
                 }), 400
         
-        # Verificar si el RUN ya existe
-        existing_user_run = User.query.filter_by(RUN=data['RUN']).first()
+        if not is_valid_run(data['RUN']):
+            return jsonify({
+                'success': False,
+                'error': 'RUN inválido'
+            }), 400
+        
+        # Verificar si el RUN ya existe (con o sin puntos, guion o ceros a la izquierda)
+        existing_user_run = User.query.filter_by(RunNormalized=normalize_run(data['RUN'])).first()
         if existing_user_run:
             return jsonify({
                 'success': False,
@@ -756,7 +997,7 @@ def create_user():
             Email=data['Email'],
             FirstName=data['FirstName'],
             LastName=data['LastName'],
-            Password=generate_password_hash(data['Password']),
+            Password=hash_password(data['Password']),
             Phone=data.get('Phone'),
             RoleID=data['RoleID']
         )
@@ -779,6 +1020,11 @@ def create_user():
             }
         }), 201
         
+    except PasswordPoolBusy as e:
+        db.session.rollback()
+        return _password_pool_busy(e)
+    except PoolTimeout:
+        raise
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -796,7 +1042,7 @@ def get_user(user_id):
     Headers: Authorization: Bearer <token>
     """
     try:
-        user = User.query.filter_by(ID=user_id, deleted_at=None).first()
+        user = lookup('user_by_id', user_id)
         
         if not user:
             return jsonify({
@@ -806,26 +1052,70 @@ def get_user(user_id):
         
         return jsonify({
             'success': True,
-            'data': {
-                'ID': user.ID,
-                'RUN': user.RUN,
-                'Email': user.Email,
-                'FirstName': user.FirstName,
-                'LastName': user.LastName,
-                'Phone': user.Phone,
-                'RoleID': user.RoleID,
-                'created_at': user.created_at.isoformat() if user.created_at else None,
-                'updated_at': user.updated_at.isoformat() if user.updated_at else None
-            }
+            'data': user_to_dict(user)
+        }), 200
+        
+    except PoolTimeout:
+        raise
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@bp.route('/api/users/<int:user_id>/revoke-tokens', methods=['POST'])
+@jwt_required()
+@role_required('Administrador')
+def revoke_user_tokens(user_id):
+    """
+    Invalidar todos los tokens emitidos a un usuario (por ejemplo, si le robaron uno) - SOLO ADMINISTRADOR
+    POST /api/users/<id>/revoke-tokens
+    Headers: Authorization: Bearer <token>
+    Aumenta la versión de tokens del usuario: debe iniciar sesión de nuevo.
+    """
+    try:
+        user = lookup('user_by_id', user_id)
+        
+        if not user:
+            return jsonify({
+                'success': False,
+                'error': 'Usuario no encontrado'
+            }), 404
+        
+        user.TokenVersion = (user.TokenVersion or 0) + 1
+        db.session.commit()
+        
+        return jsonify({
+            'success': True,
+            'message': 'Tokens del usuario revocados'
         }), 200
         
+    except PoolTimeout:
+        raise
     except Exception as e:
+        db.session.rollback()
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
 
+@bp.route('/api/metrics/password-hashing', methods=['GET'])
+@jwt_required()
+@role_required('Administrador')
+def password_hashing_metrics():
+    """
+    Métricas del pool de verificación de contraseñas de este proceso - SOLO ADMINISTRADOR
+    GET /api/metrics/password-hashing
+    Headers: Authorization: Bearer <token>
+    """
+    return jsonify({
+        'success': True,
+        'data': get_password_pool().stats()
+    }), 200
+
+
 # ========================================
 # RUTAS DE VEHÍCULOS
 # ========================================
@@ -835,36 +1125,51 @@ def get_user(user_id):
 def get_vehicles():
     """
     Listar todos los vehículos (excluyendo eliminados) - RUTA PROTEGIDA
-    GET /api/vehicles
+    GET /api/vehicles[?ids=1,2,3 | ?limit=50&offset=0 | ?count_only=true[&estimate=true]]
     Headers: Authorization: Bearer <token>
     """
     try:
-        vehicles = Vehicle.query.filter(Vehicle.deleted_at.is_(None)).all()
+        if 'ids' in request.args:
+            return _multi_get_response(Vehicle.query.options(joinedload(Vehicle.client)), Vehicle, vehicle_to_dict)
         
-        result = []
-        for vehicle in vehicles:
-            # Obtener el nombre completo del cliente
-            client_name = f"{vehicle.client.FirstName} {vehicle.client.LastName}" if vehicle.client else None
-            
-            result.append({
-                'ID': vehicle.ID,
-                'LicensePlate': vehicle.LicensePlate,
-                'Color': vehicle.Color,
-                'Brand': vehicle.Brand,
-                'Model': vehicle.Model,
-                'Year': vehicle.Year,
-                'ClientID': vehicle.ClientID,
-                'ClientName': client_name,
-                'created_at': vehicle.created_at.isoformat() if vehicle.created_at else None,
-                'updated_at': vehicle.updated_at.isoformat() if vehicle.updated_at else None
-            })
+        criteria = [Vehicle.deleted_at.is_(None)]
+        if count_only_requested():
+            return count_response(Vehicle, criteria)
+        
+        try:
+            page = page_args()
+        except ValueError:
+            return invalid_page_response()
+        
+        vehicles, total = paginate(VEHICLE_ROWS, criteria, page)
         
+        result = [vehicle_to_dict(vehicle) for vehicle in vehicles]
+        
+        return list_response(result, total)
+        
+    except PoolTimeout:
+        raise
+    except Exception as e:
         return jsonify({
-            'success': True,
-            'data': result,
-            'count': len(result)
-        }), 200
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@bp.route('/api/vehicles/by-ids', methods=['POST'])
+@jwt_required()
+def get_vehicles_by_ids():
+    """
+    Obtener varios vehículos por lista de IDs (para listas largas) - RUTA PROTEGIDA
+    POST /api/vehicles/by-ids
+    Headers: Authorization: Bearer <token>
+    Body: {"ids": [1, 2, 3]}
+    """
+    try:
+        return _multi_get_response(Vehicle.query.options(joinedload(Vehicle.client)), Vehicle, vehicle_to_dict)
         
+    except PoolTimeout:
+        raise
     except Exception as e:
         return jsonify({
             'success': False,
@@ -896,7 +1201,8 @@ def create_vehicle():
         print("ClientID recibido:", data.get('ClientID'), "Tipo:", type(data.get('ClientID')))
         
         # Validar campos requeridos
-        if not data.get('LicensePlate'):
+        plate = normalize_plate(data.get('LicensePlate'))
+        if not plate:
             return jsonify({
                 'success': False,
                 'error': 'La patente es obligatoria'
@@ -915,15 +1221,15 @@ def create_vehicle():
             }), 400
         
         # Verificar que el cliente exista
-        client = Client.query.filter_by(ID=client_id, deleted_at=None).first()
+        client = lookup('client_by_id', client_id)
         if not client:
             return jsonify({
                 'success': False,
                 'error': f'No existe un cliente con ID {client_id}'
             }), 404
         
-        # Verificar si la patente ya existe
-        existing_vehicle = Vehicle.query.filter_by(LicensePlate=data['LicensePlate']).first()
+        # Verificar si la patente ya existe ("ab-cd 12" y "ABCD12" son la misma)
+        existing_vehicle = Vehicle.query.filter_by(PlateNormalized=plate).first()
         if existing_vehicle:
             return jsonify({
                 'success': False,
@@ -958,6 +1264,8 @@ def create_vehicle():
             }
         }), 201
         
+    except PoolTimeout:
+        raise
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -975,7 +1283,7 @@ def get_vehicle(vehicle_id):
     Headers: Authorization: Bearer <token>
     """
     try:
-        vehicle = Vehicle.query.filter_by(ID=vehicle_id, deleted_at=None).first()
+        vehicle = lookup('vehicle_by_id', vehicle_id)
         
         if not vehicle:
             return jsonify({
@@ -983,25 +1291,45 @@ def get_vehicle(vehicle_id):
                 'error': 'Vehículo no encontrado'
             }), 404
         
-        # Obtener el nombre completo del cliente
-        client_name = f"{vehicle.client.FirstName} {vehicle.client.LastName}" if vehicle.client else None
+        return jsonify({
+            'success': True,
+            'data': vehicle_to_dict(vehicle)
+        }), 200
+        
+    except PoolTimeout:
+        raise
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@bp.route('/api/vehicles/plate/<plate>', methods=['GET'])
+@jwt_required()
+def get_vehicle_by_plate(plate):
+    """
+    Buscar un vehículo por patente - RUTA PROTEGIDA
+    GET /api/vehicles/plate/<patente>
+    Headers: Authorization: Bearer <token>
+    Acepta la patente con o sin guiones, espacios o minúsculas (ab-cd 12 = ABCD12).
+    """
+    try:
+        vehicle = lookup('vehicle_by_plate', normalize_plate(plate))
+        
+        if not vehicle:
+            return jsonify({
+                'success': False,
+                'error': 'Vehículo no encontrado'
+            }), 404
         
         return jsonify({
             'success': True,
-            'data': {
-                'ID': vehicle.ID,
-                'LicensePlate': vehicle.LicensePlate,
-                'Color': vehicle.Color,
-                'Brand': vehicle.Brand,
-                'Model': vehicle.Model,
-                'Year': vehicle.Year,
-                'ClientID': vehicle.ClientID,
-                'ClientName': client_name,
-                'created_at': vehicle.created_at.isoformat() if vehicle.created_at else None,
-                'updated_at': vehicle.updated_at.isoformat() if vehicle.updated_at else None
-            }
+            'data': vehicle_to_dict(vehicle)
         }), 200
         
+    except PoolTimeout:
+        raise
     except Exception as e:
         return jsonify({
             'success': False,
@@ -1014,36 +1342,22 @@ def get_vehicle(vehicle_id):
 def get_vehicles_by_client(client_id):
     """
     Obtener todos los vehículos de un cliente - RUTA PROTEGIDA
-    GET /api/vehicles/client/<client_id>
+    GET /api/vehicles/client/<client_id>[?count_only=true]
     Headers: Authorization: Bearer <token>
     """
     try:
-        vehicles = Vehicle.query.filter_by(ClientID=client_id, deleted_at=None).all()
+        criteria = [Vehicle.ClientID == client_id, Vehicle.deleted_at.is_(None)]
+        if count_only_requested():
+            return count_response(Vehicle, criteria, filtered=True)
         
-        result = []
-        for vehicle in vehicles:
-            # Obtener el nombre completo del cliente
-            client_name = f"{vehicle.client.FirstName} {vehicle.client.LastName}" if vehicle.client else None
-            
-            result.append({
-                'ID': vehicle.ID,
-                'LicensePlate': vehicle.LicensePlate,
-                'Color': vehicle.Color,
-                'Brand': vehicle.Brand,
-                'Model': vehicle.Model,
-                'Year': vehicle.Year,
-                'ClientID': vehicle.ClientID,
-                'ClientName': client_name,
-                'created_at': vehicle.created_at.isoformat() if vehicle.created_at else None,
-                'updated_at': vehicle.updated_at.isoformat() if vehicle.updated_at else None
-            })
+        vehicles = VEHICLE_ROWS.load(VEHICLE_ROWS.select(*criteria))
         
-        return jsonify({
-            'success': True,
-            'data': result,
-            'count': len(result)
-        }), 200
+        result = [vehicle_to_dict(vehicle) for vehicle in vehicles]
         
+        return list_response(result, len(result))
+        
+    except PoolTimeout:
+        raise
     except Exception as e:
         return jsonify({
             'success': False,
@@ -1055,44 +1369,118 @@ def get_vehicles_by_client(client_id):
 # RUTAS DE ÓRDENES DE TRABAJO
 # ========================================
 
+def _work_orders_query():
+    """Órdenes con vehículo y técnico cargados en la misma consulta"""
+    return WorkOrder.query.options(joinedload(WorkOrder.vehicle), joinedload(WorkOrder.user))
+
+
+def _listing_criteria(*criteria, **filters):
+    """Filtros del modelo de lectura (sin eliminadas) como lista de expresiones"""
+    return [*criteria, WorkOrderListing.deleted_at.is_(None),
+            *(getattr(WorkOrderListing, name) == value for name, value in filters.items())]
+
+
+def _work_order_listings(*criteria, page=None, **filters):
+    """
+    Listado desde el modelo de lectura (una sola tabla, sin joins) y su total
+    """
+    criteria = _listing_criteria(*criteria, **filters)
+    listings, total = paginate(WORK_ORDER_LISTING_ROWS, criteria, page)
+    return [work_order_listing_to_dict(listing) for listing in listings], total
+
+
+def _include_archived():
+    """``?include_archived=true`` agrega el historial archivado (archive_db.py)"""
+    return request.args.get('include_archived', '').lower() in ('1', 'true', 'yes')
+
+
+def _archived_count(*criteria, **filters):
+    """Cantidad de órdenes archivadas (no eliminadas) que cumplen ``filters``"""
+    return exact_count(WorkOrderArchive, *criteria, WorkOrderArchive.deleted_at.is_(None),
+                       *(getattr(WorkOrderArchive, name) == value for name, value in filters.items()))
+
+
+def _archived_work_orders(*criteria, **filters):
+    """Órdenes archivadas (no eliminadas) que cumplen ``filters``"""
+    orders = WorkOrderArchive.query.options(
+        joinedload(WorkOrderArchive.vehicle), joinedload(WorkOrderArchive.user)
+    ).filter(*criteria).filter_by(deleted_at=None, **filters).all()
+    return [{**work_order_to_dict(order), 'Archived': True} for order in orders]
+
+
+def _order_date_filters(model=WorkOrder):
+    """
+    Filtros ``?from=YYYY-MM-DD&to=YYYY-MM-DD`` sobre OrderDate (ambos inclusive).
+    Los listados los aplican sobre ``work_order_listings``, que no está
+    particionada: usan sus índices sobre OrderDate, no la poda de particiones.
+    Lanza ValueError si una fecha no tiene el formato correcto.
+    """
+    filters = []
+    date_from = request.args.get('from')
+    date_to = request.args.get('to')
+    if date_from:
+        filters.append(model.OrderDate >= datetime.strptime(date_from, '%Y-%m-%d').date())
+    if date_to:
+        filters.append(model.OrderDate <= datetime.strptime(date_to, '%Y-%m-%d').date())
+    return filters
+
+
 @bp.route('/api/work-orders', methods=['GET'])
 @jwt_required()
 def get_work_orders():
     """
     Listar todas las órdenes de trabajo (excluyendo eliminadas) - RUTA PROTEGIDA
-    GET /api/work-orders
+    GET /api/work-orders[?from=YYYY-MM-DD&to=YYYY-MM-DD][&limit=50&offset=0 | &count_only=true[&estimate=true]]
+    GET /api/work-orders?ids=1,2,3
     Headers: Authorization: Bearer <token>
     """
     try:
-        work_orders = WorkOrder.query.filter(WorkOrder.deleted_at.is_(None)).all()
+        if 'ids' in request.args:
+            return _multi_get_response(_work_orders_query(), WorkOrder, work_order_to_dict)
         
-        result = []
-        for order in work_orders:
-            # Obtener la patente del vehículo
-            license_plate = order.vehicle.LicensePlate if order.vehicle else None
-            
-            # Obtener el nombre del técnico/mecánico
-            technician_name = f"{order.user.FirstName} {order.user.LastName}" if order.user else None
-            
-            result.append({
-                'ID': order.ID,
-                'OrderDate': order.OrderDate.isoformat() if order.OrderDate else None,
-                'Status': order.Status,
-                'Description': order.Description,
-                'VehicleID': order.VehicleID,
-                'LicensePlate': license_plate,
-                'UserID': order.UserID,
-                'TechnicianName': technician_name,
-                'created_at': order.created_at.isoformat() if order.created_at else None,
-                'updated_at': order.updated_at.isoformat() if order.updated_at else None
-            })
+        try:
+            date_filters = _order_date_filters(WorkOrderListing)
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'Formato de fecha inválido. Use YYYY-MM-DD'
+            }), 400
+        
+        if count_only_requested():
+            return count_response(WorkOrderListing, _listing_criteria(*date_filters), filtered=bool(date_filters))
+        
+        try:
+            page = page_args()
+        except ValueError:
+            return invalid_page_response()
+        
+        result, total = _work_order_listings(*date_filters, page=page)
         
+        return list_response(result, total)
+        
+    except PoolTimeout:
+        raise
+    except Exception as e:
         return jsonify({
-            'success': True,
-            'data': result,
-            'count': len(result)
-        }), 200
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@bp.route('/api/work-orders/by-ids', methods=['POST'])
+@jwt_required()
+def get_work_orders_by_ids():
+    """
+    Obtener varias órdenes de trabajo por lista de IDs (para listas largas) - RUTA PROTEGIDA
+    POST /api/work-orders/by-ids
+    Headers: Authorization: Bearer <token>
+    Body: {"ids": [1, 2, 3]}
+    """
+    try:
+        return _multi_get_response(_work_orders_query(), WorkOrder, work_order_to_dict)
         
+    except PoolTimeout:
+        raise
     except Exception as e:
         return jsonify({
             'success': False,
@@ -1164,6 +1552,8 @@ def create_work_order():
             }
         }), 201
         
+    except PoolTimeout:
+        raise
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -1172,45 +1562,92 @@ def create_work_order():
         }), 500
 
 
+@bp.route('/api/work-orders/events', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def work_order_events():
+    """
+    Eventos de creación y cambio de estado de órdenes (Server-Sent Events) - RUTA PROTEGIDA
+    GET /api/work-orders/events
+    Headers: Authorization: Bearer <token>  (o ?jwt=<token> para EventSource)
+             Last-Event-ID: <id>  (o ?lastEventId=<id>) para recibir lo perdido
+    Eventos: work_order.created, work_order.status_changed, reset (recargar la lista)
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+    
+    config = current_app.config
+    heartbeat = config['SSE_HEARTBEAT_SECONDS']
+    deadline = time.monotonic() + config['SSE_MAX_STREAM_SECONDS']
+    subscription = get_broker().subscribe(last_event_id)
+    
+    def stream():
+        try:
+            # Indicar al navegador cuánto esperar antes de reconectar
+            yield 'retry: 3000\n\n'
+            
+            if subscription.reset:
+                yield format_sse(None, 'reset', {})
+            for message in subscription.replay:
+                yield format_sse(*message)
+            
+            while not subscription.overflowed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                message = subscription.get(timeout=min(heartbeat, remaining))
+                if message is None:
+                    yield ': heartbeat\n\n'
+                else:
+                    yield format_sse(*message)
+        finally:
+            subscription.close()
+    
+    # El stream no usa la base de datos: devolver al pool la conexión que pudo
+    # abrir la verificación del token (versión no cacheada) antes de minutos de stream
+    db.session.remove()
+    
+    return Response(
+        stream_with_context(stream()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 @bp.route('/api/work-orders/<int:order_id>', methods=['GET'])
 @jwt_required()
 def get_work_order(order_id):
     """
     Obtener una orden de trabajo por ID - RUTA PROTEGIDA
-    GET /api/work-orders/<id>
+    GET /api/work-orders/<id>[?include_archived=true]
     Headers: Authorization: Bearer <token>
     """
     try:
-        order = WorkOrder.query.filter_by(ID=order_id, deleted_at=None).first()
+        order = lookup('work_order_by_id', order_id)
         
-        if not order:
+        if order:
+            data = work_order_to_dict(order)
+        elif _include_archived():
+            archived = _archived_work_orders(ID=order_id)
+            data = archived[0] if archived else None
+        else:
+            data = None
+        
+        if not data:
             return jsonify({
                 'success': False,
                 'error': 'Orden de trabajo no encontrada'
             }), 404
         
-        # Obtener la patente del vehículo
-        license_plate = order.vehicle.LicensePlate if order.vehicle else None
-        
-        # Obtener el nombre del técnico/mecánico
-        technician_name = f"{order.user.FirstName} {order.user.LastName}" if order.user else None
-        
         return jsonify({
             'success': True,
-            'data': {
-                'ID': order.ID,
-                'OrderDate': order.OrderDate.isoformat() if order.OrderDate else None,
-                'Status': order.Status,
-                'Description': order.Description,
-                'VehicleID': order.VehicleID,
-                'LicensePlate': license_plate,
-                'UserID': order.UserID,
-                'TechnicianName': technician_name,
-                'created_at': order.created_at.isoformat() if order.created_at else None,
-                'updated_at': order.updated_at.isoformat() if order.updated_at else None
-            }
+            'data': data
         }), 200
         
+    except PoolTimeout:
+        raise
     except Exception as e:
         return jsonify({
             'success': False,
@@ -1223,39 +1660,35 @@ def get_work_order(order_id):
 def get_work_orders_by_vehicle(vehicle_id):
     """
     Obtener todas las órdenes de trabajo de un vehículo - RUTA PROTEGIDA
-    GET /api/work-orders/vehicle/<vehicle_id>
+    GET /api/work-orders/vehicle/<vehicle_id>[?include_archived=true&from=YYYY-MM-DD&to=YYYY-MM-DD&count_only=true]
     Headers: Authorization: Bearer <token>
     """
     try:
-        orders = WorkOrder.query.filter_by(VehicleID=vehicle_id, deleted_at=None).all()
+        try:
+            date_filters = _order_date_filters(WorkOrderListing)
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'Formato de fecha inválido. Use YYYY-MM-DD'
+            }), 400
         
-        result = []
-        for order in orders:
-            # Obtener la patente del vehículo
-            license_plate = order.vehicle.LicensePlate if order.vehicle else None
-            
-            # Obtener el nombre del técnico/mecánico
-            technician_name = f"{order.user.FirstName} {order.user.LastName}" if order.user else None
-            
-            result.append({
-                'ID': order.ID,
-                'OrderDate': order.OrderDate.isoformat() if order.OrderDate else None,
-                'Status': order.Status,
-                'Description': order.Description,
-                'VehicleID': order.VehicleID,
-                'LicensePlate': license_plate,
-                'UserID': order.UserID,
-                'TechnicianName': technician_name,
-                'created_at': order.created_at.isoformat() if order.created_at else None,
-                'updated_at': order.updated_at.isoformat() if order.updated_at else None
-            })
+        if count_only_requested():
+            archived = None
+            if _include_archived():
+                archived = lambda: _archived_count(*_order_date_filters(WorkOrderArchive), VehicleID=vehicle_id)
+            return count_response(WorkOrderListing, _listing_criteria(*date_filters, VehicleID=vehicle_id),
+                                  filtered=True, extra=archived)
         
-        return jsonify({
-            'success': True,
-            'data': result,
-            'count': len(result)
-        }), 200
+        result, _ = _work_order_listings(*date_filters, VehicleID=vehicle_id)
+        
+        if _include_archived():
+            result = [{**order, 'Archived': False} for order in result]
+            result += _archived_work_orders(*_order_date_filters(WorkOrderArchive), VehicleID=vehicle_id)
         
+        return list_response(result, len(result))
+        
+    except PoolTimeout:
+        raise
     except Exception as e:
         return jsonify({
             'success': False,
@@ -1268,41 +1701,478 @@ def get_work_orders_by_vehicle(vehicle_id):
 def get_work_orders_by_user(user_id):
     """
     Obtener todas las órdenes de trabajo asignadas a un usuario (mecánico) - RUTA PROTEGIDA
-    GET /api/work-orders/user/<user_id>
+    GET /api/work-orders/user/<user_id>[?include_archived=true&from=YYYY-MM-DD&to=YYYY-MM-DD&count_only=true]
+    Headers: Authorization: Bearer <token>
+    """
+    try:
+        try:
+            date_filters = _order_date_filters(WorkOrderListing)
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'Formato de fecha inválido. Use YYYY-MM-DD'
+            }), 400
+        
+        if count_only_requested():
+            archived = None
+            if _include_archived():
+                archived = lambda: _archived_count(*_order_date_filters(WorkOrderArchive), UserID=user_id)
+            return count_response(WorkOrderListing, _listing_criteria(*date_filters, UserID=user_id),
+                                  filtered=True, extra=archived)
+        
+        result, _ = _work_order_listings(*date_filters, UserID=user_id)
+        
+        if _include_archived():
+            result = [{**order, 'Archived': False} for order in result]
+            result += _archived_work_orders(*_order_date_filters(WorkOrderArchive), UserID=user_id)
+        
+        return list_response(result, len(result))
+        
+    except PoolTimeout:
+        raise
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+# ========================================
+# RUTAS DE BÚSQUEDA
+# ========================================
+
+@bp.route('/api/autocomplete', methods=['GET'])
+@jwt_required()
+def autocomplete():
+    """
+    Sugerencias mientras se escribe una patente, un nombre de cliente o un RUT - RUTA PROTEGIDA
+    GET /api/autocomplete?q=<texto>[&type=plate|client|run][&limit=10]
     Headers: Authorization: Bearer <token>
+    Responde desde un índice en memoria del proceso (sin consultar la BD).
+    Sin ``type`` busca en los tres; cada sugerencia indica su ``type``.
     """
     try:
-        orders = WorkOrder.query.filter_by(UserID=user_id, deleted_at=None).all()
+        types = request.args.get('type')
+        types = tuple(types.split(',')) if types else AUTOCOMPLETE_TYPES
+        if any(name not in AUTOCOMPLETE_TYPES for name in types):
+            return jsonify({
+                'success': False,
+                'error': f"El parámetro type debe ser uno de: {', '.join(AUTOCOMPLETE_TYPES)}"
+            }), 400
         
-        result = []
-        for order in orders:
-            # Obtener la patente del vehículo
-            license_plate = order.vehicle.LicensePlate if order.vehicle else None
-            
-            # Obtener el nombre del técnico/mecánico
-            technician_name = f"{order.user.FirstName} {order.user.LastName}" if order.user else None
-            
-            result.append({
-                'ID': order.ID,
-                'OrderDate': order.OrderDate.isoformat() if order.OrderDate else None,
-                'Status': order.Status,
-                'Description': order.Description,
-                'VehicleID': order.VehicleID,
-                'LicensePlate': license_plate,
-                'UserID': order.UserID,
-                'TechnicianName': technician_name,
-                'created_at': order.created_at.isoformat() if order.created_at else None,
-                'updated_at': order.updated_at.isoformat() if order.updated_at else None
+        try:
+            limit = min(max(int(request.args.get('limit', 10)), 1), 50)
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'El parámetro limit debe ser un número'
+            }), 400
+        
+        index = get_autocomplete(current_app)
+        index.ensure_built()
+        index.maybe_refresh()
+        suggestions = index.search(request.args.get('q', ''), types, limit)
+        
+        return jsonify({
+            'success': True,
+            'data': suggestions,
+            'count': len(suggestions)
+        }), 200
+        
+    except PoolTimeout:
+        raise
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+# ========================================
+# RUTAS DE SINCRONIZACIÓN
+# ========================================
+
+@bp.route('/api/changes', methods=['GET'])
+@jwt_required()
+def get_changes():
+    """
+    Cambios en clientes, vehículos, órdenes de trabajo y usuarios desde un token - RUTA PROTEGIDA
+    GET /api/changes?since=<token>&limit=500
+    Headers: Authorization: Bearer <token>
+    Sin ``since`` entrega todo desde el inicio (sincronización inicial).
+    Responde ``next`` para la siguiente llamada; si ``has_more`` es true,
+    llamar de nuevo de inmediato con ese token.
+    """
+    try:
+        try:
+            limit = min(max(int(request.args.get('limit', 500)), 1), 1000)
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'El parámetro limit debe ser un número'
+            }), 400
+        
+        try:
+            data, deleted, next_token, has_more = collect_changes(
+                request.args.get('since'),
+                limit,
+                current_app.config['CHANGE_FEED_SETTLE_SECONDS']
+            )
+        except InvalidChangeToken:
+            return jsonify({
+                'success': False,
+                'error': 'Token de sincronización inválido'
+            }), 400
+        
+        return jsonify({
+            'success': True,
+            'data': data,
+            'deleted': deleted,
+            'count': sum(len(rows) for rows in data.values()) + sum(len(ids) for ids in deleted.values()),
+            'next': next_token,
+            'has_more': has_more
+        }), 200
+        
+    except PoolTimeout:
+        raise
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+# ========================================
+# RUTAS DE REPORTES
+# ========================================
+
+@bp.route('/api/reports/work-orders/<section>', methods=['GET'])
+@jwt_required()
+def work_order_report(section):
+    """
+    Reporte mensual de órdenes de trabajo en CSV o XLSX - RUTA PROTEGIDA
+    GET /api/reports/work-orders/<by-status|by-mechanic|by-brand>?from=2024-01&to=2024-12&format=csv
+    Headers: Authorization: Bearer <token>
+    Una fila por mes y estado, mecánico o marca con la cantidad de órdenes
+    (incluye las archivadas). Sin from/to se usa el mes actual. El archivo
+    se genera y envía fila a fila.
+    """
+    try:
+        section = section.replace('-', '_')
+        if section not in MONTHLY_SECTIONS:
+            return jsonify({
+                'success': False,
+                'error': 'Reporte no encontrado. Use: by-status, by-mechanic o by-brand'
+            }), 404
+        
+        output_format = request.args.get('format', 'csv').lower()
+        if output_format not in FORMATS:
+            return jsonify({
+                'success': False,
+                'error': 'Formato inválido. Use csv o xlsx'
+            }), 400
+        
+        try:
+            current = datetime.utcnow().strftime('%Y-%m')
+            start = parse_month(request.args.get('from') or current)
+            end = add_months(parse_month(request.args.get('to') or request.args.get('from') or current), 1)
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'Formato de mes inválido. Use YYYY-MM'
+            }), 400
+        
+        if end <= start:
+            return jsonify({
+                'success': False,
+                'error': 'El mes from debe ser anterior o igual a to'
+            }), 400
+        
+        header, rows = iter_report(section, start, end)
+        write, mimetype = FORMATS[output_format]
+        filename = f"ordenes_{section}_{start.strftime('%Y-%m')}_{add_months(end, -1).strftime('%Y-%m')}.{output_format}"
+        
+        return Response(
+            stream_with_context(write(header, rows)),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+        )
+        
+    except PoolTimeout:
+        raise
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+# ========================================
+# RUTAS DE TRABAJOS EN SEGUNDO PLANO
+# ========================================
+
+def _own_job(job_id, with_result=False):
+    """Trabajo ``job_id`` si pertenece al usuario del token"""
+    return job_for_user(job_id, int(get_jwt_identity()), with_result)
+
+
+@bp.route('/api/jobs', methods=['POST'])
+@jwt_required()
+def submit_job():
+    """
+    Encolar una exportación o reporte - RUTA PROTEGIDA
+    POST /api/jobs
+    Headers: Authorization: Bearer <token>
+    Body: {"type": "work_orders_export", "params": {"from": "2024-01-01", "to": "2024-12-31"}}
+          {"type": "monthly_report", "params": {"year": 2024, "month": 10}}
+    Responde 202 con el trabajo; consultar /api/jobs/<id> hasta que Status sea
+    succeeded y descargar desde /api/jobs/<id>/result.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        
+        try:
+            job = get_runner(current_app).submit(data.get('type'), data.get('params'), int(get_jwt_identity()))
+        except InvalidJob as e:
+            return jsonify({
+                'success': False,
+                'error': str(e),
+                'types': list(JOB_TYPES)
+            }), 400
+        except JobQueueFull as e:
+            response = jsonify({
+                'success': False,
+                'error': str(e)
             })
+            response.status_code = 503
+            response.headers['Retry-After'] = str(current_app.config['ADMISSION_RETRY_AFTER'])
+            return response
+        
+        response = jsonify({
+            'success': True,
+            'message': 'Trabajo encolado',
+            'data': job_to_dict(job)
+        })
+        response.status_code = 202
+        response.headers['Location'] = f'/api/jobs/{job.ID}'
+        return response
+        
+    except PoolTimeout:
+        raise
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@bp.route('/api/jobs/<int:job_id>', methods=['GET'])
+@read_write
+@jwt_required()
+@use_primary
+def get_job(job_id):
+    """
+    Estado de un trabajo - RUTA PROTEGIDA
+    GET /api/jobs/<id>
+    Headers: Authorization: Bearer <token>
+    """
+    try:
+        get_runner(current_app).maybe_cleanup()
+        job = _own_job(job_id)
+        
+        if not job:
+            return jsonify({
+                'success': False,
+                'error': 'Trabajo no encontrado o vencido'
+            }), 404
         
         return jsonify({
             'success': True,
-            'data': result,
-            'count': len(result)
+            'data': job_to_dict(job)
+        }), 200
+        
+    except PoolTimeout:
+        raise
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@bp.route('/api/jobs/<int:job_id>/result', methods=['GET'])
+@jwt_required()
+@use_primary
+def get_job_result(job_id):
+    """
+    Descargar el resultado de un trabajo terminado - RUTA PROTEGIDA
+    GET /api/jobs/<id>/result
+    Headers: Authorization: Bearer <token>
+    """
+    try:
+        job = _own_job(job_id, with_result=True)
+        
+        if not job:
+            return jsonify({
+                'success': False,
+                'error': 'Trabajo no encontrado o vencido'
+            }), 404
+        
+        if job.Status == FAILED:
+            return jsonify({
+                'success': False,
+                'error': f'El trabajo falló: {job.Error}'
+            }), 410
+        
+        if job.Status != SUCCEEDED:
+            return jsonify({
+                'success': False,
+                'error': 'El trabajo aún no termina',
+                'data': job_to_dict(job)
+            }), 409
+        
+        return Response(
+            job.Result,
+            mimetype=job.ResultMimetype,
+            headers={'Content-Disposition': f'attachment; filename="{job.ResultFilename}"'}
+        )
+        
+    except PoolTimeout:
+        raise
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+# ========================================
+# RUTA BATCH
+# ========================================
+
+@bp.route('/api/batch', methods=['POST'])
+@jwt_required()
+def batch():
+    """
+    Ejecutar varias peticiones de la API en un solo viaje - RUTA PROTEGIDA
+    POST /api/batch
+    Headers: Authorization: Bearer <token>
+    Body: {
+        "requests": [
+            {"method": "GET", "path": "/api/clients"},
+            {"method": "POST", "path": "/api/vehicles", "body": {...}}
+        ]
+    }
+    Cada sub-petición usa el mismo token y responde su propio status y body,
+    en el mismo orden. Las lecturas (GET) consecutivas se ejecutan en
+    paralelo; las escrituras se ejecutan en orden, una a la vez.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        
+        try:
+            specs = validate_subrequests(data.get('requests'), current_app.config['BATCH_MAX_REQUESTS'])
+        except InvalidSubRequest as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        
+        authorization = request.headers.get('Authorization', '')
+        encoded_token = authorization.split(' ', 1)[-1]
+        
+        responses = run_batch(
+            current_app._get_current_object(),
+            specs,
+            authorization,
+            {encoded_token: get_jwt()},
+            current_app.config['BATCH_MAX_PARALLEL'],
+            remote_addr=request.remote_addr
+        )
+        
+        return jsonify({
+            'success': True,
+            'responses': responses,
+            'count': len(responses)
         }), 200
         
+    except PoolTimeout:
+        raise
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
+
+
+# ========================================
+# RUTAS DE PERFILADO
+# ========================================
+
+@bp.route('/api/profiles', methods=['GET'])
+@jwt_required()
+@role_required('Administrador')
+def profiles():
+    """
+    Perfiles de peticiones guardados en este proceso (el más reciente primero) - SOLO ADMINISTRADOR
+    GET /api/profiles
+    Headers: Authorization: Bearer <token>
+    Para perfilar una petición: header ``X-Profile: 1`` o ``?profile=1``; la
+    respuesta trae ``X-Profile-Id``.
+    """
+    store = get_profiles()
+    if store is None:
+        return jsonify({
+            'success': False,
+            'error': 'El perfilado está desactivado (PROFILING_ENABLED)'
+        }), 404
+    
+    data = store.summaries()
+    return jsonify({
+        'success': True,
+        'data': data,
+        'count': len(data)
+    }), 200
+
+
+@bp.route('/api/profiles/<profile_id>', methods=['GET'])
+@jwt_required()
+@role_required('Administrador')
+def profile_detail(profile_id):
+    """
+    Resultado de una petición perfilada - SOLO ADMINISTRADOR
+    GET /api/profiles/<id>[?format=json|text|pstats|collapsed]
+    Headers: Authorization: Bearer <token>
+    - json (por defecto): resumen y línea de tiempo SQL
+    - text: funciones con más tiempo acumulado (pstats)
+    - pstats: archivo para ``python -m pstats`` o snakeviz
+    - collapsed: pilas colapsadas para flamegraph.pl o speedscope
+    """
+    store = get_profiles()
+    profile = store.get(profile_id) if store is not None else None
+    if profile is None:
+        return jsonify({
+            'success': False,
+            'error': 'Perfil no encontrado'
+        }), 404
+    
+    output_format = request.args.get('format', 'json')
+    if output_format not in PROFILE_FORMATS:
+        return jsonify({
+            'success': False,
+            'error': f'Formato inválido. Use uno de: {", ".join(PROFILE_FORMATS)}'
+        }), 400
+    
+    if output_format == 'json':
+        return jsonify({
+            'success': True,
+            'data': {**profile['summary'], 'sql': profile['sql']}
+        }), 200
+    if output_format == 'pstats':
+        return Response(
+            profile['pstats'],
+            mimetype='application/octet-stream',
+            headers={'Content-Disposition': f'attachment; filename="{profile_id}.pstats"'}
+        )
+    return Response(profile[output_format], mimetype='text/plain')
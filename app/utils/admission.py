@@ -0,0 +1,172 @@
+"""
+Control de admisión para las rutas que usan la base de datos.
+
+Cada proceso admite a lo sumo ``ADMISSION_MAX_CONCURRENT`` peticiones a la
+vez (por defecto, el tamaño del pool de conexiones más su overflow). Los
+listados completos no pueden ocupar las últimas ``ADMISSION_RESERVED_SLOTS``
+plazas, que quedan para login, detalle y escrituras. Si no hay plaza tras
+``ADMISSION_WAIT_SECONDS``, o el pool ya está agotado, se responde ``503``
+con ``Retry-After`` de inmediato en lugar de esperar dentro de SQLAlchemy
+hasta el timeout del pool.
+
+Las rutas de lectura del modo ASGI usan el mismo ``AdmissionController``
+(``app.asgi.admitted``).
+
+Los trabajos en segundo plano y los streams SSE usan conexiones fuera de la
+admisión; si aun así se agota el pool, el timeout de SQLAlchemy también se
+responde con ``503`` y ``Retry-After``.
+"""
+import threading
+import time
+from collections import Counter
+from flask import current_app, g, jsonify, request
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import QueuePool
+
+AUTH = 'auth'
+DETAIL = 'detail'
+WRITE = 'write'
+LIST = 'list'
+
+# Clases que pueden usar las plazas reservadas
+PRIORITY_CLASSES = (AUTH, DETAIL, WRITE)
+
+AUTH_ENDPOINTS = {'main.login', 'main.register', 'main.logout', 'main.get_current_user'}
+
+# Rutas con parámetros en la URL que cuestan como un listado completo
+LIST_ENDPOINTS = {
+    'main.work_order_report',
+    'main.get_vehicles_by_client',
+    'main.get_work_orders_by_vehicle',
+    'main.get_work_orders_by_user',
+}
+
+OVERLOADED_ERROR = 'Servidor ocupado, intente nuevamente en unos segundos'
+
+# Valor por defecto de ``max_overflow`` en ``QueuePool``
+DEFAULT_MAX_OVERFLOW = 10
+
+# Sin límite: no usan la BD, mantienen la conexión abierta (SSE) o sus
+# sub-peticiones pasan por el control de admisión (batch)
+EXEMPT_ENDPOINTS = {'main.home', 'main.work_order_events', 'main.batch', 'static'}
+
+
+class AdmissionController:
+    """Plazas de ejecución por proceso con reserva para rutas prioritarias"""
+
+    def __init__(self, capacity, reserved=0):
+        self.capacity = max(capacity, 1)
+        self.reserved = min(max(reserved, 0), self.capacity - 1)
+        self.in_flight = 0
+        self.rejected = Counter()
+        self._condition = threading.Condition()
+
+    def limit_for(self, route_class):
+        return self.capacity if route_class in PRIORITY_CLASSES else self.capacity - self.reserved
+
+    def acquire(self, route_class, timeout=0.0):
+        """Ocupar una plaza; False si no se liberó ninguna en ``timeout`` segundos"""
+        limit = self.limit_for(route_class)
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while self.in_flight >= limit:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.rejected[route_class] += 1
+                    return False
+                self._condition.wait(remaining)
+            self.in_flight += 1
+            return True
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+
+def pool_capacity(engine, options=None):
+    """
+    Conexiones simultáneas que admite el pool según ``options``
+    (``SQLALCHEMY_ENGINE_OPTIONS``); None si no tiene límite.
+    """
+    if not isinstance(engine.pool, QueuePool):
+        return None
+    max_overflow = (options or {}).get('max_overflow', DEFAULT_MAX_OVERFLOW)
+    if max_overflow < 0:
+        return None
+    return engine.pool.size() + max_overflow
+
+
+def pool_saturated(engine, options=None):
+    """True si todas las conexiones del pool están en uso"""
+    capacity = pool_capacity(engine, options)
+    return capacity is not None and engine.pool.checkedout() >= capacity
+
+
+def route_class(req):
+    """Clase de la petición o None si está exenta"""
+    endpoint = req.endpoint
+    if endpoint is None or endpoint in EXEMPT_ENDPOINTS:
+        return None
+    if endpoint in AUTH_ENDPOINTS:
+        return AUTH
+    if endpoint in LIST_ENDPOINTS:
+        return LIST
+    # Consulta por lista de IDs: acotada, cuesta como un detalle
+    if endpoint.endswith('_by_ids') or 'ids' in req.args:
+        return DETAIL
+    if req.method not in ('GET', 'HEAD'):
+        return WRITE
+    if req.url_rule is not None and req.url_rule.arguments:
+        return DETAIL
+    return LIST
+
+
+def init_admission(app):
+    """Registrar el control de admisión según la configuración ``ADMISSION_*``"""
+    app.register_error_handler(PoolTimeout, lambda e: _overloaded(current_app.config))
+
+    if not app.config['ADMISSION_ENABLED']:
+        return
+
+    from app import db
+
+    options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}
+    with app.app_context():
+        capacity = app.config['ADMISSION_MAX_CONCURRENT'] or pool_capacity(db.engine, options) or 10
+
+    controller = AdmissionController(capacity, app.config['ADMISSION_RESERVED_SLOTS'])
+    app.extensions['admission'] = controller
+
+    @app.before_request
+    def _admit():
+        route = route_class(request)
+        if route is None:
+            return None
+
+        config = current_app.config
+        # Con el pool agotado los listados se rechazan sin esperar
+        engines = db.engines.values() if request.method in ('GET', 'HEAD') else [db.engine]
+        if route == LIST and all(pool_saturated(engine, options) for engine in engines):
+            controller.rejected[route] += 1
+            return _overloaded(config)
+
+        if not controller.acquire(route, config['ADMISSION_WAIT_SECONDS']):
+            return _overloaded(config)
+        g.admission_slot = True
+        return None
+
+    @app.teardown_request
+    def _release(exc):
+        if g.pop('admission_slot', False):
+            controller.release()
+
+
+def _overloaded(config):
+    response = jsonify({
+        'success': False,
+        'error': OVERLOADED_ERROR
+    })
+    response.status_code = 503
+    response.headers['Retry-After'] = str(config['ADMISSION_RETRY_AFTER'])
+    return response
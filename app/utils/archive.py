@@ -0,0 +1,119 @@
+"""
+Archivado de órdenes de trabajo antiguas.
+
+Mueve de ``work_orders`` a ``work_orders_archive`` las órdenes eliminadas
+(soft delete) y las órdenes cerradas cuya antigüedad supera el período de
+retención. Trabaja en lotes cortos, cada uno en su propia transacción, para
+no mantener bloqueos largos sobre la tabla principal.
+"""
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import and_, delete, func, insert, literal, or_, select, text, DateTime
+from app import db
+from app.models import WorkOrder, WorkOrderArchive
+from app.utils.read_model import refresh_listings
+
+
+def archivable_conditions(retention_days, closed_statuses, now=None):
+    """
+    Filtros de órdenes que deben archivarse, uno por pasada.
+
+    Se recorren por separado para que la pasada de órdenes cerradas filtre por
+    ``OrderDate`` y, con ``work_orders`` particionada, lea solo las
+    particiones anteriores a la fecha de corte.
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+    return [
+        and_(WorkOrder.OrderDate < cutoff.date(), WorkOrder.Status.in_(closed_statuses)),
+        and_(WorkOrder.deleted_at.isnot(None), WorkOrder.deleted_at < cutoff)
+    ]
+
+
+def archive_work_orders(retention_days, closed_statuses, batch_size=500, pause=0.0, dry_run=False):
+    """
+    Archivar órdenes en lotes de ``batch_size``.
+
+    Retorna la cantidad de órdenes movidas (o que se moverían con ``dry_run``).
+    """
+    conditions = archivable_conditions(retention_days, closed_statuses)
+
+    if dry_run:
+        return db.session.scalar(select(func.count()).select_from(WorkOrder).where(or_(*conditions)))
+
+    source = WorkOrder.__table__
+    columns = [column.name for column in source.columns]
+    moved = 0
+
+    for condition in conditions:
+        moved += _archive_batches(source, columns, condition, batch_size, pause)
+
+    return moved
+
+
+def _archive_batches(source, columns, condition, batch_size, pause):
+    moved = 0
+    while True:
+        ids = db.session.scalars(
+            select(WorkOrder.ID).where(condition).order_by(WorkOrder.ID).limit(batch_size)
+        ).all()
+        if not ids:
+            break
+
+        archived_at = literal(datetime.utcnow(), DateTime)
+        db.session.execute(
+            insert(WorkOrderArchive.__table__).from_select(
+                columns + ['archived_at'],
+                select(*[source.c[name] for name in columns], archived_at).where(source.c.ID.in_(ids), condition)
+            )
+        )
+        # Repetir la condición permite podar particiones también en el DELETE
+        db.session.execute(delete(source).where(source.c.ID.in_(ids), condition))
+        # Quitar del modelo de lectura las órdenes movidas
+        refresh_listings(db.session, 'ID', ids)
+        db.session.commit()
+
+        moved += len(ids)
+        if pause:
+            time.sleep(pause)
+
+    return moved
+
+
+def table_sizes(table_names=('work_orders', 'work_orders_archive')):
+    """
+    Filas y tamaño en bytes de tablas e índices.
+
+    En PostgreSQL usa ``pg_relation_size``/``pg_indexes_size``; en SQLite la
+    tabla virtual ``dbstat`` si está disponible (si no, solo filas).
+    """
+    dialect = db.engine.dialect.name
+    report = {}
+
+    for name in table_names:
+        rows = db.session.execute(text(f'SELECT COUNT(*) FROM {name}')).scalar()
+        table_bytes = index_bytes = None
+
+        if dialect == 'postgresql':
+            table_bytes, index_bytes = db.session.execute(
+                text('SELECT pg_relation_size(:name), pg_indexes_size(:name)'),
+                {'name': name}
+            ).one()
+        elif dialect == 'sqlite':
+            try:
+                table_bytes = db.session.execute(
+                    text('SELECT COALESCE(SUM(pgsize), 0) FROM dbstat WHERE name = :name'),
+                    {'name': name}
+                ).scalar()
+                index_bytes = db.session.execute(
+                    text(
+                        'SELECT COALESCE(SUM(pgsize), 0) FROM dbstat WHERE name IN '
+                        '(SELECT name FROM sqlite_master WHERE type = \'index\' AND tbl_name = :name)'
+                    ),
+                    {'name': name}
+                ).scalar()
+            except Exception:
+                db.session.rollback()
+
+        report[name] = {'rows': rows, 'table_bytes': table_bytes, 'index_bytes': index_bytes}
+
+    return report
@@ -0,0 +1,179 @@
+"""
+Claims de rol y perfil en el JWT y autorización por rol.
+
+El token de acceso lleva, además del ID del usuario, su rol (``role_id`` y
+``role``), su nombre (``name``) y la versión de sus tokens (``ver``). Las
+rutas que solo necesitan el rol lo leen del token con ``role_required``, sin
+cargar ``User`` ni ``Role``.
+
+``User.TokenVersion`` aumenta cuando cambia el rol del usuario; los tokens
+con otra versión se rechazan y el usuario debe iniciar sesión de nuevo. La
+versión vigente se guarda en memoria del proceso: los cambios confirmados en
+el mismo proceso se aplican de inmediato y los de otros workers se ven tras
+``TOKEN_VERSION_CACHE_SECONDS``. Los tokens sin ``ver`` (emitidos antes de
+estos claims) siguen siendo válidos hasta que expiran.
+"""
+import functools
+import threading
+import time
+from flask import current_app, has_app_context, jsonify
+from flask_jwt_extended import create_access_token, get_jwt
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, inspect, select
+from app import db
+from app.models import User
+
+ROLE_ID_CLAIM = 'role_id'
+ROLE_CLAIM = 'role'
+NAME_CLAIM = 'name'
+VERSION_CLAIM = 'ver'
+
+
+def user_claims(user):
+    """Claims adicionales del token de ``user``"""
+    return {
+        ROLE_ID_CLAIM: user.RoleID,
+        ROLE_CLAIM: user.role.Name if user.role else None,
+        NAME_CLAIM: f'{user.FirstName} {user.LastName}',
+        VERSION_CLAIM: user.TokenVersion or 0,
+    }
+
+
+def create_user_token(user):
+    return create_access_token(identity=str(user.ID), additional_claims=user_claims(user))
+
+
+# ========================================
+# VERSIÓN DE LOS TOKENS
+# ========================================
+
+class TokenVersionCache:
+    """``User.TokenVersion`` por usuario con vencimiento de ``ttl`` segundos"""
+
+    def __init__(self, ttl=30.0):
+        self.ttl = ttl
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def current(self, user_id):
+        """Versión vigente o None si el usuario no existe o fue eliminado"""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._versions.get(user_id)
+        if cached is not None and now - cached[1] < self.ttl:
+            return cached[0]
+
+        row = db.session.execute(
+            select(User.TokenVersion, User.deleted_at).where(User.ID == user_id)
+        ).first()
+        version = (row.TokenVersion or 0) if row is not None and row.deleted_at is None else None
+        self.set(user_id, version)
+        return version
+
+    def set(self, user_id, version):
+        with self._lock:
+            self._versions[user_id] = (version, time.monotonic())
+
+    def clear(self):
+        with self._lock:
+            self._versions.clear()
+
+
+def init_auth(app):
+    """Registrar la verificación de ``ver`` en cada ``@jwt_required()``"""
+    from app import jwt
+
+    app.extensions['token_versions'] = TokenVersionCache(app.config['TOKEN_VERSION_CACHE_SECONDS'])
+    jwt.token_verification_loader(lambda jwt_header, jwt_data: token_version_valid(jwt_data))
+    jwt.token_verification_failed_loader(lambda jwt_header, jwt_data: token_version_failed_response())
+
+
+def get_token_versions(app):
+    return app.extensions['token_versions']
+
+
+def token_version_valid(jwt_data):
+    """False si el token es de una versión anterior o el usuario ya no existe"""
+    version = jwt_data.get(VERSION_CLAIM)
+    if version is None:
+        return True
+    try:
+        user_id = int(jwt_data['sub'])
+    except (KeyError, TypeError, ValueError):
+        return False
+    return get_token_versions(current_app).current(user_id) == version
+
+
+def token_version_failed_response():
+    return jsonify({
+        'success': False,
+        'error': 'La sesión ya no es válida, inicie sesión nuevamente'
+    }), 401
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_token_versions(session, flush_context):
+    pending = session.info.setdefault('pending_token_versions', {})
+    for obj in session.dirty:
+        if not isinstance(obj, User):
+            continue
+        attrs = inspect(obj).attrs
+        if attrs.TokenVersion.history.has_changes() or attrs.deleted_at.history.has_changes():
+            pending[obj.ID] = None if obj.deleted_at is not None else obj.TokenVersion or 0
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_token_versions(session):
+    pending = session.info.pop('pending_token_versions', {})
+    if not pending or not has_app_context():
+        return
+    cache = current_app.extensions.get('token_versions')
+    if cache is not None:
+        for user_id, version in pending.items():
+            cache.set(user_id, version)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_token_versions(session):
+    session.info.pop('pending_token_versions', None)
+
+
+# ========================================
+# AUTORIZACIÓN POR ROL
+# ========================================
+
+def current_role():
+    """Nombre del rol según el token (None en tokens anteriores a los claims)"""
+    return get_jwt().get(ROLE_CLAIM)
+
+
+def claims_role(claims):
+    """Rol de los claims; los tokens sin el claim ``role`` lo cargan desde la base de datos"""
+    if ROLE_CLAIM in claims:
+        return claims[ROLE_CLAIM]
+    user = db.session.get(User, int(claims['sub']))
+    return user.role.Name if user is not None and user.role else None
+
+
+def role_required(*roles):
+    """
+    Restringir una ruta a los roles indicados; va después de ``@jwt_required()``.
+
+        @bp.route('/api/algo')
+        @jwt_required()
+        @role_required('Administrador')
+        def algo(): ...
+
+    Los tokens sin el claim ``role`` cargan el rol desde la base de datos.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if claims_role(get_jwt()) not in roles:
+                return jsonify({
+                    'success': False,
+                    'error': 'No tiene permisos para esta acción'
+                }), 403
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,321 @@
+"""
+Sugerencias mientras se escribe (``/api/autocomplete``) desde un índice en memoria.
+
+Cada proceso mantiene listas ordenadas de claves (patente canónica, nombre
+de cliente sin acentos y RUT sin puntos ni guion) y responde un prefijo con
+una búsqueda binaria, sin consultar la base de datos.
+
+El índice se construye en la primera consulta. Las escrituras confirmadas en
+el mismo proceso se aplican al confirmar la transacción; las de otros
+workers o de SQL directo se recogen cada ``AUTOCOMPLETE_REFRESH_SECONDS``
+leyendo las filas con ``updated_at`` posterior al último cambio visto (con
+el mismo margen ``CHANGE_FEED_SETTLE_SECONDS`` que ``/api/changes``).
+
+Cada índice guarda a lo sumo ``AUTOCOMPLETE_MAX_ENTRIES`` filas; al llenarse
+se descartan las modificadas hace más tiempo.
+"""
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from flask import current_app, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, select
+from app import db
+from app.models import Client, Vehicle
+from app.utils.normalize import normalize_plate
+
+PLATE = 'plate'
+CLIENT = 'client'
+RUN = 'run'
+TYPES = (PLATE, CLIENT, RUN)
+
+
+# ========================================
+# NORMALIZACIÓN DE CLAVES
+# ========================================
+
+def fold_name(value):
+    """``'  José  Pérez'`` -> ``'jose perez'`` (sin acentos, minúsculas, un espacio)"""
+    if not value:
+        return ''
+    value = str(value)
+    if not value.isascii():
+        decomposed = unicodedata.normalize('NFKD', value)
+        value = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(value.casefold().split())
+
+
+def run_prefix(value):
+    """``'12.345.6'`` -> ``'123456'``: dígitos y K, sin ceros a la izquierda"""
+    return re.sub(r'[^0-9K]', '', str(value or '').upper()).lstrip('0')
+
+
+def name_keys(first_name, last_name):
+    """Claves desde cada palabra del nombre: ``'ana maria soto'``, ``'maria soto'``, ``'soto'``..."""
+    first_words = fold_name(first_name).split()
+    last_words = fold_name(last_name).split()
+    words = first_words + last_words
+    keys = {' '.join(words[i:]) for i in range(len(words))}
+    # Apellido primero, como suele buscarse en el mesón
+    if last_words:
+        keys.add(' '.join(last_words + first_words))
+    return keys
+
+
+# Tipo -> normalización del texto buscado
+QUERY_NORMALIZERS = {
+    PLATE: lambda q: normalize_plate(q) or '',
+    CLIENT: fold_name,
+    RUN: run_prefix,
+}
+
+
+# ========================================
+# ÍNDICE DE PREFIJOS
+# ========================================
+
+class PrefixIndex:
+    """Claves ordenadas ``(clave, ID)``: un prefijo se resuelve con ``bisect``"""
+
+    def __init__(self, fields, max_entries):
+        self.fields = fields
+        self.max_entries = max_entries
+        self._keys = []
+        # ID -> (claves, valores); el orden del dict es el de última modificación
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def put(self, entry_id, keys, values):
+        keys = tuple(sorted(key for key in keys if key))
+        with self._lock:
+            self._discard(entry_id)
+            if not keys:
+                return
+            for key in keys:
+                insort(self._keys, (key, entry_id))
+            self._entries[entry_id] = (keys, values)
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)))
+
+    def load(self, entries):
+        """Reemplazar el contenido con ``(ID, claves, valores)`` (de la más antigua a la más reciente)"""
+        keys = []
+        stored = {}
+        for entry_id, entry_keys, values in entries:
+            entry_keys = tuple(sorted(key for key in entry_keys if key))
+            if entry_keys:
+                stored.pop(entry_id, None)
+                stored[entry_id] = (entry_keys, values)
+        while len(stored) > self.max_entries:
+            del stored[next(iter(stored))]
+        for entry_id, (entry_keys, _) in stored.items():
+            keys.extend((key, entry_id) for key in entry_keys)
+        keys.sort()
+        with self._lock:
+            self._keys, self._entries = keys, stored
+
+    def remove(self, entry_id):
+        with self._lock:
+            self._discard(entry_id)
+
+    def _discard(self, entry_id):
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        for key in entry[0]:
+            position = bisect_left(self._keys, (key, entry_id))
+            del self._keys[position]
+
+    def search(self, prefix, limit):
+        """Hasta ``limit`` entradas con alguna clave que empieza con ``prefix``"""
+        results = []
+        seen = set()
+        with self._lock:
+            position = bisect_left(self._keys, (prefix,))
+            while position < len(self._keys) and len(results) < limit:
+                key, entry_id = self._keys[position]
+                if not key.startswith(prefix):
+                    break
+                if entry_id not in seen:
+                    seen.add(entry_id)
+                    results.append(dict(zip(self.fields, (entry_id, *self._entries[entry_id][1]))))
+                position += 1
+        return results
+
+
+# ========================================
+# FUENTES
+# ========================================
+
+def _vehicle_entries(row):
+    return {PLATE: ([row['PlateNormalized']], (row['LicensePlate'], row['ClientID']))}
+
+
+def _client_entries(row):
+    values = (f"{row['FirstName']} {row['LastName']}", row['RUN'])
+    run = (row['RunNormalized'] or '').replace('-', '')
+    return {
+        CLIENT: (name_keys(row['FirstName'], row['LastName']), values),
+        RUN: ([run], values),
+    }
+
+
+# Modelo -> (columnas a leer, claves y valores por índice)
+SOURCES = {
+    Vehicle: (('ID', 'LicensePlate', 'PlateNormalized', 'ClientID', 'updated_at', 'deleted_at'), _vehicle_entries),
+    Client: (('ID', 'FirstName', 'LastName', 'RUN', 'RunNormalized', 'updated_at', 'deleted_at'), _client_entries),
+}
+
+# Campos de cada sugerencia por índice (el primero es el ID)
+FIELDS = {
+    PLATE: ('ID', 'LicensePlate', 'ClientID'),
+    CLIENT: ('ID', 'Name', 'RUN'),
+    RUN: ('ID', 'Name', 'RUN'),
+}
+
+
+class Autocomplete:
+    """Índices de patentes, nombres y RUT del proceso"""
+
+    def __init__(self, max_entries=100000, refresh_seconds=5.0, settle_seconds=2.0):
+        self.indexes = {name: PrefixIndex(FIELDS[name], max_entries) for name in TYPES}
+        self.max_entries = max_entries
+        self.refresh_seconds = refresh_seconds
+        self.settle = timedelta(seconds=settle_seconds)
+        self.built = False
+        self._build_lock = threading.Lock()
+        self._last_seen = {}
+        self._last_refresh = None
+
+    def apply(self, model, row):
+        """Agregar, actualizar o quitar las entradas de una fila (mapping de columnas)"""
+        _, entries = SOURCES[model]
+        for name, (keys, values) in entries(row).items():
+            if row['deleted_at'] is not None:
+                self.indexes[name].remove(row['ID'])
+            else:
+                self.indexes[name].put(row['ID'], keys, values)
+
+    def _rows(self, model, query):
+        for row in db.session.execute(query.execution_options(yield_per=5000)).mappings():
+            last_seen = self._last_seen.get(model)
+            if last_seen is None or row['updated_at'] > last_seen:
+                self._last_seen[model] = row['updated_at']
+            yield row
+
+    def build(self):
+        """Cargar las ``max_entries`` filas vigentes modificadas más recientemente"""
+        loaded = {name: [] for name in TYPES}
+        for model, (columns, entries) in SOURCES.items():
+            recent = select(*[getattr(model, name) for name in columns]).where(
+                model.deleted_at.is_(None)
+            ).order_by(model.updated_at.desc(), model.ID.desc()).limit(self.max_entries).subquery()
+            # Las más antiguas primero: quedan primeras en la cola de descarte
+            for row in self._rows(model, select(recent).order_by(recent.c.updated_at, recent.c.ID)):
+                for name, (keys, values) in entries(row).items():
+                    loaded[name].append((row['ID'], keys, values))
+        for name, rows in loaded.items():
+            self.indexes[name].load(rows)
+        self._last_refresh = time.monotonic()
+        self.built = True
+
+    def ensure_built(self):
+        if self.built:
+            return
+        with self._build_lock:
+            if not self.built:
+                self.build()
+
+    def refresh(self):
+        """Aplicar las filas modificadas desde el último cambio visto (menos el margen)"""
+        changed = 0
+        for model, (columns, _) in SOURCES.items():
+            query = select(*[getattr(model, name) for name in columns])
+            last_seen = self._last_seen.get(model)
+            if last_seen is not None:
+                query = query.where(model.updated_at > last_seen - self.settle)
+            for row in self._rows(model, query.order_by(model.updated_at, model.ID)):
+                self.apply(model, row)
+                changed += 1
+        self._last_refresh = time.monotonic()
+        return changed
+
+    def maybe_refresh(self):
+        """Refrescar como máximo una vez cada ``refresh_seconds``"""
+        now = time.monotonic()
+        if self._last_refresh is not None and now - self._last_refresh < self.refresh_seconds:
+            return
+        if self._build_lock.acquire(blocking=False):
+            try:
+                self.refresh()
+            finally:
+                self._build_lock.release()
+
+    def search(self, query, types=TYPES, limit=10):
+        """Sugerencias para ``query`` en los índices de ``types``, cada una con su ``type``"""
+        results = []
+        for name in types:
+            prefix = QUERY_NORMALIZERS[name](query)
+            if not prefix:
+                continue
+            for suggestion in self.indexes[name].search(prefix, limit - len(results)):
+                results.append({'type': name, **suggestion})
+            if len(results) >= limit:
+                break
+        return results
+
+    def stats(self):
+        return {name: len(index) for name, index in self.indexes.items()}
+
+
+def init_autocomplete(app):
+    config = app.config
+    app.extensions['autocomplete'] = Autocomplete(
+        max_entries=config['AUTOCOMPLETE_MAX_ENTRIES'],
+        refresh_seconds=config['AUTOCOMPLETE_REFRESH_SECONDS'],
+        settle_seconds=config['CHANGE_FEED_SETTLE_SECONDS']
+    )
+
+
+def get_autocomplete(app):
+    return app.extensions['autocomplete']
+
+
+# ========================================
+# ACTUALIZACIÓN AL CONFIRMAR LA TRANSACCIÓN
+# ========================================
+
+@event.listens_for(Session, 'after_flush')
+def _collect_autocomplete_changes(session, flush_context):
+    pending = session.info.setdefault('pending_autocomplete', [])
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        model = type(obj)
+        if model in SOURCES:
+            columns, _ = SOURCES[model]
+            row = {name: getattr(obj, name) for name in columns}
+            if obj in session.deleted:
+                row['deleted_at'] = datetime.utcnow()
+            pending.append((model, row))
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_autocomplete_changes(session):
+    pending = session.info.pop('pending_autocomplete', [])
+    if not pending or not has_app_context():
+        return
+    autocomplete = current_app.extensions.get('autocomplete')
+    if autocomplete is None or not autocomplete.built:
+        return
+    for model, row in pending:
+        autocomplete.apply(model, row)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_autocomplete_changes(session):
+    session.info.pop('pending_autocomplete', None)
@@ -0,0 +1,145 @@
+"""
+Ejecución de sub-peticiones para ``/api/batch``.
+
+Cada sub-petición pasa por la app Flask completa (``wsgi_app``) en su propio
+contexto de aplicación, igual que una petición HTTP independiente pero sin
+abrir conexiones nuevas. El JWT ya verificado por la petición batch se
+reutiliza en las sub-peticiones sin volver a decodificarlo.
+
+Las lecturas consecutivas (GET/HEAD) se ejecutan en paralelo; una escritura
+actúa como barrera, de modo que las lecturas posteriores ven sus cambios.
+"""
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from flask_jwt_extended import JWTManager
+from werkzeug.test import EnvironBuilder
+from werkzeug.wrappers import Response
+
+READ_METHODS = ('GET', 'HEAD')
+ALLOWED_METHODS = ('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE')
+
+# Rutas que no tienen sentido dentro de un batch (recursión, streams)
+EXCLUDED_PATHS = ('/api/batch', '/api/work-orders/events')
+
+# Clave del environ que marca una sub-petición
+SUBREQUEST_KEY = 'lubricentro.batch_subrequest'
+
+# Token codificado -> claims ya verificados por la petición batch
+_verified_tokens = ContextVar('verified_tokens', default=None)
+
+
+class BatchJWTManager(JWTManager):
+    """``JWTManager`` que reutiliza los tokens verificados por ``/api/batch``"""
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        verified = _verified_tokens.get()
+        if verified and encoded_token in verified:
+            claims = verified[encoded_token]
+            if allow_expired or claims.get('exp', float('inf')) > time.time():
+                return claims
+        return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+
+
+class InvalidSubRequest(ValueError):
+    """La sub-petición no tiene el formato esperado"""
+
+
+def validate_subrequests(specs, max_requests):
+    """Normalizar la lista de sub-peticiones; lanza ``InvalidSubRequest``"""
+    if not isinstance(specs, list) or not specs:
+        raise InvalidSubRequest('El campo requests debe ser una lista no vacía')
+    if len(specs) > max_requests:
+        raise InvalidSubRequest(f'Máximo {max_requests} sub-peticiones por batch')
+
+    normalized = []
+    for index, spec in enumerate(specs):
+        if not isinstance(spec, dict) or not isinstance(spec.get('path'), str):
+            raise InvalidSubRequest(f'Sub-petición {index}: el campo path es obligatorio')
+
+        method = str(spec.get('method', 'GET')).upper()
+        path = spec['path']
+        if method not in ALLOWED_METHODS:
+            raise InvalidSubRequest(f'Sub-petición {index}: método {method} no permitido')
+        if not path.startswith('/') or path.split('?')[0].rstrip('/') in EXCLUDED_PATHS:
+            raise InvalidSubRequest(f'Sub-petición {index}: ruta {path} no permitida')
+
+        headers = spec.get('headers') or {}
+        if not isinstance(headers, dict):
+            raise InvalidSubRequest(f'Sub-petición {index}: headers debe ser un objeto')
+
+        normalized.append({'method': method, 'path': path, 'body': spec.get('body'), 'headers': headers})
+    return normalized
+
+
+def _dispatch(app, spec, authorization, verified, remote_addr):
+    headers = {key: value for key, value in spec['headers'].items() if key.lower() != 'authorization'}
+    if authorization:
+        headers['Authorization'] = authorization
+
+    builder = EnvironBuilder(
+        path=spec['path'],
+        method=spec['method'],
+        headers=headers,
+        data=json.dumps(spec['body']) if spec['body'] is not None else None,
+        content_type='application/json' if spec['body'] is not None else None,
+        # IP de quien llama: el límite de intentos de login es por IP
+        environ_overrides={SUBREQUEST_KEY: True, **({'REMOTE_ADDR': remote_addr} if remote_addr else {})}
+    )
+    environ = builder.get_environ()
+    builder.close()
+
+    token = _verified_tokens.set(verified)
+    try:
+        # Contexto de aplicación propio: g, sesión de BD y teardown independientes
+        with app.app_context():
+            response = Response.from_app(app.wsgi_app, environ, buffered=True)
+    finally:
+        _verified_tokens.reset(token)
+
+    body = response.get_data(as_text=True)
+    if response.is_json:
+        body = json.loads(body) if body else None
+
+    return {
+        'status': response.status_code,
+        'headers': {key: value for key, value in response.headers.items() if key not in ('Content-Length',)},
+        'body': body
+    }
+
+
+def is_subrequest(environ):
+    return bool(environ.get(SUBREQUEST_KEY))
+
+
+def run_batch(app, specs, authorization, verified, max_parallel, remote_addr=None):
+    """
+    Ejecutar ``specs`` y retornar sus respuestas en el mismo orden.
+
+    ``verified`` mapea el token de ``authorization`` a sus claims ya verificados;
+    ``remote_addr`` es la IP de la petición batch, que heredan las sub-peticiones.
+    """
+    results = [None] * len(specs)
+    pending_reads = []
+
+    def flush_reads(pool):
+        futures = [
+            (index, pool.submit(_dispatch, app, specs[index], authorization, verified, remote_addr))
+            for index in pending_reads
+        ]
+        for index, future in futures:
+            results[index] = future.result()
+        pending_reads.clear()
+
+    with ThreadPoolExecutor(max_workers=max_parallel) as pool:
+        for index, spec in enumerate(specs):
+            if spec['method'] in READ_METHODS:
+                pending_reads.append(index)
+                continue
+            # Escritura: esperar las lecturas previas y ejecutarla sola
+            flush_reads(pool)
+            results[index] = _dispatch(app, spec, authorization, verified, remote_addr)
+        flush_reads(pool)
+
+    return results
@@ -0,0 +1,123 @@
+"""
+Feed incremental de cambios para ``/api/changes``.
+
+Cada entidad se recorre por ``(updated_at, ID)`` usando el índice sobre
+``updated_at``, así el costo de una sincronización depende de la cantidad de
+cambios y no del tamaño de las tablas. El token es opaco para el cliente:
+guarda el último ``(updated_at, ID)`` entregado por entidad.
+
+Solo se entregan filas con ``updated_at`` anterior a ``now - settle_seconds``,
+para no saltarse escrituras de transacciones que aún no confirmaban cuando
+se leyó el feed.
+
+Las órdenes que ``archive_db.py`` mueve a ``work_orders_archive`` salen de
+``work_orders`` sin pasar por soft delete: se informan como eliminadas
+recorriendo el archivo por ``(archived_at, ID)`` con su propio cursor. Una
+sincronización inicial no recibe el historial archivado, solo lo que se
+archive desde entonces.
+"""
+import base64
+import json
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import joinedload
+from app import db
+from app.models import Client, User, Vehicle, WorkOrder, WorkOrderArchive
+from app.utils.serializers import client_to_dict, user_to_dict, vehicle_to_dict, work_order_to_dict
+
+# Nombre en la respuesta -> (modelo, opciones de carga, serializador)
+FEED_ENTITIES = {
+    'clients': (Client, (), client_to_dict),
+    'vehicles': (Vehicle, (joinedload(Vehicle.client),), vehicle_to_dict),
+    'work_orders': (WorkOrder, (joinedload(WorkOrder.vehicle), joinedload(WorkOrder.user)), work_order_to_dict),
+    'users': (User, (), user_to_dict),
+}
+
+# Cursor de ``work_orders_archive`` en el token (órdenes archivadas)
+ARCHIVED_CURSOR = 'work_orders_archived'
+
+
+class InvalidChangeToken(ValueError):
+    """El token de ``since`` no se pudo decodificar"""
+
+
+def encode_token(cursors):
+    payload = {
+        name: [updated_at.isoformat(), row_id]
+        for name, (updated_at, row_id) in cursors.items()
+        if updated_at is not None
+    }
+    raw = json.dumps(payload, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_token(token):
+    """Token -> ``{entidad: (updated_at, ID)}``; vacío o None equivale al inicio"""
+    if not token:
+        return {}
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw)
+        return {
+            name: (datetime.fromisoformat(updated_at), int(row_id))
+            for name, (updated_at, row_id) in payload.items()
+            if name in FEED_ENTITIES or name == ARCHIVED_CURSOR
+        }
+    except (ValueError, TypeError, AttributeError) as e:
+        raise InvalidChangeToken(str(e)) from e
+
+
+def collect_changes(since, limit, settle_seconds, now=None):
+    """
+    Cambios posteriores a ``since`` (token), hasta ``limit`` filas por entidad.
+
+    Retorna ``(data, deleted, next_token, has_more)``: filas creadas o
+    actualizadas, IDs eliminados (soft delete o archivados) por entidad, el
+    token para la siguiente llamada y si quedaron cambios sin entregar.
+    """
+    cursors = decode_token(since)
+    horizon = (now or datetime.utcnow()) - timedelta(seconds=settle_seconds)
+    data, deleted, next_cursors = {}, {}, {}
+    has_more = False
+
+    for name, (model, options, serialize) in FEED_ENTITIES.items():
+        query = model.query.options(*options).filter(model.updated_at <= horizon)
+
+        cursor = cursors.get(name)
+        if cursor:
+            updated_at, row_id = cursor
+            query = query.filter(or_(
+                model.updated_at > updated_at,
+                and_(model.updated_at == updated_at, model.ID > row_id)
+            ))
+
+        rows = query.order_by(model.updated_at, model.ID).limit(limit + 1).all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            has_more = True
+
+        data[name] = [serialize(row) for row in rows if row.deleted_at is None]
+        deleted[name] = [row.ID for row in rows if row.deleted_at is not None]
+        next_cursors[name] = (rows[-1].updated_at, rows[-1].ID) if rows else (cursor or (None, None))
+
+    # Sin cursor de archivo: desde el cursor de órdenes del token o, en la
+    # sincronización inicial, desde ahora (el cliente no tiene esas órdenes)
+    cursor = cursors.get(ARCHIVED_CURSOR) or cursors.get('work_orders') or (horizon, 0)
+    archived_at, row_id = cursor
+    rows = db.session.execute(
+        select(WorkOrderArchive.ID, WorkOrderArchive.archived_at).where(
+            WorkOrderArchive.archived_at <= horizon,
+            or_(
+                WorkOrderArchive.archived_at > archived_at,
+                and_(WorkOrderArchive.archived_at == archived_at, WorkOrderArchive.ID > row_id)
+            )
+        ).order_by(WorkOrderArchive.archived_at, WorkOrderArchive.ID).limit(limit + 1)
+    ).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        has_more = True
+
+    deleted['work_orders'] += [row.ID for row in rows]
+    next_cursors[ARCHIVED_CURSOR] = (rows[-1].archived_at, rows[-1].ID) if rows else cursor
+
+    return data, deleted, encode_token(next_cursors), has_more
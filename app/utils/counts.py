@@ -0,0 +1,118 @@
+"""
+Totales de las rutas de colección sin cargar las filas.
+
+- ``?count_only=true`` responde solo ``{"count": N}`` con un ``SELECT
+  COUNT(*)`` con los mismos filtros del listado.
+- ``?count_only=true&estimate=true`` usa en PostgreSQL la estimación del
+  planificador (``pg_class.reltuples``, actualizada por ``ANALYZE`` y
+  autovacuum) cuando el listado no tiene filtros propios; incluye las filas
+  con soft delete. En otros motores, o sin estadísticas, cuenta exacto.
+- ``?limit=N&offset=M`` pagina el listado por ID y el total va en el header
+  ``X-Total-Count``; solo se cuenta aparte si la página no permite deducirlo.
+"""
+from flask import jsonify, request
+from sqlalchemy import func, select, text
+from app import db
+
+MAX_PAGE_SIZE = 1000
+TOTAL_HEADER = 'X-Total-Count'
+
+
+def _flag(name):
+    return request.args.get(name, '').lower() in ('1', 'true', 'yes')
+
+
+def count_only_requested():
+    return _flag('count_only')
+
+
+def exact_count(model, *criteria):
+    """``SELECT COUNT(*) FROM model WHERE criteria``"""
+    return db.session.scalar(select(func.count()).select_from(model).where(*criteria))
+
+
+def estimated_count(model):
+    """Filas de la tabla según las estadísticas de PostgreSQL, o None si no hay"""
+    if db.session.get_bind(mapper=model).dialect.name != 'postgresql':
+        return None
+    estimate = db.session.execute(
+        text('SELECT reltuples FROM pg_class WHERE oid = to_regclass(:table)'),
+        {'table': model.__table__.name}
+    ).scalar()
+    # -1 (PostgreSQL 14+) o 0: la tabla aún no se analiza
+    if estimate is None or estimate <= 0:
+        return None
+    return int(estimate)
+
+
+def count_response(model, criteria, filtered=False, extra=None):
+    """
+    Respuesta de ``?count_only=true``. ``filtered`` indica filtros de la
+    petición (fechas, vehículo...): con ellos la estimación no aplica.
+    ``extra`` es una función que suma filas de otra fuente (archivo).
+    """
+    estimate = None
+    if _flag('estimate') and not filtered and extra is None:
+        estimate = estimated_count(model)
+    total = estimate if estimate is not None else exact_count(model, *criteria)
+    if extra is not None:
+        total += extra()
+    response = jsonify({
+        'success': True,
+        'count': total,
+        'estimated': estimate is not None
+    })
+    response.headers[TOTAL_HEADER] = str(total)
+    return response, 200
+
+
+def page_args():
+    """
+    ``(limit, offset)`` de ``?limit=N&offset=M`` o None sin ``limit``.
+    Lanza ValueError si no son enteros válidos.
+    """
+    if 'limit' not in request.args:
+        return None
+    limit = int(request.args['limit'])
+    offset = int(request.args.get('offset', 0))
+    if not 1 <= limit <= MAX_PAGE_SIZE or offset < 0:
+        raise ValueError('Paginación inválida')
+    return limit, offset
+
+
+def paginate(rows, criteria, page):
+    """
+    Filas de ``rows`` (``RowType`` de ``app/utils/rows.py``) que cumplen
+    ``criteria`` y el total del listado. Sin ``page`` carga todo y el total es
+    la cantidad de filas.
+    """
+    statement = rows.select(*criteria).order_by(rows.model.ID)
+    if page is None:
+        result = rows.load(statement)
+        return result, len(result)
+    limit, offset = page
+    result = rows.load(statement.limit(limit).offset(offset))
+    # Página incompleta con filas: es la última y el total se deduce sin contar
+    if result and len(result) < limit:
+        return result, offset + len(result)
+    if not result and offset == 0:
+        return result, 0
+    return result, exact_count(rows.model, *criteria)
+
+
+def list_response(result, total):
+    """Listado con ``count`` (filas devueltas) y el total en ``X-Total-Count``"""
+    response = jsonify({
+        'success': True,
+        'data': result,
+        'count': len(result)
+    })
+    response.headers[TOTAL_HEADER] = str(total)
+    return response, 200
+
+
+def invalid_page_response():
+    return jsonify({
+        'success': False,
+        'error': f'Paginación inválida: limit entre 1 y {MAX_PAGE_SIZE}, offset mayor o igual a 0'
+    }), 400
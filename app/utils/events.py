@@ -0,0 +1,202 @@
+"""
+Eventos de órdenes de trabajo para Server-Sent Events.
+
+Las escrituras confirmadas sobre ``WorkOrder`` (creación y cambio de estado)
+se publican en un ``EventBroker`` que las reparte en memoria a todas las
+conexiones SSE abiertas en el proceso. El costo de entregar un evento depende
+de la cantidad de suscriptores, no de la cantidad de órdenes.
+
+El transporte entre workers es intercambiable (``EventBackend``). El backend
+``local`` solo reparte dentro del proceso; uno compartido (Redis pub/sub,
+LISTEN/NOTIFY de PostgreSQL...) debe asignar los IDs de evento y entregar cada
+mensaje a ``broker.dispatch`` en todos los workers.
+"""
+import itertools
+import json
+from abc import ABC, abstractmethod
+import queue
+import threading
+from collections import deque
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, inspect
+from app.models import WorkOrder
+from app.utils.serializers import iso
+
+WORK_ORDER_CREATED = 'work_order.created'
+WORK_ORDER_STATUS_CHANGED = 'work_order.status_changed'
+
+
+class EventBackend(ABC):
+    """Transporte de eventos entre workers"""
+
+    @abstractmethod
+    def start(self, dispatch):
+        """Registrar ``dispatch(event_id, name, data)`` para recibir mensajes"""
+
+    @abstractmethod
+    def publish(self, name, data):
+        """Enviar un evento a todos los workers"""
+
+
+class LocalBackend(EventBackend):
+    """Backend en memoria: un solo proceso (desarrollo o un único worker)"""
+
+    def __init__(self):
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._dispatch = None
+
+    def start(self, dispatch):
+        self._dispatch = dispatch
+
+    def publish(self, name, data):
+        with self._lock:
+            self._dispatch(next(self._ids), name, data)
+
+
+BACKENDS = {
+    'local': LocalBackend,
+}
+
+
+class Subscription:
+    """Conexión SSE: eventos a reenviar más la cola de eventos nuevos"""
+
+    def __init__(self, broker, replay, reset):
+        self.broker = broker
+        self.replay = replay
+        self.reset = reset
+        self.queue = queue.Queue(maxsize=broker.queue_size)
+        self.overflowed = False
+
+    def get(self, timeout):
+        """Siguiente evento o None si pasó ``timeout`` sin eventos"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class EventBroker:
+    """Reparto en memoria con historial acotado para reenvío por Last-Event-ID"""
+
+    def __init__(self, backend=None, replay_size=1000, queue_size=100):
+        self.queue_size = queue_size
+        self._history = deque(maxlen=replay_size)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self.backend = backend or LocalBackend()
+        self.backend.start(self.dispatch)
+
+    def publish(self, name, data):
+        self.backend.publish(name, data)
+
+    def dispatch(self, event_id, name, data):
+        """Entregar un evento del backend a los suscriptores del proceso"""
+        message = (event_id, name, data)
+        with self._lock:
+            self._history.append(message)
+            subscribers = list(self._subscribers)
+
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(message)
+            except queue.Full:
+                # Cliente demasiado lento: se cierra y reconecta con Last-Event-ID
+                subscription.overflowed = True
+
+    def subscribe(self, last_event_id=None):
+        with self._lock:
+            history = list(self._history)
+            reset = False
+            replay = []
+            if last_event_id is not None:
+                replay = [message for message in history if message[0] > last_event_id]
+                latest = history[-1][0] if history else 0
+                # El ID pedido ya salió del historial, o los IDs se reiniciaron
+                # (reinicio del proceso con el backend local): el cliente debe recargar
+                reset = last_event_id > latest or (bool(history) and history[0][0] > last_event_id + 1)
+            subscription = Subscription(self, replay, reset)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    @property
+    def latest_event_id(self):
+        with self._lock:
+            return self._history[-1][0] if self._history else 0
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+
+broker = EventBroker()
+
+
+def init_events(app):
+    """Configurar el broker según ``EVENT_BACKEND`` y ``SSE_REPLAY_SIZE``"""
+    global broker
+    backend = BACKENDS[app.config['EVENT_BACKEND']]()
+    broker = EventBroker(backend, replay_size=app.config['SSE_REPLAY_SIZE'])
+    app.extensions['event_broker'] = broker
+
+
+def get_broker():
+    return broker
+
+
+def format_sse(event_id, name, data):
+    """Mensaje en formato ``text/event-stream`` (sin ``id`` si ``event_id`` es None)"""
+    payload = json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+    prefix = f'id: {event_id}\n' if event_id is not None else ''
+    return f'{prefix}event: {name}\ndata: {payload}\n\n'
+
+
+# ========================================
+# PUBLICACIÓN AL CONFIRMAR LA TRANSACCIÓN
+# ========================================
+
+def _work_order_payload(order, previous_status=None):
+    data = {
+        'ID': order.ID,
+        'OrderDate': iso(order.OrderDate),
+        'Status': order.Status,
+        'VehicleID': order.VehicleID,
+        'UserID': order.UserID
+    }
+    if previous_status is not None:
+        data['PreviousStatus'] = previous_status
+    return data
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_work_order_events(session, flush_context):
+    pending = session.info.setdefault('pending_events', [])
+
+    for obj in session.new:
+        if isinstance(obj, WorkOrder):
+            pending.append((WORK_ORDER_CREATED, _work_order_payload(obj)))
+
+    for obj in session.dirty:
+        if isinstance(obj, WorkOrder):
+            history = inspect(obj).attrs.Status.history
+            if history.deleted and history.added and history.deleted[0] != history.added[0]:
+                pending.append((WORK_ORDER_STATUS_CHANGED, _work_order_payload(obj, history.deleted[0])))
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_work_order_events(session):
+    for name, data in session.info.pop('pending_events', []):
+        broker.publish(name, data)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_work_order_events(session):
+    session.info.pop('pending_events', None)
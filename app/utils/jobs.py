@@ -0,0 +1,231 @@
+"""
+Trabajos en segundo plano para exportaciones y reportes pesados.
+
+La petición solo registra el trabajo en la tabla ``jobs`` y responde de
+inmediato; un pool de hilos del proceso (``JOBS_MAX_WORKERS``) lo ejecuta y
+guarda el resultado en la misma tabla. Los resultados se eliminan al vencer
+``JOBS_RESULT_TTL_SECONDS`` y los trabajos que quedaron en curso más de
+``JOBS_TIMEOUT_SECONDS`` (por ejemplo, porque el proceso se reinició) se
+marcan como fallidos.
+"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import and_, delete, or_, select, update
+from app import db
+from app.models import Job, WorkOrderListing
+from app.utils.reports import monthly_summary
+from app.utils.serializers import iso
+from app.utils.spreadsheet import CSV_MIMETYPE, iter_csv
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+
+class InvalidJob(ValueError):
+    """Tipo de trabajo desconocido o parámetros inválidos"""
+
+
+class JobQueueFull(RuntimeError):
+    """Se alcanzó ``JOBS_MAX_PENDING`` trabajos pendientes en el proceso"""
+
+
+# ========================================
+# TIPOS DE TRABAJO
+# ========================================
+
+def _parse_date(value, name):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+    except (TypeError, ValueError):
+        raise InvalidJob(f'El parámetro {name} debe tener formato YYYY-MM-DD')
+
+
+def _validate_export(params):
+    return {
+        'from': iso(_parse_date(params.get('from'), 'from')),
+        'to': iso(_parse_date(params.get('to'), 'to')),
+    }
+
+
+EXPORT_COLUMNS = ['ID', 'OrderDate', 'Status', 'Description', 'VehicleID', 'LicensePlate',
+                  'ClientID', 'ClientName', 'UserID', 'TechnicianName']
+
+
+def export_work_orders(params):
+    """CSV con las órdenes vigentes entre ``from`` y ``to`` (desde el modelo de lectura)"""
+    query = select(*[WorkOrderListing.__table__.c[name] for name in EXPORT_COLUMNS]).where(
+        WorkOrderListing.deleted_at.is_(None)
+    ).order_by(WorkOrderListing.ID)
+    if params.get('from'):
+        query = query.where(WorkOrderListing.OrderDate >= _parse_date(params['from'], 'from'))
+    if params.get('to'):
+        query = query.where(WorkOrderListing.OrderDate <= _parse_date(params['to'], 'to'))
+
+    # Mismo escritor que los reportes en streaming: bloques ya codificados, sin
+    # armar el texto completo antes de codificarlo
+    content = bytearray()
+    for chunk in iter_csv(EXPORT_COLUMNS, db.session.execute(query.execution_options(yield_per=1000))):
+        content += chunk
+
+    return content, CSV_MIMETYPE, 'ordenes_de_trabajo.csv'
+
+
+def _validate_monthly(params):
+    try:
+        year, month = int(params['year']), int(params['month'])
+        datetime(year, month, 1)
+    except (KeyError, TypeError, ValueError):
+        raise InvalidJob('Los parámetros year y month son obligatorios (month entre 1 y 12)')
+    return {'year': year, 'month': month}
+
+
+def monthly_report(params):
+    """Resumen JSON del mes por estado, mecánico y marca"""
+    summary = monthly_summary(params['year'], params['month'])
+    content = json.dumps(summary, ensure_ascii=False, indent=2).encode('utf-8')
+    return content, 'application/json', f"reporte_{summary['month']}.json"
+
+
+# Tipo -> (validar y normalizar parámetros, ejecutar -> (bytes, mimetype, nombre))
+JOB_TYPES = {
+    'work_orders_export': (_validate_export, export_work_orders),
+    'monthly_report': (_validate_monthly, monthly_report),
+}
+
+
+# ========================================
+# EJECUCIÓN
+# ========================================
+
+class JobRunner:
+    """Pool de hilos acotado que ejecuta los trabajos registrados en ``jobs``"""
+
+    def __init__(self, app):
+        config = app.config
+        self.app = app
+        self.max_pending = config['JOBS_MAX_PENDING']
+        self.result_ttl = timedelta(seconds=config['JOBS_RESULT_TTL_SECONDS'])
+        self.timeout = timedelta(seconds=config['JOBS_TIMEOUT_SECONDS'])
+        self.cleanup_interval = config['JOBS_CLEANUP_INTERVAL_SECONDS']
+        self._executor = ThreadPoolExecutor(max_workers=config['JOBS_MAX_WORKERS'], thread_name_prefix='job')
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._last_cleanup = None
+
+    @property
+    def pending(self):
+        with self._lock:
+            return sum(1 for future in self._futures.values() if not future.done())
+
+    def submit(self, job_type, params, user_id):
+        """Registrar y encolar un trabajo; retorna el ``Job`` creado"""
+        if job_type not in JOB_TYPES:
+            raise InvalidJob(f"Tipo de trabajo desconocido. Use: {', '.join(JOB_TYPES)}")
+        if self.pending >= self.max_pending:
+            raise JobQueueFull('Demasiados trabajos pendientes, intente más tarde')
+
+        validate, _ = JOB_TYPES[job_type]
+        job = Job(Type=job_type, Params=json.dumps(validate(params or {})), Status=QUEUED, UserID=user_id)
+        db.session.add(job)
+        db.session.commit()
+        self.maybe_cleanup()
+
+        with self._lock:
+            self._futures = {job_id: f for job_id, f in self._futures.items() if not f.done()}
+            self._futures[job.ID] = self._executor.submit(self._run, job.ID)
+        return job
+
+    def wait(self, timeout=None):
+        """Esperar a que terminen los trabajos encolados en este proceso"""
+        with self._lock:
+            futures = list(self._futures.values())
+        for future in futures:
+            future.result(timeout=timeout)
+
+    def _run(self, job_id):
+        with self.app.app_context():
+            # Cualquier error (también al marcarlo en curso o al guardar el
+            # resultado) deja el trabajo fallido en lugar de en curso
+            try:
+                self._execute(job_id)
+            except Exception as e:
+                db.session.rollback()
+                self._finish(job_id, Status=FAILED, Error=str(e))
+
+    def _execute(self, job_id):
+        job = db.session.get(Job, job_id)
+        if job is None or job.Status != QUEUED:
+            return
+        job.Status = RUNNING
+        job.started_at = datetime.utcnow()
+        db.session.commit()
+
+        _, execute = JOB_TYPES[job.Type]
+        content, mimetype, filename = execute(json.loads(job.Params or '{}'))
+        self._finish(job_id, Status=SUCCEEDED, Result=content, ResultMimetype=mimetype, ResultFilename=filename)
+
+    def _finish(self, job_id, **values):
+        job = db.session.get(Job, job_id)
+        if job is None:
+            return
+        for name, value in values.items():
+            setattr(job, name, value)
+        job.finished_at = datetime.utcnow()
+        job.expires_at = job.finished_at + self.result_ttl
+        db.session.commit()
+
+    def maybe_cleanup(self):
+        """Limpiar como máximo una vez cada ``JOBS_CLEANUP_INTERVAL_SECONDS``"""
+        now = time.monotonic()
+        if self._last_cleanup is not None and now - self._last_cleanup < self.cleanup_interval:
+            return
+        self._last_cleanup = now
+        self.cleanup()
+
+    def cleanup(self, now=None):
+        """Eliminar trabajos vencidos y marcar como fallidos los abandonados"""
+        now = now or datetime.utcnow()
+        expired = db.session.execute(
+            delete(Job).where(Job.expires_at.isnot(None), Job.expires_at <= now)
+        ).rowcount
+        abandoned = db.session.execute(
+            update(Job).where(
+                or_(
+                    and_(Job.Status == RUNNING, Job.started_at < now - self.timeout),
+                    and_(Job.Status == QUEUED, Job.created_at < now - self.timeout)
+                )
+            ).values(Status=FAILED, Error='Trabajo interrumpido', finished_at=now,
+                     expires_at=now + self.result_ttl)
+        ).rowcount
+        db.session.commit()
+        return expired, abandoned
+
+
+def init_jobs(app):
+    app.extensions['job_runner'] = JobRunner(app)
+
+
+def get_runner(app):
+    return app.extensions['job_runner']
+
+
+def job_to_dict(job):
+    data = {
+        'ID': job.ID,
+        'Type': job.Type,
+        'Params': json.loads(job.Params) if job.Params else {},
+        'Status': job.Status,
+        'Error': job.Error,
+        'created_at': iso(job.created_at),
+        'started_at': iso(job.started_at),
+        'finished_at': iso(job.finished_at),
+        'expires_at': iso(job.expires_at)
+    }
+    if job.Status == SUCCEEDED:
+        data['result_url'] = f'/api/jobs/{job.ID}/result'
+    return data
@@ -0,0 +1,56 @@
+"""
+Sentencias preconstruidas para las búsquedas que corren en casi cada petición.
+
+``Model.query.filter_by(...).first()`` arma un ``Query`` nuevo en cada
+llamada y SQLAlchemy debe recorrerlo para calcular su clave de caché antes
+de encontrar el SQL ya compilado. Estas sentencias se construyen una sola
+vez al importar el módulo con parámetros ``bindparam``: cada llamada solo
+envía los valores y reutiliza el SQL compilado (cerca de 3 veces menos costo
+en Python por búsqueda, ver ``benchmarks/lookups.py``).
+
+En PostgreSQL (psycopg 3, ver ``postgres_url`` en ``config.py``) el mismo
+texto SQL se prepara además en el servidor tras ``DATABASE_PREPARE_THRESHOLD``
+ejecuciones por conexión.
+"""
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import joinedload, undefer
+from app import db
+from app.models import Client, Job, User, Vehicle, WorkOrder
+
+
+def _active(model, column, *options):
+    """Fila vigente (sin soft delete) con ``column = :value``"""
+    return select(model).options(*options).where(
+        column == bindparam('value'), model.deleted_at.is_(None)
+    ).limit(1)
+
+
+# Nombre -> sentencia con el parámetro ``value``
+STATEMENTS = {
+    'user_by_id': _active(User, User.ID),
+    'user_by_run': _active(User, User.RunNormalized, joinedload(User.role)),
+    # RUN guardado que no se pudo normalizar (sin forma de RUT o duplicado): se busca tal cual
+    'user_by_legacy_run': _active(User, User.RUN, joinedload(User.role)).where(User.RunNormalized.is_(None)),
+    'user_with_role_by_id': _active(User, User.ID, joinedload(User.role)),
+    'client_by_id': _active(Client, Client.ID),
+    'client_by_run': _active(Client, Client.RunNormalized),
+    'vehicle_by_id': _active(Vehicle, Vehicle.ID, joinedload(Vehicle.client)),
+    'vehicle_by_plate': _active(Vehicle, Vehicle.PlateNormalized, joinedload(Vehicle.client)),
+    'work_order_by_id': _active(WorkOrder, WorkOrder.ID, joinedload(WorkOrder.vehicle), joinedload(WorkOrder.user)),
+}
+
+# ``Job.Result`` es diferido: la consulta de estado no lo lee, la descarga sí
+JOB_FOR_USER = select(Job).where(Job.ID == bindparam('job_id'), Job.UserID == bindparam('user_id')).limit(1)
+JOB_WITH_RESULT_FOR_USER = JOB_FOR_USER.options(undefer(Job.Result))
+
+
+def lookup(name, value):
+    """Primera fila de la sentencia ``name`` para ``value`` o None"""
+    if value is None:
+        return None
+    return db.session.scalars(STATEMENTS[name], {'value': value}).first()
+
+
+def job_for_user(job_id, user_id, with_result=False):
+    stmt = JOB_WITH_RESULT_FOR_USER if with_result else JOB_FOR_USER
+    return db.session.scalars(stmt, {'job_id': job_id, 'user_id': user_id}).first()
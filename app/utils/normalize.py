@@ -0,0 +1,57 @@
+"""
+Formas canónicas de identificadores escritos a mano (patentes y RUT).
+
+La forma canónica se guarda en una columna propia con índice único, así
+las búsquedas y las validaciones de duplicados comparan valores ya
+normalizados con una sola búsqueda en el índice.
+"""
+import re
+
+_NON_ALPHANUMERIC = re.compile(r'[^0-9A-Z]')
+
+
+def normalize_plate(value):
+    """``'ab-cd 12'`` -> ``'ABCD12'``; None si no queda ningún carácter"""
+    if value is None:
+        return None
+    plate = _NON_ALPHANUMERIC.sub('', str(value).upper())
+    return plate or None
+
+
+_RUN_FORMAT = re.compile(r'^(\d{1,9})([0-9K])$')
+
+
+def run_check_digit(body):
+    """Dígito verificador (módulo 11) del cuerpo numérico de un RUT"""
+    total = 0
+    factor = 2
+    for digit in reversed(str(body)):
+        total += int(digit) * factor
+        factor = 2 if factor == 7 else factor + 1
+    remainder = 11 - total % 11
+    return {11: '0', 10: 'K'}.get(remainder, str(remainder))
+
+
+def normalize_run(value):
+    """
+    ``'12.345.678-k'``, ``'12345678K'`` -> ``'12345678-K'``.
+
+    Quita puntos, espacios y ceros a la izquierda; no valida el dígito
+    verificador. None si no tiene forma de RUT.
+    """
+    if value is None:
+        return None
+    match = _RUN_FORMAT.match(re.sub(r'[\s.\-]', '', str(value)).upper())
+    if not match:
+        return None
+    body, check_digit = match.groups()
+    return f'{int(body)}-{check_digit}'
+
+
+def is_valid_run(value):
+    """True si ``value`` tiene forma de RUT y su dígito verificador es correcto"""
+    canonical = normalize_run(value)
+    if canonical is None:
+        return False
+    body, check_digit = canonical.split('-')
+    return int(body) > 0 and run_check_digit(body) == check_digit
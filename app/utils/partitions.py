@@ -0,0 +1,183 @@
+"""
+Particionado mensual de ``work_orders`` por ``OrderDate`` en PostgreSQL.
+
+La tabla se convierte una vez con ``migrations/partition_work_orders.py``;
+después basta con llamar periódicamente a ``ensure_future_partitions`` (el
+mismo script lo hace) para tener creadas las particiones de los próximos
+meses. Una partición DEFAULT recibe cualquier fecha fuera de rango, así que
+un insert nunca falla por falta de partición.
+
+En SQLite (u otro motor) todas las funciones son no-op: ``work_orders`` sigue
+siendo una tabla normal con índice sobre ``OrderDate``.
+"""
+from datetime import date
+from sqlalchemy import text
+from app import db
+
+TABLE = 'work_orders'
+DEFAULT_PARTITION = 'work_orders_default'
+LEGACY_TABLE = 'work_orders_unpartitioned'
+
+
+def supports_partitioning():
+    return db.engine.dialect.name == 'postgresql'
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f'{TABLE}_y{month.year}m{month.month:02d}'
+
+
+def is_partitioned():
+    if not supports_partitioning():
+        return False
+    return db.session.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table pt "
+        "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = :name)"
+    ), {'name': TABLE}).scalar()
+
+
+def existing_partitions():
+    """Nombres de las particiones actuales de ``work_orders``"""
+    if not is_partitioned():
+        return []
+    return db.session.execute(text(
+        "SELECT child.relname FROM pg_inherits i "
+        "JOIN pg_class parent ON parent.oid = i.inhparent "
+        "JOIN pg_class child ON child.oid = i.inhrelid "
+        "WHERE parent.relname = :name ORDER BY child.relname"
+    ), {'name': TABLE}).scalars().all()
+
+
+def ensure_month_partition(month):
+    """
+    Crear la partición del mes de ``month`` si no existe.
+
+    Si la partición DEFAULT ya tiene filas de ese mes, se mueven a la nueva
+    partición (PostgreSQL no permite crearla mientras existan).
+    """
+    month = month_start(month)
+    name = partition_name(month)
+    if name in existing_partitions():
+        return False
+
+    bounds = {'start': month, 'end': add_months(month, 1)}
+    in_range = '"OrderDate" >= :start AND "OrderDate" < :end'
+    pending = db.session.execute(
+        text(f'SELECT COUNT(*) FROM {DEFAULT_PARTITION} WHERE {in_range}'), bounds
+    ).scalar()
+
+    if pending:
+        db.session.execute(text(f'ALTER TABLE {TABLE} DETACH PARTITION {DEFAULT_PARTITION}'))
+
+    db.session.execute(text(
+        f"CREATE TABLE {name} PARTITION OF {TABLE} "
+        f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+    ))
+
+    if pending:
+        db.session.execute(text(f'INSERT INTO {TABLE} SELECT * FROM {DEFAULT_PARTITION} WHERE {in_range}'), bounds)
+        db.session.execute(text(f'DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}'), bounds)
+        db.session.execute(text(f'ALTER TABLE {TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT'))
+
+    db.session.commit()
+    return True
+
+
+def ensure_future_partitions(months_ahead=3, today=None):
+    """Crear las particiones del mes actual y los ``months_ahead`` siguientes"""
+    if not is_partitioned():
+        return []
+
+    current = month_start(today or date.today())
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if ensure_month_partition(month):
+            created.append(partition_name(month))
+    return created
+
+
+def _model_indexes():
+    """``(nombre, columnas)`` de los índices declarados en el modelo de ``work_orders``"""
+    table = db.metadata.tables[TABLE]
+    return [
+        (index.name, ', '.join(f'"{column.name}"' for column in index.columns))
+        for index in sorted(table.indexes, key=lambda index: index.name)
+    ]
+
+
+def _legacy_name(name):
+    return name.replace(TABLE, LEGACY_TABLE, 1)
+
+
+def migrate_to_partitioned(months_ahead=3):
+    """
+    Convertir ``work_orders`` en una tabla particionada por mes.
+
+    La tabla original queda renombrada como ``work_orders_unpartitioned``
+    para poder volver atrás; se puede eliminar tras verificar los datos.
+    Toda la conversión ocurre en una transacción (bloquea la tabla mientras
+    se copian las filas).
+    """
+    if not supports_partitioning():
+        raise RuntimeError('El particionado solo está disponible en PostgreSQL')
+    if is_partitioned():
+        return ensure_future_partitions(months_ahead)
+
+    session = db.session
+    session.execute(text(f'LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE'))
+    session.execute(text(f'ALTER TABLE {TABLE} RENAME TO {LEGACY_TABLE}'))
+    # Los nombres de índice son únicos por esquema: liberar los de la tabla original
+    session.execute(text(f'ALTER INDEX IF EXISTS "{TABLE}_pkey" RENAME TO "{LEGACY_TABLE}_pkey"'))
+    indexes = _model_indexes()
+    for name, _ in indexes:
+        session.execute(text(f'ALTER INDEX IF EXISTS "{name}" RENAME TO "{_legacy_name(name)}"'))
+
+    # La clave primaria de una tabla particionada debe incluir la columna de partición
+    session.execute(text(
+        f'CREATE TABLE {TABLE} (LIKE {LEGACY_TABLE} INCLUDING DEFAULTS) PARTITION BY RANGE ("OrderDate")'
+    ))
+    session.execute(text(f'ALTER TABLE {TABLE} ADD CONSTRAINT "{TABLE}_pkey" PRIMARY KEY ("ID", "OrderDate")'))
+    session.execute(text(
+        f'ALTER TABLE {TABLE} ADD CONSTRAINT "{TABLE}_VehicleID_fkey" '
+        f'FOREIGN KEY ("VehicleID") REFERENCES vehicles ("ID")'
+    ))
+    session.execute(text(
+        f'ALTER TABLE {TABLE} ADD CONSTRAINT "{TABLE}_UserID_fkey" '
+        f'FOREIGN KEY ("UserID") REFERENCES users ("ID")'
+    ))
+    # Índices del modelo (OrderDate, updated_at del feed de cambios...) en la tabla nueva
+    for name, columns in indexes:
+        session.execute(text(f'CREATE INDEX "{name}" ON {TABLE} ({columns})'))
+    session.execute(text(f'CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT'))
+
+    # Una partición por cada mes con datos, más los meses futuros
+    first, last = session.execute(text(f'SELECT MIN("OrderDate"), MAX("OrderDate") FROM {LEGACY_TABLE}')).one()
+    current = month_start(date.today())
+    month = month_start(first) if first else current
+    last = max(month_start(last) if last else current, add_months(current, months_ahead))
+    while month <= last:
+        session.execute(text(
+            f"CREATE TABLE {partition_name(month)} PARTITION OF {TABLE} "
+            f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+        ))
+        month = add_months(month, 1)
+
+    session.execute(text(f'INSERT INTO {TABLE} SELECT * FROM {LEGACY_TABLE}'))
+
+    # La secuencia del ID pasa a pertenecer a la nueva tabla
+    sequence = session.execute(text(f"SELECT pg_get_serial_sequence('{LEGACY_TABLE}', 'ID')")).scalar()
+    if sequence:
+        session.execute(text(f'ALTER SEQUENCE {sequence} OWNED BY {TABLE}."ID"'))
+
+    session.commit()
+    return existing_partitions()
@@ -0,0 +1,140 @@
+"""
+Política de hash de contraseñas y pool acotado para calcularlos.
+
+``PASSWORD_HASH_METHOD`` define el método y el costo con la sintaxis de
+werkzeug (``pbkdf2:sha256:600000``, ``scrypt:32768:8:1``...). Al iniciar
+sesión, si el hash guardado usa otros parámetros, se recalcula con la
+política vigente (la contraseña en claro solo está disponible en ese
+momento).
+
+Las verificaciones y los hashes corren en un pool de
+``PASSWORD_VERIFY_WORKERS`` hilos (pbkdf2 y scrypt de ``hashlib`` liberan el
+GIL, así los hilos usan varios núcleos). Con más de
+``PASSWORD_VERIFY_MAX_QUEUE`` tareas en espera se lanza ``PasswordPoolBusy``
+y el login responde ``503`` en lugar de acumular CPU pendiente.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class PasswordPoolBusy(RuntimeError):
+    """Demasiadas verificaciones de contraseña en espera"""
+
+
+def hash_method(pwhash):
+    """``'pbkdf2:sha256:600000$sal$hash'`` -> ``'pbkdf2:sha256:600000'``"""
+    return (pwhash or '').split('$', 1)[0]
+
+
+def needs_rehash(pwhash, method):
+    return hash_method(pwhash) != method
+
+
+class PasswordPool:
+    """Hilos acotados para hashes de contraseña, con métricas de la cola"""
+
+    def __init__(self, method, workers=0, max_queue=32, timeout=10.0):
+        self.method = method
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password')
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._max_queue_depth = 0
+        self._counts = {'completed': 0, 'rejected': 0, 'rehashed': 0}
+        self._wait_seconds = 0.0
+        self._work_seconds = 0.0
+
+    def _run(self, function, *args):
+        with self._lock:
+            # Cupo: un hash en curso por hilo más ``max_queue`` esperando
+            if self._pending >= self.workers + self.max_queue:
+                self._counts['rejected'] += 1
+                raise PasswordPoolBusy('Demasiadas contraseñas en proceso, intente nuevamente')
+            self._pending += 1
+            self._max_queue_depth = max(self._max_queue_depth, self._pending - self._running)
+
+        submitted = time.perf_counter()
+
+        def task():
+            started = time.perf_counter()
+            with self._lock:
+                self._running += 1
+                self._wait_seconds += started - submitted
+            try:
+                return function(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._pending -= 1
+                    self._counts['completed'] += 1
+                    self._work_seconds += time.perf_counter() - started
+
+        try:
+            return self._executor.submit(task).result(timeout=self.timeout)
+        except FuturesTimeout:
+            # La tarea sigue en el pool y libera su cupo al terminar
+            with self._lock:
+                self._counts['rejected'] += 1
+            raise PasswordPoolBusy('El proceso de la contraseña tardó demasiado, intente nuevamente') from None
+
+    def verify(self, pwhash, password):
+        return self._run(check_password_hash, pwhash, password)
+
+    def hash(self, password):
+        """Hash con la política vigente"""
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify_and_update(self, pwhash, password):
+        """
+        ``(válida, nuevo_hash)``; ``nuevo_hash`` es None salvo que la
+        contraseña sea válida y el hash use otros parámetros que la política.
+        """
+        if not self.verify(pwhash, password):
+            return False, None
+        if not needs_rehash(pwhash, self.method):
+            return True, None
+        new_hash = self.hash(password)
+        with self._lock:
+            self._counts['rehashed'] += 1
+        return True, new_hash
+
+    def stats(self):
+        with self._lock:
+            completed = self._counts['completed']
+            return {
+                'method': self.method,
+                'workers': self.workers,
+                'max_queue': self.max_queue,
+                'running': self._running,
+                'queue_depth': self._pending - self._running,
+                'max_queue_depth': self._max_queue_depth,
+                **self._counts,
+                'avg_wait_ms': round(self._wait_seconds / completed * 1000, 3) if completed else 0.0,
+                'avg_hash_ms': round(self._work_seconds / completed * 1000, 3) if completed else 0.0,
+            }
+
+
+def init_passwords(app):
+    config = app.config
+    app.extensions['password_pool'] = PasswordPool(
+        config['PASSWORD_HASH_METHOD'],
+        workers=config['PASSWORD_VERIFY_WORKERS'],
+        max_queue=config['PASSWORD_VERIFY_MAX_QUEUE'],
+        timeout=config['PASSWORD_VERIFY_TIMEOUT']
+    )
+
+
+def get_password_pool(app=None):
+    return (app or current_app).extensions['password_pool']
+
+
+def hash_password(password):
+    """Hash de ``password`` con ``PASSWORD_HASH_METHOD`` en el pool"""
+    return get_password_pool().hash(password)
@@ -0,0 +1,253 @@
+"""
+Perfilado bajo demanda de una petición (solo Administrador).
+
+Una petición con el header ``X-Profile: 1`` o ``?profile=1`` y un token de
+Administrador se ejecuta con:
+
+- ``cProfile``: estadísticas por función (formato ``pstats``, se abre con
+  ``python -m pstats``, snakeviz...).
+- Un muestreo de la pila del hilo de la petición cada
+  ``PROFILING_SAMPLE_SECONDS``, en formato de pilas colapsadas
+  (``flamegraph.pl``, speedscope, ``inferno``...).
+- La línea de tiempo de las sentencias SQL (inicio y duración relativos al
+  inicio de la petición, sin parámetros).
+
+La respuesta lleva ``X-Profile-Id`` y el resultado se consulta en
+``GET /api/profiles/<id>``. Cada proceso guarda los últimos
+``PROFILING_KEEP`` perfiles en memoria y, con ``PROFILING_DIR``, también los
+escribe en disco (``<id>.pstats``, ``<id>.collapsed``, ``<id>.sql.json``).
+
+Sin el header ni el parámetro solo se revisan dos claves de la petición: no
+hay profiler, hilo de muestreo ni listeners de SQL activos. Con el flag y un
+token que no es de Administrador la petición se atiende normalmente. Las
+sub-peticiones de ``/api/batch`` no se perfilan por separado (un solo
+``cProfile`` activo por hilo); en modo ASGI las peticiones con el flag las
+atiende la app Flask.
+"""
+import cProfile
+import io
+import json
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from datetime import datetime
+from flask import current_app, g, request
+from sqlalchemy import event
+from app.utils.batch import is_subrequest
+
+HEADER = 'X-Profile'
+QUERY_ARG = 'profile'
+ID_HEADER = 'X-Profile-Id'
+ALLOWED_ROLES = ('Administrador',)
+FORMATS = ('json', 'text', 'pstats', 'collapsed')
+
+
+class ProfileStore:
+    """Últimos perfiles del proceso (y copia en disco si hay ``directory``)"""
+
+    def __init__(self, keep=20, directory=None):
+        self.keep = keep
+        self.directory = directory
+        self._profiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile):
+        with self._lock:
+            self._profiles[profile['id']] = profile
+            while len(self._profiles) > self.keep:
+                self._profiles.popitem(last=False)
+        if self.directory:
+            self._write(profile)
+
+    def get(self, profile_id):
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def summaries(self):
+        with self._lock:
+            profiles = list(self._profiles.values())
+        return [profile['summary'] for profile in reversed(profiles)]
+
+    def _write(self, profile):
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, profile['id'])
+        with open(base + '.pstats', 'wb') as f:
+            f.write(profile['pstats'])
+        with open(base + '.collapsed', 'w', encoding='utf-8') as f:
+            f.write(profile['collapsed'])
+        with open(base + '.sql.json', 'w', encoding='utf-8') as f:
+            json.dump({**profile['summary'], 'sql': profile['sql']}, f, ensure_ascii=False, indent=2)
+
+
+class StackSampler(threading.Thread):
+    """Muestreo de la pila de un hilo en formato de pilas colapsadas"""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(name='profile-sampler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(names))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def collapsed(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+class RequestProfile:
+    """cProfile, muestreo de pila y SQL de la petición actual"""
+
+    def __init__(self, engines, sample_seconds):
+        self.id = uuid.uuid4().hex[:16]
+        self.thread_id = threading.get_ident()
+        self.engines = list(engines)
+        self.sql = []
+        self.started = time.perf_counter()
+        self.created_at = datetime.utcnow()
+        self.profiler = cProfile.Profile()
+        self.sampler = StackSampler(self.thread_id, sample_seconds)
+        self._stopped = False
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() == self.thread_id:
+            conn.info.setdefault('profile_started', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() != self.thread_id:
+            return
+        pending = conn.info.get('profile_started')
+        if not pending:
+            return
+        started = pending.pop()
+        self.sql.append({
+            'start_ms': round((started - self.started) * 1000, 3),
+            'duration_ms': round((time.perf_counter() - started) * 1000, 3),
+            'statement': statement,
+            'executemany': executemany,
+            'rowcount': cursor.rowcount,
+        })
+
+    def start(self):
+        for engine in self.engines:
+            event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+        self.sampler.start()
+        self.profiler.enable()
+
+    def stop(self, status_code=None):
+        """Detener y devolver el perfil (None si ya se detuvo)"""
+        if self._stopped:
+            return None
+        self._stopped = True
+        self.profiler.disable()
+        duration = time.perf_counter() - self.started
+        self.sampler.stop()
+        for engine in self.engines:
+            event.remove(engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.remove(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+        self.profiler.create_stats()
+        # pstats.Stats vacía ``profiler.stats``: serializar antes
+        raw_stats = marshal.dumps(self.profiler.stats)
+        text = io.StringIO()
+        pstats.Stats(self.profiler, stream=text).sort_stats('cumulative').print_stats(40)
+        return {
+            'id': self.id,
+            'summary': {
+                'id': self.id,
+                'method': request.method,
+                'path': request.full_path.rstrip('?'),
+                'status': status_code,
+                'duration_ms': round(duration * 1000, 3),
+                'sql_statements': len(self.sql),
+                'sql_ms': round(sum(entry['duration_ms'] for entry in self.sql), 3),
+                'samples': sum(self.sampler.stacks.values()),
+                'created_at': self.created_at.isoformat(),
+            },
+            'pstats': raw_stats,
+            'text': text.getvalue(),
+            'collapsed': self.sampler.collapsed(),
+            'sql': self.sql,
+        }
+
+
+def profile_requested():
+    return request.headers.get(HEADER) == '1' or request.args.get(QUERY_ARG) == '1'
+
+
+def _is_admin():
+    from flask_jwt_extended import get_jwt, verify_jwt_in_request
+    from app.utils.auth import claims_role
+
+    try:
+        if verify_jwt_in_request(optional=True) is None:
+            return False
+        return claims_role(get_jwt()) in ALLOWED_ROLES
+    except Exception:
+        # Token inválido: la ruta responde su propio error sin perfilar
+        return False
+
+
+def init_profiling(app):
+    """Registrar el perfilado bajo demanda si ``PROFILING_ENABLED``"""
+    if not app.config['PROFILING_ENABLED']:
+        return
+
+    from app import db
+
+    store = ProfileStore(app.config['PROFILING_KEEP'], app.config['PROFILING_DIR'])
+    app.extensions['profiles'] = store
+
+    @app.before_request
+    def _start_profile():
+        if not profile_requested() or request.endpoint is None or request.endpoint.startswith('main.profile'):
+            return None
+        # Ya perfilada, o sub-petición de un batch: cProfile.enable() reemplazaría al profiler activo
+        if g.get('request_profile') is not None or is_subrequest(request.environ):
+            return None
+        if not _is_admin():
+            return None
+        g.request_profile = RequestProfile(db.engines.values(), current_app.config['PROFILING_SAMPLE_SECONDS'])
+        g.request_profile.start()
+        return None
+
+    @app.after_request
+    def _finish_profile(response):
+        profile = g.get('request_profile')
+        if profile is not None:
+            result = profile.stop(response.status_code)
+            if result is not None:
+                store.add(result)
+                response.headers[ID_HEADER] = result['id']
+        return response
+
+    @app.teardown_request
+    def _discard_profile(exc):
+        # Excepción sin respuesta: detener el profiler y quitar los listeners
+        profile = g.pop('request_profile', None)
+        if profile is not None:
+            profile.stop()
+
+
+def get_profiles(app=None):
+    return (app or current_app).extensions.get('profiles')
@@ -0,0 +1,71 @@
+"""
+Conteo de sentencias SQL emitidas a través de un engine de SQLAlchemy.
+
+Permite declarar un presupuesto de consultas para un bloque de código o un
+endpoint y fallar con la lista de sentencias capturadas cuando se excede,
+para detectar problemas N+1 (por ejemplo, accesos lazy a ``order.vehicle``).
+"""
+from contextlib import contextmanager
+from sqlalchemy import event
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Se emitieron más sentencias SQL que las permitidas por el presupuesto"""
+
+    def __init__(self, budget, statements):
+        self.budget = budget
+        self.statements = list(statements)
+        lines = [f'  {i}. {sql}' for i, sql in enumerate(self.statements, start=1)]
+        message = (
+            f'Se esperaban como máximo {budget} sentencias SQL, '
+            f'se ejecutaron {len(self.statements)}:\n' + '\n'.join(lines)
+        )
+        super().__init__(message)
+
+
+class QueryRecorder:
+    """Acumula las sentencias ejecutadas mientras está activo"""
+
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def __len__(self):
+        return len(self.statements)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(' '.join(statement.split()))
+
+
+@contextmanager
+def count_queries(engine):
+    """
+    Registrar todas las sentencias SQL ejecutadas por ``engine`` dentro del bloque.
+
+        with count_queries(db.engine) as recorder:
+            ...
+        print(recorder.count, recorder.statements)
+    """
+    recorder = QueryRecorder()
+    event.listen(engine, 'before_cursor_execute', recorder._before_cursor_execute)
+    try:
+        yield recorder
+    finally:
+        event.remove(engine, 'before_cursor_execute', recorder._before_cursor_execute)
+
+
+@contextmanager
+def assert_max_queries(engine, budget):
+    """
+    Fallar con ``QueryBudgetExceeded`` si el bloque ejecuta más de ``budget`` sentencias.
+
+        with assert_max_queries(db.engine, 2):
+            client.get('/api/work-orders', headers=headers)
+    """
+    with count_queries(engine) as recorder:
+        yield recorder
+    if recorder.count > budget:
+        raise QueryBudgetExceeded(budget, recorder.statements)
@@ -0,0 +1,159 @@
+"""
+Mantenimiento del modelo de lectura ``work_order_listings``.
+
+Cada flush que crea o modifica órdenes, o cambia la patente de un vehículo,
+el nombre de un cliente o el de un técnico, recalcula las filas afectadas
+con un ``DELETE`` + ``INSERT ... SELECT`` dentro de la misma transacción: si
+la escritura se revierte, el modelo de lectura también.
+
+Las escrituras con SQL directo (archivado, scripts) deben llamar a
+``refresh_listings``/``delete_listings`` o reconstruir con
+``python -m migrations.rebuild_work_order_listings``.
+"""
+from flask_sqlalchemy.session import Session
+from sqlalchemy import delete, event, func, inspect, insert, or_, select
+from app.models import Client, User, Vehicle, WorkOrder, WorkOrderListing
+
+LISTING = WorkOrderListing.__table__
+COLUMNS = [column.name for column in LISTING.columns]
+
+# Clave de refresco -> columna equivalente en la consulta de origen
+SOURCE_KEYS = {
+    'ID': WorkOrder.ID,
+    'VehicleID': WorkOrder.VehicleID,
+    'ClientID': Vehicle.ClientID,
+    'UserID': WorkOrder.UserID,
+}
+
+# Cambios en estas columnas afectan las filas de los listados
+_WATCHED = (
+    (Vehicle, 'VehicleID', ('LicensePlate', 'ClientID')),
+    (Client, 'ClientID', ('FirstName', 'LastName')),
+    (User, 'UserID', ('FirstName', 'LastName')),
+)
+
+
+def source_select():
+    """Filas de ``work_order_listings`` calculadas desde las tablas normalizadas"""
+    return select(
+        WorkOrder.ID,
+        WorkOrder.OrderDate,
+        WorkOrder.Status,
+        WorkOrder.Description,
+        WorkOrder.VehicleID,
+        Vehicle.LicensePlate,
+        Vehicle.ClientID,
+        (Client.FirstName + ' ' + Client.LastName).label('ClientName'),
+        WorkOrder.UserID,
+        (User.FirstName + ' ' + User.LastName).label('TechnicianName'),
+        WorkOrder.created_at,
+        WorkOrder.updated_at,
+        WorkOrder.deleted_at
+    ).select_from(WorkOrder).outerjoin(
+        Vehicle, Vehicle.ID == WorkOrder.VehicleID
+    ).outerjoin(
+        Client, Client.ID == Vehicle.ClientID
+    ).outerjoin(
+        User, User.ID == WorkOrder.UserID
+    )
+
+
+def refresh_listings(session, key, values):
+    """Recalcular las filas cuyo ``key`` (ID, VehicleID, ClientID o UserID) está en ``values``"""
+    values = list(values)
+    if not values:
+        return
+    session.execute(delete(LISTING).where(LISTING.c[key].in_(values)))
+    session.execute(insert(LISTING).from_select(COLUMNS, source_select().where(SOURCE_KEYS[key].in_(values))))
+
+
+def delete_listings(session, ids):
+    ids = list(ids)
+    if ids:
+        session.execute(delete(LISTING).where(LISTING.c.ID.in_(ids)))
+
+
+def _changed(obj, attributes):
+    state = inspect(obj)
+    return any(state.attrs[name].history.has_changes() for name in attributes)
+
+
+@event.listens_for(Session, 'after_flush')
+def _refresh_work_order_listings(session, flush_context):
+    changes = {key: set() for key in SOURCE_KEYS}
+    removed = set()
+
+    for obj in session.new:
+        if isinstance(obj, WorkOrder):
+            changes['ID'].add(obj.ID)
+
+    for obj in session.dirty:
+        if isinstance(obj, WorkOrder):
+            if session.is_modified(obj):
+                changes['ID'].add(obj.ID)
+            continue
+        for model, key, attributes in _WATCHED:
+            if isinstance(obj, model) and _changed(obj, attributes):
+                changes[key].add(obj.ID)
+
+    for obj in session.deleted:
+        if isinstance(obj, WorkOrder):
+            removed.add(obj.ID)
+
+    delete_listings(session, removed)
+    for key, values in changes.items():
+        refresh_listings(session, key, values)
+
+
+# ========================================
+# VERIFICACIÓN Y RECONSTRUCCIÓN
+# ========================================
+
+def check_listings(session, sample_size=20):
+    """
+    Comparar ``work_order_listings`` con las tablas normalizadas.
+
+    Retorna ``{'missing': [...], 'orphaned': [...], 'stale': [...]}`` con hasta
+    ``sample_size`` IDs de ejemplo por tipo y los totales en ``counts``.
+    """
+    source = source_select().subquery()
+    listing_ids = select(LISTING.c.ID)
+    source_ids = select(WorkOrder.ID)
+
+    queries = {
+        'missing': select(WorkOrder.ID).where(WorkOrder.ID.not_in(listing_ids)),
+        'orphaned': select(LISTING.c.ID).where(LISTING.c.ID.not_in(source_ids)),
+        'stale': select(LISTING.c.ID).join(source, source.c.ID == LISTING.c.ID).where(or_(*[
+            LISTING.c[name].is_distinct_from(source.c[name]) for name in COLUMNS if name != 'ID'
+        ])),
+    }
+
+    report = {'counts': {}}
+    for name, query in queries.items():
+        report['counts'][name] = session.scalar(select(func.count()).select_from(query.subquery()))
+        report[name] = session.scalars(query.order_by(query.selected_columns[0]).limit(sample_size)).all()
+    return report
+
+
+def rebuild_listings(session, batch_size=1000):
+    """
+    Reconstruir ``work_order_listings`` en lotes de ``batch_size`` órdenes.
+
+    Cada lote se confirma por separado; retorna la cantidad de filas escritas.
+    """
+    written = 0
+    last_id = 0
+    while True:
+        ids = session.scalars(
+            select(WorkOrder.ID).where(WorkOrder.ID > last_id).order_by(WorkOrder.ID).limit(batch_size)
+        ).all()
+        if not ids:
+            break
+        refresh_listings(session, 'ID', ids)
+        session.commit()
+        written += len(ids)
+        last_id = ids[-1]
+
+    session.execute(delete(LISTING).where(LISTING.c.ID.not_in(select(WorkOrder.ID))))
+    session.commit()
+    return written
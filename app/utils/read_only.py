@@ -0,0 +1,125 @@
+"""
+Modo de solo lectura para las rutas GET del blueprint ``main``.
+
+Según ``READ_ONLY_GET_MODE``, las peticiones GET/HEAD del blueprint usan:
+
+- ``read_only`` (por defecto): cada transacción empieza con ``SET
+  TRANSACTION READ ONLY`` en PostgreSQL (sin bloqueos de escritura ni
+  asignación de XID); en otros motores no se envía nada.
+- ``autocommit``: la conexión se pide en modo ``AUTOCOMMIT``, sin ``BEGIN``
+  ni ``COMMIT``/``ROLLBACK`` alrededor de las consultas.
+- ``off``: la sesión de siempre.
+
+En ambos modos la sesión no hace autoflush ni expira objetos al confirmar, y
+cualquier flush o ``insert()``/``update()``/``delete()`` ejecutado con la
+sesión lanza ``ReadOnlyRequestError``. Las rutas GET que escriben
+(``/api/init-data``, ``/api/reset-db``...) se marcan con ``@read_write``.
+
+``fetch_dicts`` ejecuta una sentencia de columnas y devuelve diccionarios
+desde las filas de Core, sin crear instancias del ORM ni registrarlas en el
+mapa de identidad.
+"""
+from functools import wraps
+from flask import current_app, g, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+READ_ONLY = 'read_only'
+AUTOCOMMIT = 'autocommit'
+OFF = 'off'
+MODES = (READ_ONLY, AUTOCOMMIT, OFF)
+
+BLUEPRINT = 'main'
+READ_METHODS = ('GET', 'HEAD')
+INFO_KEY = 'read_only'
+
+# Engine -> variante con isolation_level AUTOCOMMIT (comparte el pool)
+_autocommit_engines = {}
+
+
+class ReadOnlyRequestError(RuntimeError):
+    """Intento de escritura en una petición de solo lectura"""
+
+
+def read_write(view):
+    """Excluir una ruta GET del modo de solo lectura (rutas que escriben)"""
+    view.read_only = False
+    return view
+
+
+def _view_is_read_only():
+    view = current_app.view_functions.get(request.endpoint)
+    return getattr(view, 'read_only', True)
+
+
+def init_read_only(app):
+    """Registrar el modo de solo lectura según ``READ_ONLY_GET_MODE``"""
+    mode = app.config['READ_ONLY_GET_MODE']
+    if mode not in MODES:
+        raise ValueError(f'READ_ONLY_GET_MODE debe ser uno de {", ".join(MODES)}')
+    if mode == OFF:
+        return
+
+    from app import db
+
+    @app.before_request
+    def _begin_read_only():
+        if request.blueprint != BLUEPRINT or request.method not in READ_METHODS or not _view_is_read_only():
+            return None
+        session = db.session()
+        idle = not session.in_transaction()
+        # Con una transacción ya abierta (sesión compartida) no se cambia de conexión
+        session.info[INFO_KEY] = mode if idle else READ_ONLY
+        g.read_only_session = (session, idle, session.autoflush, session.expire_on_commit)
+        session.autoflush = False
+        session.expire_on_commit = False
+        return None
+
+    @app.teardown_request
+    def _end_read_only(exc):
+        state = g.pop('read_only_session', None)
+        if state is None:
+            return
+        session, idle, autoflush, expire_on_commit = state
+        # La transacción de solo lectura no tiene nada que confirmar
+        if idle and session.in_transaction():
+            session.rollback()
+        session.info.pop(INFO_KEY, None)
+        session.autoflush = autoflush
+        session.expire_on_commit = expire_on_commit
+
+
+def bind_for(session, engine):
+    """Engine que debe usar ``session`` (variante AUTOCOMMIT en ese modo)"""
+    if session.info.get(INFO_KEY) != AUTOCOMMIT:
+        return engine
+    autocommit = _autocommit_engines.get(engine)
+    if autocommit is None:
+        autocommit = _autocommit_engines[engine] = engine.execution_options(isolation_level='AUTOCOMMIT')
+    return autocommit
+
+
+@event.listens_for(Session, 'after_begin')
+def _set_transaction_read_only(session, transaction, connection):
+    if session.info.get(INFO_KEY) == READ_ONLY and connection.dialect.name == 'postgresql':
+        connection.exec_driver_sql('SET TRANSACTION READ ONLY')
+
+
+@event.listens_for(Session, 'before_flush')
+def _reject_flush(session, flush_context, instances):
+    if session.info.get(INFO_KEY) and (session.new or session.dirty or session.deleted):
+        raise ReadOnlyRequestError('Esta petición es de solo lectura')
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _reject_dml(orm_execute_state):
+    # ``insert()``/``update()``/``delete()`` ejecutados con la sesión no pasan por el flush
+    if orm_execute_state.session.info.get(INFO_KEY) and (
+            orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        raise ReadOnlyRequestError('Esta petición es de solo lectura')
+
+
+def fetch_dicts(statement):
+    """Filas de ``statement`` (select de columnas) como diccionarios, sin objetos del ORM"""
+    from app import db
+    return [dict(row) for row in db.session.execute(statement).mappings()]
@@ -0,0 +1,170 @@
+"""
+Enrutamiento de lecturas a una réplica de la base de datos.
+
+Si ``SQLALCHEMY_BINDS`` define el bind ``replica`` (variable de entorno
+``DATABASE_REPLICA_URL``), las peticiones GET/HEAD leen de la réplica y todo
+lo demás va al primario:
+
+- Cualquier flush dentro de la petición fija la sesión al primario
+  (lectura de las propias escrituras dentro de la misma petición).
+- Tras escribir, el mismo usuario lee del primario durante
+  ``REPLICA_STICKY_SECONDS`` (por proceso).
+- El header ``X-DB-Target: primary`` o el decorador ``use_primary`` fuerzan
+  el primario para una petición.
+- Si el retraso de la réplica supera ``REPLICA_MAX_LAG_SECONDS`` (o no se
+  puede medir), se lee del primario.
+"""
+import time
+from functools import wraps
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+from app.utils.read_only import bind_for
+
+REPLICA_BIND = 'replica'
+PRIMARY = 'primary'
+REPLICA = 'replica'
+OVERRIDE_HEADER = 'X-DB-Target'
+
+# Retraso de la réplica: (momento de la medición, segundos de retraso)
+_lag_cache = {'checked_at': None, 'lag': None}
+
+# Identidad JWT -> momento de su última escritura
+_recent_writers = {}
+_MAX_TRACKED_WRITERS = 10000
+
+
+class RoutingSession(Session):
+    """Sesión que envía las lecturas de peticiones GET a la réplica"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not self.info.get('wrote') and _reads_from_replica():
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                return bind_for(self, engine)
+        return bind_for(self, super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs))
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_write(session, flush_context):
+    session.info['wrote'] = True
+    if has_request_context():
+        _remember_writer()
+
+
+def use_primary(view):
+    """Forzar lecturas desde el primario en una ruta (read-your-writes)"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.db_target = PRIMARY
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def current_db_target():
+    """``'replica'`` o ``'primary'`` para la petición actual"""
+    return REPLICA if _reads_from_replica() else PRIMARY
+
+
+def _reads_from_replica():
+    if not has_request_context():
+        return False
+    if 'db_target' not in g:
+        g.db_target = _choose_target()
+    return g.db_target == REPLICA
+
+
+def _choose_target():
+    return choose_target(request.method, request.headers, _current_identity())
+
+
+def choose_target(method, headers, identity):
+    """
+    ``'replica'`` o ``'primary'`` para una petición; requiere contexto de
+    aplicación. También lo usan las rutas ASGI, que no pasan por Flask.
+    """
+    config = current_app.config
+    if REPLICA_BIND not in (config.get('SQLALCHEMY_BINDS') or {}):
+        return PRIMARY
+    if method not in ('GET', 'HEAD'):
+        return PRIMARY
+    if (headers.get(OVERRIDE_HEADER) or '').lower() == PRIMARY:
+        return PRIMARY
+    if _wrote_recently(identity, config['REPLICA_STICKY_SECONDS']):
+        return PRIMARY
+    if not replica_is_fresh():
+        return PRIMARY
+    return REPLICA
+
+
+# ========================================
+# READ-YOUR-WRITES ENTRE PETICIONES
+# ========================================
+
+def _current_identity():
+    try:
+        from flask_jwt_extended import get_jwt_identity
+        return get_jwt_identity()
+    except Exception:
+        # Rutas sin @jwt_required() (login, registro, init-db)
+        return None
+
+
+def _remember_writer():
+    identity = _current_identity()
+    if identity is None:
+        return
+
+    now = time.monotonic()
+    if len(_recent_writers) >= _MAX_TRACKED_WRITERS:
+        window = current_app.config['REPLICA_STICKY_SECONDS']
+        for key, written_at in list(_recent_writers.items()):
+            if now - written_at > window:
+                del _recent_writers[key]
+    _recent_writers[identity] = now
+
+
+def _wrote_recently(identity, window):
+    if identity is None:
+        return False
+    written_at = _recent_writers.get(identity)
+    return written_at is not None and time.monotonic() - written_at <= window
+
+
+# ========================================
+# CONTROL DE RETRASO DE LA RÉPLICA
+# ========================================
+
+def replica_lag_seconds(engine):
+    """Segundos de retraso de la réplica (0 si no es una réplica de PostgreSQL)"""
+    if engine.dialect.name != 'postgresql':
+        return 0.0
+
+    with engine.connect() as conn:
+        lag = conn.execute(text(
+            "SELECT CASE "
+            "WHEN NOT pg_is_in_recovery() THEN 0 "
+            "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+            "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+            "END"
+        )).scalar()
+    return float(lag)
+
+
+def replica_is_fresh():
+    """Medición cacheada por ``REPLICA_LAG_CHECK_INTERVAL`` segundos"""
+    config = current_app.config
+    now = time.monotonic()
+    checked_at = _lag_cache['checked_at']
+
+    if checked_at is None or now - checked_at > config['REPLICA_LAG_CHECK_INTERVAL']:
+        from app import db
+        try:
+            lag = replica_lag_seconds(db.engines[REPLICA_BIND])
+        except Exception:
+            # Réplica caída o inaccesible: leer del primario
+            lag = float('inf')
+        _lag_cache['checked_at'] = now
+        _lag_cache['lag'] = lag
+
+    return _lag_cache['lag'] <= config['REPLICA_MAX_LAG_SECONDS']
@@ -0,0 +1,199 @@
+"""
+Revocación de tokens JWT por ``jti`` (logout).
+
+Las revocaciones se guardan en ``revoked_tokens``. Cada proceso mantiene en
+memoria un filtro de Bloom con todos los ``jti`` revocados y no expirados, y
+un conjunto exacto con hasta ``REVOCATION_EXACT_MAX`` de ellos:
+
+- Si el ``jti`` no está en el filtro, el token no está revocado (el caso
+  común, sin consultar la base de datos).
+- Si está en el filtro y en el conjunto, está revocado.
+- Si está en el filtro pero no en el conjunto (falso positivo del filtro o
+  conjunto lleno), se consulta la tabla.
+
+Las revocaciones del mismo proceso se aplican al confirmar el logout; las de
+otros workers se leen por ``created_at`` cada ``REVOCATION_REFRESH_SECONDS``
+(con el margen ``CHANGE_FEED_SETTLE_SECONDS``) y el filtro se reconstruye
+cada ``REVOCATION_REBUILD_SECONDS`` para descartar los tokens ya expirados.
+Las consultas van siempre al primario.
+"""
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app, jsonify
+from sqlalchemy import delete, select
+from app import db
+from app.models import RevokedToken
+
+
+class BloomFilter:
+    """Filtro de Bloom en un ``bytearray`` con ``hash()`` del proceso (no se comparte)"""
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = max(capacity, 1)
+        self.size = max(int(-self.capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(int(round(self.size / self.capacity * math.log(2))), 1)
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        # Doble hashing con las dos mitades de ``hash()`` (siphash aleatorio por proceso)
+        first = hash(value)
+        second = (first >> 32) | 1
+        size = self.size
+        return ((first + i * second) % size for i in range(self.hashes))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        # Mismo cálculo que ``_positions`` sin generador: casi siempre falla en la primera posición
+        bits = self._bits
+        size = self.size
+        position = hash(value)
+        step = (position >> 32) | 1
+        for _ in range(self.hashes):
+            index = position % size
+            if not bits[index >> 3] & (1 << (index & 7)):
+                return False
+            position += step
+        return True
+
+
+class RevocationList:
+    """Filtro de Bloom y conjunto exacto de los ``jti`` revocados en el proceso"""
+
+    def __init__(self, capacity=100000, error_rate=0.001, exact_max=50000,
+                 refresh_seconds=5.0, rebuild_seconds=3600.0, settle_seconds=2.0):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.exact_max = exact_max
+        self.refresh_seconds = refresh_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self.settle = timedelta(seconds=settle_seconds)
+        self.bloom = None
+        self.exact = set()
+        self.database_checks = 0
+        self._cursor = None
+        self._last_refresh = None
+        self._last_rebuild = None
+        self._lock = threading.Lock()
+
+    def add(self, jti):
+        self.bloom.add(jti)
+        if len(self.exact) < self.exact_max:
+            self.exact.add(jti)
+
+    def is_revoked(self, jti):
+        self.maybe_refresh()
+        if jti not in self.bloom:
+            return False
+        if jti in self.exact:
+            return True
+        self.database_checks += 1
+        return _execute(select(RevokedToken.ID).where(RevokedToken.Jti == jti)).first() is not None
+
+    def _add_rows(self, rows):
+        for jti, created_at in rows:
+            self.add(jti)
+            if self._cursor is None or created_at > self._cursor:
+                self._cursor = created_at
+
+    def rebuild(self, now=None):
+        """Cargar todos los ``jti`` revocados que aún no expiran"""
+        now = now or datetime.utcnow()
+        rows = _execute(
+            select(RevokedToken.Jti, RevokedToken.created_at).where(RevokedToken.ExpiresAt > now)
+        ).all()
+        # Con más revocaciones que la capacidad configurada, el filtro crece
+        self.bloom = BloomFilter(max(self.capacity, 2 * len(rows)), self.error_rate)
+        self.exact = set()
+        self._cursor = None
+        self._add_rows(rows)
+        self._last_rebuild = self._last_refresh = time.monotonic()
+
+    def refresh(self):
+        """Agregar las revocaciones creadas desde la última vista (menos el margen)"""
+        query = select(RevokedToken.Jti, RevokedToken.created_at)
+        if self._cursor is not None:
+            query = query.where(RevokedToken.created_at > self._cursor - self.settle)
+        self._add_rows(_execute(query))
+        self._last_refresh = time.monotonic()
+
+    def maybe_refresh(self):
+        now = time.monotonic()
+        if self.bloom is not None and now - self._last_refresh < self.refresh_seconds:
+            return
+        if self.bloom is None:
+            with self._lock:
+                if self.bloom is None:
+                    self.rebuild()
+            return
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            if now - self._last_rebuild >= self.rebuild_seconds or self.bloom.count > self.bloom.capacity:
+                self.rebuild()
+            else:
+                self.refresh()
+        finally:
+            self._lock.release()
+
+
+def _execute(query):
+    """Ejecutar en el primario: una revocación recién confirmada puede no estar en la réplica"""
+    return db.session.execute(query, bind_arguments={'bind': db.engine})
+
+
+def revoke_token(jwt_data):
+    """Registrar la revocación del token (confirma la sesión) y aplicarla en el proceso"""
+    now = datetime.utcnow()
+    expires_at = datetime.utcfromtimestamp(jwt_data['exp']) if 'exp' in jwt_data else now + timedelta(days=365)
+    db.session.add(RevokedToken(Jti=jwt_data['jti'], UserID=_user_id(jwt_data), ExpiresAt=expires_at))
+    # Las filas de tokens ya expirados no se necesitan
+    db.session.execute(delete(RevokedToken).where(RevokedToken.ExpiresAt <= now))
+    db.session.commit()
+
+    revocations = get_revocations(current_app)
+    if revocations.bloom is not None:
+        revocations.add(jwt_data['jti'])
+
+
+def _user_id(jwt_data):
+    try:
+        return int(jwt_data['sub'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def init_revocation(app):
+    """Registrar la verificación de ``jti`` en cada ``@jwt_required()``"""
+    from app import jwt
+
+    config = app.config
+    app.extensions['revocations'] = RevocationList(
+        capacity=config['REVOCATION_BLOOM_CAPACITY'],
+        error_rate=config['REVOCATION_BLOOM_ERROR_RATE'],
+        exact_max=config['REVOCATION_EXACT_MAX'],
+        refresh_seconds=config['REVOCATION_REFRESH_SECONDS'],
+        rebuild_seconds=config['REVOCATION_REBUILD_SECONDS'],
+        settle_seconds=config['CHANGE_FEED_SETTLE_SECONDS']
+    )
+    jwt.token_in_blocklist_loader(
+        lambda jwt_header, jwt_data: 'jti' in jwt_data and get_revocations(current_app).is_revoked(jwt_data['jti'])
+    )
+    jwt.revoked_token_loader(lambda jwt_header, jwt_data: revoked_token_response())
+
+
+def get_revocations(app):
+    return app.extensions['revocations']
+
+
+def revoked_token_response():
+    return jsonify({
+        'success': False,
+        'error': 'El token fue revocado, inicie sesión nuevamente'
+    }), 401
@@ -0,0 +1,66 @@
+"""
+Filas livianas para los listados.
+
+Los listados solo leen columnas para serializarlas, así que no necesitan
+instancias del ORM (estado por instancia, mapa de identidad, relaciones).
+Cada ``RowType`` selecciona solo sus columnas con Core y envuelve cada fila
+en una tupla con nombre (``__slots__ = ()``, sin ``__dict__``) que expone los
+mismos atributos que leen los serializadores de ``serializers.py``, incluido
+``vehicle.client`` desde las columnas del join. Ver ``benchmarks/list_rows.py``
+para la comparación de memoria y tiempo contra ``Query.all()``.
+"""
+from collections import namedtuple
+from sqlalchemy import select
+from app import db
+from app.models import Client, User, Vehicle, WorkOrderListing
+
+
+class RowType:
+    """Sentencia de columnas de ``model`` y la tupla con nombre de sus filas"""
+
+    def __init__(self, name, model, columns, joins=(), properties=None):
+        self.model = model
+        self.columns = columns
+        self.joins = joins
+        base = namedtuple(name, [column.key for column in columns])
+        self.cls = type(name, (base,), {'__slots__': (), **(properties or {})})
+
+    def select(self, *criteria):
+        statement = select(*self.columns).select_from(self.model)
+        for target, onclause in self.joins:
+            statement = statement.outerjoin(target, onclause)
+        return statement.where(*criteria)
+
+    def load(self, statement):
+        make = self.cls._make
+        return [make(row) for row in db.session.execute(statement)]
+
+
+# Cliente del vehículo con los atributos que lee ``vehicle_to_dict``
+Person = namedtuple('Person', ['FirstName', 'LastName'])
+
+
+def _vehicle_client(row):
+    return Person(row.ClientFirstName, row.ClientLastName) if row.ClientFirstName is not None else None
+
+
+CLIENT_ROWS = RowType('ClientRow', Client, (
+    Client.ID, Client.RUN, Client.FirstName, Client.LastName, Client.Phone, Client.Email,
+    Client.created_at, Client.updated_at,
+))
+
+USER_ROWS = RowType('UserRow', User, (
+    User.ID, User.RUN, User.Email, User.FirstName, User.LastName, User.Phone, User.RoleID,
+    User.created_at, User.updated_at,
+))
+
+VEHICLE_ROWS = RowType('VehicleRow', Vehicle, (
+    Vehicle.ID, Vehicle.LicensePlate, Vehicle.Color, Vehicle.Brand, Vehicle.Model, Vehicle.Year,
+    Vehicle.ClientID, Vehicle.created_at, Vehicle.updated_at,
+    Client.FirstName.label('ClientFirstName'), Client.LastName.label('ClientLastName'),
+), joins=((Client, Vehicle.ClientID == Client.ID),), properties={'client': property(_vehicle_client)})
+
+WORK_ORDER_LISTING_ROWS = RowType('WorkOrderListingRow', WorkOrderListing, tuple(
+    getattr(WorkOrderListing, column.key) for column in WorkOrderListing.__table__.columns
+    if column.key != 'deleted_at'
+))
@@ -0,0 +1,97 @@
+"""
+Serialización a diccionarios JSON de los modelos expuestos por la API.
+
+Se comparten entre las rutas Flask y el modo ASGI para que ambos devuelvan
+exactamente el mismo contrato JSON.
+"""
+
+
+def iso(value):
+    """Formato ISO 8601 o None"""
+    return value.isoformat() if value else None
+
+
+def client_to_dict(client):
+    return {
+        'ID': client.ID,
+        'RUN': client.RUN,
+        'FirstName': client.FirstName,
+        'LastName': client.LastName,
+        'Phone': client.Phone,
+        'Email': client.Email,
+        'created_at': iso(client.created_at),
+        'updated_at': iso(client.updated_at)
+    }
+
+
+def user_to_dict(user):
+    return {
+        'ID': user.ID,
+        'RUN': user.RUN,
+        'Email': user.Email,
+        'FirstName': user.FirstName,
+        'LastName': user.LastName,
+        'Phone': user.Phone,
+        'RoleID': user.RoleID,
+        'created_at': iso(user.created_at),
+        'updated_at': iso(user.updated_at)
+    }
+
+
+def vehicle_to_dict(vehicle):
+    """Requiere ``vehicle.client`` cargado (joinedload) para no disparar consultas"""
+    # Obtener el nombre completo del cliente
+    client_name = f"{vehicle.client.FirstName} {vehicle.client.LastName}" if vehicle.client else None
+
+    return {
+        'ID': vehicle.ID,
+        'LicensePlate': vehicle.LicensePlate,
+        'Color': vehicle.Color,
+        'Brand': vehicle.Brand,
+        'Model': vehicle.Model,
+        'Year': vehicle.Year,
+        'ClientID': vehicle.ClientID,
+        'ClientName': client_name,
+        'created_at': iso(vehicle.created_at),
+        'updated_at': iso(vehicle.updated_at)
+    }
+
+
+def work_order_to_dict(order):
+    """Requiere ``order.vehicle`` y ``order.user`` cargados (joinedload)"""
+    # Obtener la patente del vehículo
+    license_plate = order.vehicle.LicensePlate if order.vehicle else None
+
+    # Obtener el nombre del técnico/mecánico
+    technician_name = f"{order.user.FirstName} {order.user.LastName}" if order.user else None
+
+    return {
+        'ID': order.ID,
+        'OrderDate': iso(order.OrderDate),
+        'Status': order.Status,
+        'Description': order.Description,
+        'VehicleID': order.VehicleID,
+        'LicensePlate': license_plate,
+        'UserID': order.UserID,
+        'TechnicianName': technician_name,
+        'created_at': iso(order.created_at),
+        'updated_at': iso(order.updated_at)
+    }
+
+
+def work_order_listing_to_dict(listing):
+    """Fila de ``WorkOrderListing``: mismo contrato que ``work_order_to_dict`` más ClientName"""
+    return {
+        'ID': listing.ID,
+        'OrderDate': iso(listing.OrderDate),
+        'Status': listing.Status,
+        'Description': listing.Description,
+        'VehicleID': listing.VehicleID,
+        'LicensePlate': listing.LicensePlate,
+        'ClientID': listing.ClientID,
+        'ClientName': listing.ClientName,
+        'UserID': listing.UserID,
+        'TechnicianName': listing.TechnicianName,
+        'created_at': iso(listing.created_at),
+        'updated_at': iso(listing.updated_at)
+    }
@@ -0,0 +1,170 @@
+"""
+Escritura de CSV y XLSX fila a fila para respuestas en streaming.
+
+Ambos generadores reciben un iterable de filas y entregan bloques de bytes
+a medida que avanzan, sin armar el archivo completo en memoria. El XLSX se
+escribe con ``zipfile`` de la biblioteca estándar (hoja única, celdas de
+texto en línea), por lo que no requiere openpyxl.
+"""
+import csv
+import io
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+CSV_MIMETYPE = 'text/csv'
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Tamaño aproximado de cada bloque entregado al cliente
+CHUNK_SIZE = 64 * 1024
+
+
+# ========================================
+# CSV
+# ========================================
+
+class _Line:
+    """Destino de ``csv.writer`` que retorna lo escrito"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(header, rows):
+    """CSV en UTF-8 con BOM (Excel reconoce los acentos)"""
+    writer = csv.writer(_Line())
+    chunk = ['\ufeff', writer.writerow(header)]
+    size = 0
+    for row in rows:
+        line = writer.writerow(row)
+        chunk.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield ''.join(chunk).encode('utf-8')
+            chunk, size = [], 0
+    yield ''.join(chunk).encode('utf-8')
+
+
+# ========================================
+# XLSX
+# ========================================
+
+class _StreamBuffer(io.RawIOBase):
+    """Archivo no posicionable: zipfile escribe en modo streaming (data descriptors)"""
+
+    def __init__(self):
+        self._chunks = []
+        self.size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks, self.size = [], 0
+        return data
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+
+_SHEET_TAIL = '</sheetData></worksheet>'
+
+
+def column_letter(index):
+    """0 -> A, 25 -> Z, 26 -> AA"""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _cell(reference, value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return f'<c r="{reference}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, Decimal)):
+        return f'<c r="{reference}"><v>{value}</v></c>'
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    return f'<c r="{reference}" t="inlineStr"><is><t xml:space="preserve">{escape(str(value))}</t></is></c>'
+
+
+def _row(number, values):
+    cells = ''.join(_cell(f'{column_letter(i)}{number}', value) for i, value in enumerate(values))
+    return f'<row r="{number}">{cells}</row>'
+
+
+def iter_xlsx(header, rows, sheet_name='Reporte'):
+    """Libro XLSX de una hoja con ``header`` como primera fila"""
+    buffer = _StreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        archive.writestr('_rels/.rels', _ROOT_RELS)
+        archive.writestr('xl/workbook.xml', _WORKBOOK.format(name=escape(sheet_name[:31])))
+        archive.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS)
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+            sheet.write((_SHEET_HEAD + _row(1, header)).encode('utf-8'))
+            for number, values in enumerate(rows, start=2):
+                sheet.write(_row(number, values).encode('utf-8'))
+                if buffer.size >= CHUNK_SIZE:
+                    yield buffer.drain()
+            sheet.write(_SHEET_TAIL.encode('utf-8'))
+
+    yield buffer.drain()
+
+
+FORMATS = {
+    'csv': (iter_csv, CSV_MIMETYPE),
+    'xlsx': (iter_xlsx, XLSX_MIMETYPE),
+}
@@ -0,0 +1,209 @@
+"""
+Límite de intentos de inicio de sesión por RUT y por IP.
+
+Cada intento de ``/api/auth/login`` cuenta en dos ventanas deslizantes de
+``LOGIN_THROTTLE_WINDOW_SECONDS``: la del RUT (``LOGIN_THROTTLE_RUN_LIMIT``)
+y la de la IP (``LOGIN_THROTTLE_IP_LIMIT``). Un login exitoso reinicia la
+ventana del RUT y descuenta su intento de la ventana de la IP: la IP limita
+los intentos fallidos, así muchos usuarios detrás de un mismo NAT pueden
+iniciar sesión sin recibir ``429``. Al superar un límite se responde ``429`` con
+``Retry-After`` desde un ``before_request``: el intento rechazado no ocupa
+una plaza del control de admisión, no consulta la base de datos y no
+calcula ningún hash.
+
+La ventana deslizante se aproxima con dos contadores (ventana fija actual y
+anterior, ponderada por el tiempo que aún cubre): memoria constante por
+clave en lugar de un timestamp por intento. Las claves se guardan en el orden
+en que empezó su ventana, así las vencidas se descartan desde el principio
+sin recorrer el resto; con ``LOGIN_THROTTLE_MAX_KEYS`` claves se descartan
+las más antiguas.
+
+El almacenamiento es intercambiable (``ThrottleStore``). El backend ``local``
+cuenta por proceso; con varios workers el límite efectivo se multiplica por
+la cantidad de workers. Uno compartido (Redis ``INCR`` + ``EXPIRE`` por clave
+y ventana...) debe implementar ``attempt``, ``reset`` y ``refund`` con la
+misma semántica.
+"""
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from flask import current_app, jsonify, request
+from app.utils.normalize import normalize_run
+
+LOGIN_ENDPOINT = 'main.login'
+
+
+class ThrottleStore(ABC):
+    """Contadores de intentos por clave"""
+
+    @abstractmethod
+    def attempt(self, keys, now=None):
+        """
+        Registrar un intento en cada ``(clave, límite)`` de ``keys``.
+
+        Devuelve 0 si se admite o los segundos a esperar si alguna clave ya
+        llegó a su límite (en ese caso no se registra en ninguna).
+        """
+
+    @abstractmethod
+    def reset(self, key):
+        """Descartar los intentos de ``key``"""
+
+    @abstractmethod
+    def refund(self, key, now=None):
+        """Descontar un intento ya registrado de ``key``"""
+
+
+class _Window:
+    __slots__ = ('start', 'previous', 'current')
+
+    def __init__(self, start):
+        self.start = start
+        self.previous = 0
+        self.current = 0
+
+
+class LocalThrottleStore(ThrottleStore):
+    """Ventanas deslizantes en memoria del proceso"""
+
+    def __init__(self, window_seconds=60.0, max_keys=100000):
+        self.window = window_seconds
+        self.max_keys = max_keys
+        self.rejected = 0
+        self._windows = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _roll(self, key, now):
+        """Ventana de ``key`` avanzada hasta ``now`` (None si no hay intentos vigentes)"""
+        window = self._windows.get(key)
+        if window is None:
+            return None
+        elapsed = now - window.start
+        if elapsed < self.window:
+            return window
+        if elapsed < 2 * self.window:
+            window.previous, window.current = window.current, 0
+            window.start += self.window
+        else:
+            window.previous = window.current = 0
+            window.start = now
+        # Mantener el orden por inicio de ventana
+        self._windows.move_to_end(key)
+        return window
+
+    def _estimate(self, window, now):
+        weight = 1 - (now - window.start) / self.window
+        return window.previous * weight + window.current
+
+    def _retry_after(self, window, limit, now):
+        """Segundos hasta que la estimación baje del límite sin nuevos intentos"""
+        if window.current >= limit:
+            # Esperar el fin de la ventana actual y que su peso baje lo suficiente
+            wait = window.start + self.window - now + self.window * (1 - limit / window.current)
+        else:
+            wait = window.start + self.window * (1 - (limit - window.current) / window.previous) - now
+        return max(int(math.ceil(wait)), 1)
+
+    def _expire(self, now):
+        windows = self._windows
+        while windows:
+            window = next(iter(windows.values()))
+            if now - window.start < 2 * self.window and len(windows) < self.max_keys:
+                break
+            windows.popitem(last=False)
+
+    def attempt(self, keys, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._expire(now)
+            for key, limit in keys:
+                window = self._roll(key, now)
+                if window is not None and self._estimate(window, now) >= limit:
+                    self.rejected += 1
+                    return self._retry_after(window, limit, now)
+            for key, limit in keys:
+                window = self._roll(key, now)
+                if window is None:
+                    window = self._windows[key] = _Window(now)
+                window.current += 1
+        return 0
+
+    def reset(self, key):
+        with self._lock:
+            self._windows.pop(key, None)
+
+    def refund(self, key, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            window = self._roll(key, now)
+            if window is None:
+                return
+            # El intento pudo quedar en la ventana anterior si esta avanzó
+            if window.current:
+                window.current -= 1
+            elif window.previous:
+                window.previous -= 1
+
+    def __len__(self):
+        return len(self._windows)
+
+
+STORES = {
+    'local': LocalThrottleStore,
+}
+
+
+def run_key(rut):
+    # RUT inválido: se limita por el texto tal como llegó
+    return 'run:' + (normalize_run(rut) or str(rut).strip().upper())
+
+
+def ip_key(address):
+    return 'ip:' + (address or '-')
+
+
+def login_keys(config):
+    """``(clave, límite)`` del intento de login de la petición actual"""
+    keys = [(ip_key(request.remote_addr), config['LOGIN_THROTTLE_IP_LIMIT'])]
+    data = request.get_json(silent=True)
+    rut = (data.get('rut') or data.get('RUN') or data.get('Rut')) if isinstance(data, dict) else None
+    if rut:
+        keys.append((run_key(rut), config['LOGIN_THROTTLE_RUN_LIMIT']))
+    return keys
+
+
+def init_login_throttle(app):
+    """Registrar el límite de intentos de login (antes del control de admisión)"""
+    if not app.config['LOGIN_THROTTLE_ENABLED']:
+        return
+
+    store = STORES[app.config['LOGIN_THROTTLE_BACKEND']](
+        window_seconds=app.config['LOGIN_THROTTLE_WINDOW_SECONDS'],
+        max_keys=app.config['LOGIN_THROTTLE_MAX_KEYS']
+    )
+    app.extensions['login_throttle'] = store
+
+    @app.before_request
+    def _throttle_login():
+        if request.endpoint != LOGIN_ENDPOINT:
+            return None
+        retry_after = store.attempt(login_keys(current_app.config))
+        if not retry_after:
+            return None
+        response = jsonify({
+            'success': False,
+            'error': 'Demasiados intentos de inicio de sesión, intente nuevamente más tarde'
+        })
+        response.status_code = 429
+        response.headers['Retry-After'] = str(retry_after)
+        return response
+
+
+def reset_login_attempts(rut):
+    """Tras un login exitoso: reiniciar la ventana del RUT y descontar el intento de la IP"""
+    store = current_app.extensions.get('login_throttle')
+    if store is not None:
+        store.reset(run_key(rut))
+        store.refund(ip_key(request.remote_addr))
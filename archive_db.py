@@ -0,0 +1,76 @@
+"""
+Script para archivar órdenes de trabajo eliminadas o cerradas antiguas
+
+    python archive_db.py                       # usa ARCHIVE_RETENTION_DAYS
+    python archive_db.py --retention-days 180 --batch-size 1000
+    python archive_db.py --dry-run             # solo contar
+"""
+import argparse
+from app import create_app, db
+from app.utils.archive import archive_work_orders, table_sizes
+from app.utils.partitions import ensure_future_partitions
+
+
+def _format_bytes(value):
+    if value is None:
+        return 'n/d'
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if value < 1024:
+            return f'{value:.0f} {unit}'
+        value /= 1024
+    return f'{value:.1f} TB'
+
+
+def _print_sizes(title, report):
+    print(title)
+    for name, info in report.items():
+        print(
+            f"   {name:<22} filas: {info['rows']:>10}   "
+            f"tabla: {_format_bytes(info['table_bytes']):>10}   "
+            f"índices: {_format_bytes(info['index_bytes']):>10}"
+        )
+
+
+def archive_db():
+    app = create_app()
+    config = app.config
+
+    parser = argparse.ArgumentParser(description='Archivar órdenes de trabajo antiguas')
+    parser.add_argument('--retention-days', type=int, default=config['ARCHIVE_RETENTION_DAYS'])
+    parser.add_argument('--batch-size', type=int, default=config['ARCHIVE_BATCH_SIZE'])
+    parser.add_argument('--pause', type=float, default=0.0, help='segundos de espera entre lotes')
+    parser.add_argument('--dry-run', action='store_true', help='solo contar, no mover filas')
+    args = parser.parse_args()
+
+    with app.app_context():
+        # Crear la tabla de archivo si aún no existe
+        db.create_all()
+
+        _print_sizes('📊 Antes:', table_sizes())
+
+        moved = archive_work_orders(
+            retention_days=args.retention_days,
+            closed_statuses=config['ARCHIVE_CLOSED_STATUSES'],
+            batch_size=args.batch_size,
+            pause=args.pause,
+            dry_run=args.dry_run
+        )
+
+        if args.dry_run:
+            print(f"\nℹ️  Se archivarían {moved} órdenes (retención: {args.retention_days} días)")
+            return
+
+        print(f"\n✅ {moved} órdenes archivadas (retención: {args.retention_days} días)\n")
+        
+        # Aprovechar la ejecución periódica para crear los meses siguientes (solo PostgreSQL)
+        created = ensure_future_partitions()
+        if created:
+            print(f"✅ Particiones nuevas: {', '.join(created)}\n")
+
+        _print_sizes('📊 Después:', table_sizes())
+        if db.engine.dialect.name == 'postgresql':
+            print("\nℹ️  El espacio liberado se reutiliza tras VACUUM (autovacuum lo hará)")
+
+
+if __name__ == '__main__':
+    archive_db()
@@ -0,0 +1,13 @@
+"""
+Punto de entrada ASGI (opcional) de la API Lubricentro
+
+Las rutas GET de clientes, vehículos, órdenes de trabajo y usuarios se
+atienden con SQLAlchemy asíncrono; el resto se delega a la app Flask.
+
+    pip install -r requirements-async.txt
+    uvicorn asgi:app --workers 4
+"""
+from app.asgi import create_asgi_app
+
+# Crear instancia de la aplicación ASGI
+app = create_asgi_app()
@@ -0,0 +1,107 @@
+"""
+Benchmark del índice de /api/autocomplete: construcción, memoria y latencia
+
+Siembra ``--rows`` clientes y vehículos, construye el índice (tiempo y
+memoria retenida) y mide la latencia de ``Autocomplete.search`` (sin HTTP
+ni JWT) para prefijos de 1 a 6 caracteres de cada tipo.
+
+    python benchmarks/autocomplete.py --rows 100000
+
+Sin DATABASE_URL usa un archivo SQLite temporal.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+FIRST_NAMES = ['Ana', 'José', 'María', 'Pedro', 'Camila', 'Luis', 'Sofía', 'Jorge', 'Valentina', 'Ignacio']
+LAST_NAMES = ['González', 'Muñoz', 'Rojas', 'Díaz', 'Pérez', 'Soto', 'Contreras', 'Silva', 'Martínez', 'Sepúlveda']
+
+
+def seed(app, rows):
+    from app import db
+    from app.models import Client, Vehicle
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        now = datetime.utcnow()
+        stamps = {'created_at': now, 'updated_at': now}
+        db.session.execute(Client.__table__.insert(), [
+            {'RUN': f'{10000000 + i}-0', 'FirstName': FIRST_NAMES[i % 10],
+             'LastName': f'{LAST_NAMES[(i // 10) % 10]} {i}', **stamps}
+            for i in range(rows)
+        ])
+        client_ids = db.session.scalars(db.select(Client.ID)).all()
+        db.session.execute(Vehicle.__table__.insert(), [
+            {'LicensePlate': f'{chr(65 + i % 26)}{chr(65 + i // 26 % 26)}{i:06d}', 'ClientID': client_id, **stamps}
+            for i, client_id in enumerate(client_ids)
+        ])
+        db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000, help='clientes y vehículos a sembrar')
+    parser.add_argument('--queries', type=int, default=5000, help='búsquedas por tipo')
+    args = parser.parse_args()
+
+    tmpdir = None
+    if not os.environ.get('DATABASE_URL'):
+        tmpdir = tempfile.TemporaryDirectory()
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tmpdir.name, 'bench.db')
+
+    from app import create_app
+    from app.utils.autocomplete import Autocomplete, get_autocomplete
+
+    app = create_app()
+    print(f'Sembrando {args.rows} clientes y vehículos...')
+    seed(app, args.rows)
+
+    with app.app_context():
+        index = get_autocomplete(app)
+        started = time.perf_counter()
+        index.ensure_built()
+        build_seconds = time.perf_counter() - started
+        print(f'Índice construido en {build_seconds:.2f}s; entradas: {index.stats()}')
+
+        # Memoria retenida por un segundo índice igual (tracemalloc hace lenta la construcción)
+        tracemalloc.start()
+        copy = Autocomplete(max_entries=index.max_entries)
+        copy.build()
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del copy
+        print(f'Memoria retenida: {retained / 2**20:.1f} MB')
+
+        rng = random.Random(1)
+        samples = {
+            'plate': lambda: f'{chr(65 + rng.randrange(26))}{chr(65 + rng.randrange(26))}{rng.randrange(10**4):04d}',
+            'client': lambda: rng.choice(FIRST_NAMES + LAST_NAMES).lower(),
+            'run': lambda: str(10000000 + rng.randrange(args.rows)),
+        }
+        for name, sample in samples.items():
+            timings = []
+            for _ in range(args.queries):
+                text = sample()[:rng.randint(1, 6)]
+                started = time.perf_counter()
+                index.search(text, (name,), 10)
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            p99 = timings[int(len(timings) * 0.99)]
+            print(f'{name:7s} p50 {statistics.median(timings):.3f} ms   p99 {p99:.3f} ms')
+
+    if tmpdir is not None:
+        tmpdir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark de los listados: instancias del ORM (``Query.all()``) vs filas livianas
+
+Siembra ``--rows`` clientes, vehículos y filas de ``work_order_listings`` y,
+para cada listado, mide el tiempo de cargar y serializar todas las filas y
+la memoria máxima durante la carga (tracemalloc) con:
+
+- ``orm``: la consulta que usaban las rutas (``Query.all()`` + serializador)
+- ``rows``: ``RowType`` de ``app/utils/rows.py`` + el mismo serializador
+
+    python benchmarks/list_rows.py --rows 100000
+
+Sin DATABASE_URL usa un archivo SQLite temporal.
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+
+def seed(app, rows):
+    from app import db
+    from app.models import Client, Vehicle, WorkOrderListing
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        now = datetime.utcnow()
+        stamps = {'created_at': now, 'updated_at': now}
+        db.session.execute(Client.__table__.insert(), [
+            {'RUN': f'{10000000 + i}-0', 'FirstName': f'Nombre{i}', 'LastName': f'Apellido{i}',
+             'Phone': '+56912345678', 'Email': f'cliente{i}@example.com', **stamps}
+            for i in range(rows)
+        ])
+        client_ids = db.session.scalars(db.select(Client.ID)).all()
+        db.session.execute(Vehicle.__table__.insert(), [
+            {'LicensePlate': f'{chr(65 + i % 26)}{chr(65 + i // 26 % 26)}{i:06d}', 'Brand': 'Toyota',
+             'Model': 'Corolla', 'Year': 2020, 'ClientID': client_id, **stamps}
+            for i, client_id in enumerate(client_ids)
+        ])
+        db.session.execute(WorkOrderListing.__table__.insert(), [
+            {'ID': i + 1, 'OrderDate': date(2024, 1 + i % 12, 1 + i % 28), 'Status': 'Completada',
+             'Description': 'Cambio de aceite', 'VehicleID': i + 1, 'LicensePlate': f'AA{i:06d}',
+             'ClientID': i + 1, 'ClientName': f'Nombre{i} Apellido{i}', 'UserID': 1,
+             'TechnicianName': 'Mecánico Prueba', **stamps}
+            for i in range(rows)
+        ])
+        db.session.commit()
+
+
+def measure(session, load):
+    """(segundos, MB máximos) de ``load()`` con un mapa de identidad vacío"""
+    session.expunge_all()
+    gc.collect()
+    started = time.perf_counter()
+    result = load()
+    seconds = time.perf_counter() - started
+    del result
+
+    session.expunge_all()
+    gc.collect()
+    tracemalloc.start()
+    result = load()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return seconds, peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000, help='filas por listado')
+    args = parser.parse_args()
+
+    tmpdir = None
+    if not os.environ.get('DATABASE_URL'):
+        tmpdir = tempfile.TemporaryDirectory()
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tmpdir.name, 'bench.db')
+
+    from sqlalchemy.orm import joinedload
+    from app import create_app, db
+    from app.models import Client, Vehicle, WorkOrderListing
+    from app.utils.rows import CLIENT_ROWS, VEHICLE_ROWS, WORK_ORDER_LISTING_ROWS
+    from app.utils.serializers import client_to_dict, vehicle_to_dict, work_order_listing_to_dict
+
+    app = create_app()
+    print(f'Sembrando {args.rows} filas por listado...')
+    seed(app, args.rows)
+
+    cases = {
+        'clients': (
+            lambda: Client.query.filter(Client.deleted_at.is_(None)).all(),
+            CLIENT_ROWS, Client.deleted_at.is_(None), client_to_dict,
+        ),
+        'vehicles': (
+            lambda: Vehicle.query.options(joinedload(Vehicle.client)).filter(Vehicle.deleted_at.is_(None)).all(),
+            VEHICLE_ROWS, Vehicle.deleted_at.is_(None), vehicle_to_dict,
+        ),
+        'work-orders': (
+            lambda: WorkOrderListing.query.filter(WorkOrderListing.deleted_at.is_(None)).order_by(
+                WorkOrderListing.ID).all(),
+            WORK_ORDER_LISTING_ROWS, WorkOrderListing.deleted_at.is_(None), work_order_listing_to_dict,
+        ),
+    }
+
+    with app.app_context():
+        print(f"{'listado':12s} {'orm':>9s} {'rows':>9s} {'mejora':>7s} {'orm MB':>8s} {'rows MB':>8s}")
+        for name, (orm_query, rows, criterion, serialize) in cases.items():
+            orm_seconds, orm_mb = measure(db.session, lambda: [serialize(obj) for obj in orm_query()])
+            rows_seconds, rows_mb = measure(
+                db.session, lambda: [serialize(row) for row in rows.load(rows.select(criterion))]
+            )
+            print(f'{name:12s} {orm_seconds:8.2f}s {rows_seconds:8.2f}s {orm_seconds / rows_seconds:6.1f}x '
+                  f'{orm_mb:8.1f} {rows_mb:8.1f}')
+
+    if tmpdir is not None:
+        tmpdir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
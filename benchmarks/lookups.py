@@ -0,0 +1,107 @@
+"""
+Microbenchmark de las búsquedas frecuentes: ``Model.query`` vs sentencias preconstruidas
+
+Mide el costo por llamada (en microsegundos) de cada búsqueda de
+``app/utils/lookups.py`` contra el ``Query`` equivalente que usaban las
+rutas. Antes de cada llamada se vacía el mapa de identidad, como en la
+sesión nueva de cada petición, así ambas variantes ejecutan la consulta.
+
+    python benchmarks/lookups.py --calls 20000
+
+Sin DATABASE_URL usa SQLite en memoria.
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+
+def seed():
+    from app import db
+    from app.models import Role, User, Client, Vehicle, WorkOrder
+    from datetime import date
+
+    db.drop_all()
+    db.create_all()
+    role = Role(Name='Mecánico')
+    db.session.add(role)
+    db.session.flush()
+    user = User(RUN='11.111.111-1', Email='bench@lubricentro.com', FirstName='Bench', LastName='Mark',
+                Password='x', RoleID=role.ID)
+    client = Client(RUN='22.222.222-2', FirstName='Cliente', LastName='Bench')
+    db.session.add_all([user, client])
+    db.session.flush()
+    vehicle = Vehicle(LicensePlate='BENC01', ClientID=client.ID)
+    db.session.add(vehicle)
+    db.session.flush()
+    order = WorkOrder(OrderDate=date(2024, 1, 1), VehicleID=vehicle.ID, UserID=user.ID)
+    db.session.add(order)
+    db.session.commit()
+    return user, client, vehicle, order
+
+
+def per_call_us(session, function, calls):
+    for _ in range(min(calls // 10, 500)):
+        session.expunge_all()
+        function()
+    started = time.perf_counter()
+    for _ in range(calls):
+        session.expunge_all()
+        function()
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=20000, help='llamadas por búsqueda')
+    args = parser.parse_args()
+
+    if not os.environ.get('DATABASE_URL'):
+        os.environ['DATABASE_URL'] = 'sqlite://'
+
+    from sqlalchemy.orm import joinedload
+    from app import create_app, db
+    from app.models import User, Client, Vehicle, WorkOrder
+    from app.utils.lookups import lookup
+
+    app = create_app()
+    with app.app_context():
+        user_id, client_id, vehicle_id, order_id = (row.ID for row in seed())
+
+        cases = {
+            'user_by_run': (
+                lambda: User.query.filter_by(RunNormalized='11111111-1', deleted_at=None).first(),
+                lambda: lookup('user_by_run', '11111111-1'),
+            ),
+            'user_with_role_by_id': (
+                lambda: db.session.get(User, user_id).role,
+                lambda: lookup('user_with_role_by_id', user_id).role,
+            ),
+            'client_by_id': (
+                lambda: Client.query.filter_by(ID=client_id, deleted_at=None).first(),
+                lambda: lookup('client_by_id', client_id),
+            ),
+            'vehicle_by_id': (
+                lambda: Vehicle.query.options(joinedload(Vehicle.client)).filter_by(
+                    ID=vehicle_id, deleted_at=None).first(),
+                lambda: lookup('vehicle_by_id', vehicle_id),
+            ),
+            'work_order_by_id': (
+                lambda: WorkOrder.query.options(joinedload(WorkOrder.vehicle), joinedload(WorkOrder.user)).filter_by(
+                    ID=order_id, deleted_at=None).first(),
+                lambda: lookup('work_order_by_id', order_id),
+            ),
+        }
+
+        print(f"{'búsqueda':22s} {'Model.query':>12s} {'lookup':>10s} {'mejora':>7s}")
+        for name, (before, after) in cases.items():
+            before_us = per_call_us(db.session, before, args.calls)
+            after_us = per_call_us(db.session, after, args.calls)
+            print(f'{name:22s} {before_us:10.1f}us {after_us:8.1f}us {before_us / after_us:6.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark de políticas de hash de contraseñas: inicios de sesión por segundo y núcleo
+
+Para cada política (``PASSWORD_HASH_METHOD``) mide el tiempo de una
+verificación en el hilo actual, de ahí las verificaciones por segundo de un
+núcleo, y el rendimiento del ``PasswordPool`` con ``--workers`` hilos y
+``--clients`` hilos de petición concurrentes. La verificación domina el
+costo de ``/api/auth/login``; la consulta del usuario y el JWT suman menos
+de un milisegundo.
+
+    python benchmarks/password_hashing.py --seconds 3
+    python benchmarks/password_hashing.py --policy scrypt:32768:8:1 --workers 4
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+POLICIES = [
+    'pbkdf2:sha256:600000',
+    'pbkdf2:sha256:260000',
+    'scrypt:32768:8:1',
+    'scrypt:16384:8:1',
+]
+
+
+def single_thread(pwhash, seconds):
+    from werkzeug.security import check_password_hash
+
+    calls = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        check_password_hash(pwhash, 'password123')
+        calls += 1
+    return calls / (time.perf_counter() - started)
+
+
+def pooled(method, pwhash, workers, clients, seconds):
+    from app.utils.passwords import PasswordPool, PasswordPoolBusy
+
+    pool = PasswordPool(method, workers=workers, max_queue=clients)
+    deadline = time.perf_counter() + seconds
+    done = [0] * clients
+
+    def client(index):
+        while time.perf_counter() < deadline:
+            try:
+                pool.verify(pwhash, 'password123')
+                done[index] += 1
+            except PasswordPoolBusy:
+                pass
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(done) / (time.perf_counter() - started), pool.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--policy', action='append', help='método de werkzeug (repetible)')
+    parser.add_argument('--seconds', type=float, default=3.0, help='duración de cada medición')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='hilos del pool')
+    parser.add_argument('--clients', type=int, default=16, help='peticiones concurrentes')
+    args = parser.parse_args()
+
+    from werkzeug.security import generate_password_hash
+
+    print(f'núcleos: {os.cpu_count()}  hilos del pool: {args.workers}  clientes: {args.clients}')
+    print(f"{'política':24s} {'ms/verif.':>10s} {'logins/s/núcleo':>16s} {'logins/s pool':>14s} "
+          f"{'espera media':>13s} {'cola máx.':>10s}")
+    for method in args.policy or POLICIES:
+        pwhash = generate_password_hash('password123', method)
+        per_core = single_thread(pwhash, args.seconds)
+        throughput, stats = pooled(method, pwhash, args.workers, args.clients, args.seconds)
+        print(f'{method:24s} {1000 / per_core:9.1f}ms {per_core:16.1f} {throughput:14.1f} '
+              f"{stats['avg_wait_ms']:11.1f}ms {stats['max_queue_depth']:10d}")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,19 @@ Configuración simple de la aplicación Flask
 """
 import os
 
+
+def postgres_url(url):
+    """
+    Usar psycopg 3 con PostgreSQL: ``postgres://`` (Vercel/Neon) y
+    ``postgresql://`` pasan a ``postgresql+psycopg://``. Un driver explícito
+    (``postgresql+psycopg2://``...) se respeta.
+    """
+    for scheme in ('postgres://', 'postgresql://'):
+        if url.startswith(scheme):
+            return 'postgresql+psycopg://' + url[len(scheme):]
+    return url
+
+
 class Config:
     """Configuración básica"""
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'clave-secreta-para-desarrollo'
@@ -10,6 +23,33 @@ class Config:
     # Configuración JWT
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key-super-segura-cambiar-en-produccion'
     
+    # Segundos que cada proceso confía en la versión de tokens de un usuario antes de releerla
+    TOKEN_VERSION_CACHE_SECONDS = float(os.environ.get('TOKEN_VERSION_CACHE_SECONDS', 30))
+    
+    # Hash de contraseñas: método y costo (sintaxis de werkzeug); los hashes con otros
+    # parámetros se recalculan al iniciar sesión
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+    # Hilos para verificar contraseñas (0 = núcleos del equipo) y verificaciones en espera
+    PASSWORD_VERIFY_WORKERS = int(os.environ.get('PASSWORD_VERIFY_WORKERS', 0))
+    PASSWORD_VERIFY_MAX_QUEUE = int(os.environ.get('PASSWORD_VERIFY_MAX_QUEUE', 32))
+    PASSWORD_VERIFY_TIMEOUT = float(os.environ.get('PASSWORD_VERIFY_TIMEOUT', 10))
+    PASSWORD_RETRY_AFTER = int(os.environ.get('PASSWORD_RETRY_AFTER', 2))
+    
+    # Límite de intentos de login: ventana deslizante por RUT y por IP (429 + Retry-After)
+    LOGIN_THROTTLE_ENABLED = os.environ.get('LOGIN_THROTTLE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    LOGIN_THROTTLE_BACKEND = os.environ.get('LOGIN_THROTTLE_BACKEND', 'local')
+    LOGIN_THROTTLE_WINDOW_SECONDS = float(os.environ.get('LOGIN_THROTTLE_WINDOW_SECONDS', 60))
+    LOGIN_THROTTLE_RUN_LIMIT = int(os.environ.get('LOGIN_THROTTLE_RUN_LIMIT', 5))
+    LOGIN_THROTTLE_IP_LIMIT = int(os.environ.get('LOGIN_THROTTLE_IP_LIMIT', 30))
+    LOGIN_THROTTLE_MAX_KEYS = int(os.environ.get('LOGIN_THROTTLE_MAX_KEYS', 100000))
+    
+    # Revocación de tokens (logout): filtro de Bloom y conjunto exacto por proceso
+    REVOCATION_BLOOM_CAPACITY = int(os.environ.get('REVOCATION_BLOOM_CAPACITY', 100000))
+    REVOCATION_BLOOM_ERROR_RATE = float(os.environ.get('REVOCATION_BLOOM_ERROR_RATE', 0.001))
+    REVOCATION_EXACT_MAX = int(os.environ.get('REVOCATION_EXACT_MAX', 50000))
+    REVOCATION_REFRESH_SECONDS = float(os.environ.get('REVOCATION_REFRESH_SECONDS', 5))
+    REVOCATION_REBUILD_SECONDS = float(os.environ.get('REVOCATION_REBUILD_SECONDS', 3600))
+    
     # Base de datos - SQLite por defecto, PostgreSQL si está configurado
     # Vercel/Neon puede usar varias variables: POSTGRES_URL, DATABASE_URL, POSTGRES_PRISMA_URL
     DATABASE_URL = (
@@ -19,25 +59,86 @@ class Config:
     )
     
     if DATABASE_URL:
-        # Fix para Vercel/Neon: convertir postgres:// a postgresql://
-        # y usar la versión sin pooling para evitar problemas
-        if DATABASE_URL.startswith('postgres://'):
-            DATABASE_URL = DATABASE_URL.replace('postgres://', 'postgresql://', 1)
-        
-        # Remover el sufijo de pooling si existe
+        # Vercel/Neon: preferir la URL sin pooling (pgbouncer) para serverless
         if '?sslmode=' in DATABASE_URL and 'pgbouncer=true' in DATABASE_URL:
-            # Preferir la URL sin pooling para serverless
             DATABASE_URL = os.environ.get('POSTGRES_URL_NON_POOLING') or DATABASE_URL
-            if DATABASE_URL.startswith('postgres://'):
-                DATABASE_URL = DATABASE_URL.replace('postgres://', 'postgresql://', 1)
         
-        SQLALCHEMY_DATABASE_URI = DATABASE_URL
+        SQLALCHEMY_DATABASE_URI = postgres_url(DATABASE_URL)
     else:
         basedir = os.path.abspath(os.path.dirname(__file__))
         SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(basedir, '..', 'lubricentro.db')
     
+    # Réplica de solo lectura (opcional): las peticiones GET leen de aquí
+    DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')
+    
+    if DATABASE_REPLICA_URL:
+        DATABASE_REPLICA_URL = postgres_url(DATABASE_REPLICA_URL)
+        SQLALCHEMY_BINDS = {'replica': DATABASE_REPLICA_URL}
+    
+    # Transacciones de las rutas GET: read_only (SET TRANSACTION READ ONLY), autocommit u off
+    READ_ONLY_GET_MODE = os.environ.get('READ_ONLY_GET_MODE', 'read_only')
+    
+    # Retraso máximo tolerado antes de volver a leer del primario
+    REPLICA_MAX_LAG_SECONDS = float(os.environ.get('REPLICA_MAX_LAG_SECONDS', 5))
+    REPLICA_LAG_CHECK_INTERVAL = float(os.environ.get('REPLICA_LAG_CHECK_INTERVAL', 5))
+    # Tras escribir, el mismo usuario lee del primario durante este tiempo
+    REPLICA_STICKY_SECONDS = float(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+    
+    # Archivado de órdenes de trabajo (archive_db.py)
+    ARCHIVE_RETENTION_DAYS = int(os.environ.get('ARCHIVE_RETENTION_DAYS', 365))
+    ARCHIVE_CLOSED_STATUSES = os.environ.get('ARCHIVE_CLOSED_STATUSES', 'Completada,Finalizada,Entregada').split(',')
+    ARCHIVE_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', 500))
+    
+    # /api/changes: segundos de margen para transacciones aún no confirmadas
+    CHANGE_FEED_SETTLE_SECONDS = float(os.environ.get('CHANGE_FEED_SETTLE_SECONDS', 2))
+    
+    # Eventos SSE de órdenes de trabajo (/api/work-orders/events)
+    EVENT_BACKEND = os.environ.get('EVENT_BACKEND', 'local')
+    SSE_REPLAY_SIZE = int(os.environ.get('SSE_REPLAY_SIZE', 1000))
+    SSE_HEARTBEAT_SECONDS = float(os.environ.get('SSE_HEARTBEAT_SECONDS', 15))
+    # Cerrar la conexión cada cierto tiempo; EventSource reconecta con Last-Event-ID
+    SSE_MAX_STREAM_SECONDS = float(os.environ.get('SSE_MAX_STREAM_SECONDS', 300))
+    
+    # /api/batch: sub-peticiones por batch y lecturas simultáneas
+    BATCH_MAX_REQUESTS = int(os.environ.get('BATCH_MAX_REQUESTS', 20))
+    BATCH_MAX_PARALLEL = int(os.environ.get('BATCH_MAX_PARALLEL', 4))
+    
+    # Control de admisión: peticiones simultáneas por proceso (0 = tamaño del pool)
+    ADMISSION_ENABLED = os.environ.get('ADMISSION_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    ADMISSION_MAX_CONCURRENT = int(os.environ.get('ADMISSION_MAX_CONCURRENT', 0))
+    # Plazas que los listados completos no pueden usar (login, detalle y escrituras)
+    ADMISSION_RESERVED_SLOTS = int(os.environ.get('ADMISSION_RESERVED_SLOTS', 2))
+    ADMISSION_WAIT_SECONDS = float(os.environ.get('ADMISSION_WAIT_SECONDS', 0.5))
+    ADMISSION_RETRY_AFTER = int(os.environ.get('ADMISSION_RETRY_AFTER', 2))
+    
+    # Trabajos en segundo plano (/api/jobs): hilos por proceso y vigencia de resultados
+    JOBS_MAX_WORKERS = int(os.environ.get('JOBS_MAX_WORKERS', 2))
+    JOBS_MAX_PENDING = int(os.environ.get('JOBS_MAX_PENDING', 20))
+    JOBS_RESULT_TTL_SECONDS = int(os.environ.get('JOBS_RESULT_TTL_SECONDS', 24 * 3600))
+    JOBS_TIMEOUT_SECONDS = int(os.environ.get('JOBS_TIMEOUT_SECONDS', 1800))
+    JOBS_CLEANUP_INTERVAL_SECONDS = int(os.environ.get('JOBS_CLEANUP_INTERVAL_SECONDS', 300))
+    
+    # /api/autocomplete: filas por índice en memoria y cada cuánto leer cambios de otros procesos
+    AUTOCOMPLETE_MAX_ENTRIES = int(os.environ.get('AUTOCOMPLETE_MAX_ENTRIES', 100000))
+    AUTOCOMPLETE_REFRESH_SECONDS = float(os.environ.get('AUTOCOMPLETE_REFRESH_SECONDS', 5))
+    
+    # Perfilado bajo demanda (X-Profile: 1 o ?profile=1, solo Administrador)
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    PROFILING_KEEP = int(os.environ.get('PROFILING_KEEP', 20))
+    PROFILING_SAMPLE_SECONDS = float(os.environ.get('PROFILING_SAMPLE_SECONDS', 0.001))
+    # Directorio donde además se escriben los perfiles (.pstats, .collapsed, .sql.json)
+    PROFILING_DIR = os.environ.get('PROFILING_DIR')
+    
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ENGINE_OPTIONS = {
         "pool_pre_ping": True,
         "pool_recycle": 300,
-    }
\ No newline at end of file
+    }
+    
+    # psycopg 3 (ver ``postgres_url``) prepara en el servidor las sentencias que se
+    # repiten en una conexión; con psycopg2 explícito no hay sentencias preparadas.
+    # pgbouncer en modo transacción no conserva las sentencias entre transacciones
+    if SQLALCHEMY_DATABASE_URI.startswith('postgresql+psycopg://') and 'pgbouncer=true' not in SQLALCHEMY_DATABASE_URI:
+        SQLALCHEMY_ENGINE_OPTIONS['connect_args'] = {
+            'prepare_threshold': int(os.environ.get('DATABASE_PREPARE_THRESHOLD', 5))
+        }
\ No newline at end of file
@@ -3,7 +3,7 @@ Script para inicializar la base de datos y ver las tablas creadas
 """
 from app import create_app, db
 from app.models import Role, User, Client, Vehicle, WorkOrder
-from werkzeug.security import generate_password_hash
+from app.utils.passwords import hash_password
 import sqlite3
 import os
 
@@ -36,7 +36,7 @@ def init_db():
                 Email='test@lubricentro.com',
                 FirstName='Usuario',
                 LastName='Prueba',
-                Password=generate_password_hash('password123'),  # Contraseña encriptada
+                Password=hash_password('password123'),  # Contraseña encriptada (PASSWORD_HASH_METHOD)
                 Phone='+56912345678',
                 RoleID=mechanic_role.ID
             )
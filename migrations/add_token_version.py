@@ -0,0 +1,31 @@
+"""
+Migración: versión de tokens en users (columna TokenVersion)
+
+    python -m migrations.add_token_version
+
+Agrega la columna si falta y la deja en 0 para los usuarios existentes. Los
+tokens emitidos antes de la migración no traen versión y siguen siendo
+válidos hasta que expiran.
+"""
+from sqlalchemy import update
+from app import create_app, db
+from app.models import User
+from migrations.backfill import add_column_if_missing
+
+
+def add_token_version():
+    app = create_app()
+
+    with app.app_context():
+        if add_column_if_missing(User.__table__.c.TokenVersion):
+            print("   Columna users.TokenVersion agregada")
+
+        updated = db.session.execute(
+            update(User.__table__).where(User.TokenVersion.is_(None)).values(TokenVersion=0)
+        ).rowcount
+        db.session.commit()
+        print(f"✅ {updated} usuarios con TokenVersion = 0")
+
+
+if __name__ == '__main__':
+    add_token_version()
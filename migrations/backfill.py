@@ -0,0 +1,71 @@
+"""
+Utilidades para migraciones que agregan una columna normalizada
+
+Agregan la columna si falta (``db.create_all()`` no modifica tablas
+existentes), la completan en lotes y crean su índice único. Las filas cuyo
+valor normalizado choca con otra quedan en NULL y se informan para
+corregirlas a mano.
+"""
+from sqlalchemy import inspect, select, text, update
+from app import db
+
+
+def add_column_if_missing(column):
+    table = column.table
+    existing = {c['name'] for c in inspect(db.engine).get_columns(table.name)}
+    if column.name in existing:
+        return False
+
+    column_type = column.type.compile(dialect=db.engine.dialect)
+    with db.engine.begin() as conn:
+        conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column_type}'))
+    return True
+
+
+def backfill_normalized(model, source, target, normalize, batch_size=1000):
+    """
+    Completar ``target`` con ``normalize(source)`` en las filas donde es NULL.
+
+    Retorna ``(actualizadas, conflictos)``; cada conflicto es
+    ``(ID, valor original, valor normalizado, ID que ya lo tiene)``.
+    """
+    source_column = getattr(model, source)
+    target_column = getattr(model, target)
+
+    # Valores canónicos ya ocupados (filas completadas antes o por la API)
+    taken = dict(db.session.execute(
+        select(target_column, model.ID).where(target_column.isnot(None))
+    ).all())
+
+    updated = 0
+    conflicts = []
+    last_id = 0
+    while True:
+        rows = db.session.execute(
+            select(model.ID, source_column).where(model.ID > last_id, target_column.is_(None))
+            .order_by(model.ID).limit(batch_size)
+        ).all()
+        if not rows:
+            break
+
+        for row_id, value in rows:
+            canonical = normalize(value)
+            if canonical is None:
+                continue
+            if canonical in taken:
+                conflicts.append((row_id, value, canonical, taken[canonical]))
+                continue
+            taken[canonical] = row_id
+            db.session.execute(update(model.__table__).where(model.ID == row_id).values({target: canonical}))
+            updated += 1
+
+        db.session.commit()
+        last_id = rows[-1][0]
+
+    return updated, conflicts
+
+
+def create_unique_index(column):
+    for index in column.table.indexes:
+        if column.name in [c.name for c in index.columns]:
+            index.create(db.engine, checkfirst=True)
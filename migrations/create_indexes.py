@@ -0,0 +1,25 @@
+"""
+Migración: crear los índices declarados en los modelos que falten en la base
+
+    python -m migrations.create_indexes
+
+``db.create_all()`` no agrega índices a tablas que ya existen; este script
+los crea (si no existen) para bases inicializadas con versiones anteriores.
+"""
+from app import create_app, db
+
+
+def create_indexes():
+    app = create_app()
+
+    with app.app_context():
+        for table in db.metadata.sorted_tables:
+            for index in sorted(table.indexes, key=lambda index: index.name):
+                index.create(db.engine, checkfirst=True)
+                print(f"   {table.name}: {index.name}")
+
+        print("\n✅ Índices verificados")
+
+
+if __name__ == '__main__':
+    create_indexes()
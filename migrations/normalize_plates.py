@@ -0,0 +1,43 @@
+"""
+Migración: patente normalizada en vehicles (columna PlateNormalized)
+
+    python -m migrations.normalize_plates
+
+Agrega la columna, la completa a partir de LicensePlate ("ab-cd 12" ->
+"ABCD12") y crea el índice único que usan /api/vehicles/plate/<patente> y la
+validación de duplicados. Las patentes que quedan duplicadas al
+normalizarlas se informan y se dejan sin completar para revisarlas a mano;
+volver a ejecutar el script completa las que se hayan corregido.
+"""
+import argparse
+from app import create_app, db
+from app.models import Vehicle
+from app.utils.normalize import normalize_plate
+from migrations.backfill import add_column_if_missing, backfill_normalized, create_unique_index
+
+
+def normalize_plates():
+    parser = argparse.ArgumentParser(description='Completar vehicles.PlateNormalized')
+    parser.add_argument('--batch-size', type=int, default=1000, help='filas por transacción')
+    args = parser.parse_args()
+
+    app = create_app()
+
+    with app.app_context():
+        if add_column_if_missing(Vehicle.__table__.c.PlateNormalized):
+            print("   Columna PlateNormalized agregada")
+
+        updated, conflicts = backfill_normalized(
+            Vehicle, 'LicensePlate', 'PlateNormalized', normalize_plate, args.batch_size
+        )
+        create_unique_index(Vehicle.__table__.c.PlateNormalized)
+        print(f"✅ {updated} patentes normalizadas; índice único creado")
+
+        if conflicts:
+            print(f"⚠️  {len(conflicts)} patentes duplicadas al normalizar (quedaron sin completar):")
+            for row_id, plate, canonical, other_id in conflicts:
+                print(f"   vehículo {row_id} '{plate}' -> {canonical} (ya usada por el vehículo {other_id})")
+
+
+if __name__ == '__main__':
+    normalize_plates()
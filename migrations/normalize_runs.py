@@ -0,0 +1,57 @@
+"""
+Migración: RUT normalizado en clients y users (columna RunNormalized)
+
+    python -m migrations.normalize_runs
+
+Agrega la columna en ambas tablas, la completa a partir de RUN
+("12.345.678-k" -> "12345678-K") y crea los índices únicos que usan el
+login, /api/clients/run/<rut> y la validación de duplicados. Los RUT que
+quedan duplicados al normalizarlos, o que no tienen forma de RUT, se
+informan y se dejan sin completar para revisarlos a mano; volver a ejecutar
+el script completa los que se hayan corregido. Mientras tanto esos usuarios
+inician sesión con el RUN tal como está guardado.
+"""
+import argparse
+from sqlalchemy import select
+from app import create_app, db
+from app.models import Client, User
+from app.utils.normalize import normalize_run
+from migrations.backfill import add_column_if_missing, backfill_normalized, create_unique_index
+
+
+def normalize_runs():
+    parser = argparse.ArgumentParser(description='Completar clients.RunNormalized y users.RunNormalized')
+    parser.add_argument('--batch-size', type=int, default=1000, help='filas por transacción')
+    args = parser.parse_args()
+
+    app = create_app()
+
+    with app.app_context():
+        for model in (Client, User):
+            table = model.__table__
+            if add_column_if_missing(table.c.RunNormalized):
+                print(f"   Columna {table.name}.RunNormalized agregada")
+
+            updated, conflicts = backfill_normalized(
+                model, 'RUN', 'RunNormalized', normalize_run, args.batch_size
+            )
+            create_unique_index(table.c.RunNormalized)
+            print(f"✅ {table.name}: {updated} RUT normalizados; índice único creado")
+
+            if conflicts:
+                print(f"⚠️  {len(conflicts)} RUT duplicados al normalizar (quedaron sin completar):")
+                for row_id, run, canonical, other_id in conflicts:
+                    print(f"   {table.name} {row_id} '{run}' -> {canonical} (ya usado por {other_id})")
+
+            invalid = db.session.execute(
+                select(model.ID, model.RUN).where(model.RunNormalized.is_(None), model.deleted_at.is_(None))
+            ).all()
+            invalid = [(row_id, run) for row_id, run in invalid if normalize_run(run) is None]
+            if invalid:
+                print(f"⚠️  {len(invalid)} RUT sin formato válido (quedaron sin completar):")
+                for row_id, run in invalid:
+                    print(f"   {table.name} {row_id} '{run}'")
+
+
+if __name__ == '__main__':
+    normalize_runs()
@@ -0,0 +1,56 @@
+"""
+Migración: particionar work_orders por mes (OrderDate) en PostgreSQL
+
+    python -m migrations.partition_work_orders                  # convertir / crear meses futuros
+    python -m migrations.partition_work_orders --months-ahead 6
+    python -m migrations.partition_work_orders --status
+
+Ejecutar de nuevo (por ejemplo, con un cron mensual) solo crea las
+particiones de los meses siguientes. En SQLite solo se asegura el índice
+sobre OrderDate, que es lo que usan las consultas por rango de fechas.
+"""
+import argparse
+from app import create_app, db
+from app.models import WorkOrder
+from app.utils.partitions import (
+    LEGACY_TABLE, ensure_future_partitions, existing_partitions, is_partitioned,
+    migrate_to_partitioned, supports_partitioning
+)
+
+
+def partition_work_orders():
+    parser = argparse.ArgumentParser(description='Particionar work_orders por mes')
+    parser.add_argument('--months-ahead', type=int, default=3, help='meses futuros a crear')
+    parser.add_argument('--status', action='store_true', help='solo mostrar las particiones actuales')
+    args = parser.parse_args()
+
+    app = create_app()
+
+    with app.app_context():
+        if args.status:
+            print(f"Particionada: {is_partitioned()}")
+            for name in existing_partitions():
+                print(f"   {name}")
+            return
+
+        # Índice sobre OrderDate (tablas creadas antes de que existiera)
+        for index in WorkOrder.__table__.indexes:
+            index.create(db.engine, checkfirst=True)
+
+        if not supports_partitioning():
+            print(f"ℹ️  {db.engine.dialect.name}: sin particionado, work_orders queda como tabla única con índice en OrderDate")
+            return
+
+        if is_partitioned():
+            created = ensure_future_partitions(args.months_ahead)
+            print(f"✅ Particiones nuevas: {', '.join(created) if created else 'ninguna'}")
+            return
+
+        partitions = migrate_to_partitioned(args.months_ahead)
+        print(f"✅ work_orders particionada ({len(partitions)} particiones)")
+        print(f"ℹ️  La tabla original quedó como {LEGACY_TABLE}; elimínela tras verificar los datos:")
+        print(f"   DROP TABLE {LEGACY_TABLE};")
+
+
+if __name__ == '__main__':
+    partition_work_orders()
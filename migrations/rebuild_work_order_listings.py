@@ -0,0 +1,50 @@
+"""
+Migración: crear, verificar y reconstruir el modelo de lectura work_order_listings
+
+    python -m migrations.rebuild_work_order_listings            # crear tabla/índices y reconstruir
+    python -m migrations.rebuild_work_order_listings --check    # solo verificar (sale con código 1 si hay diferencias)
+    python -m migrations.rebuild_work_order_listings --batch-size 5000
+
+La tabla se mantiene sola en cada escritura de la API; la reconstrucción es
+para bases existentes, después de cargas con SQL directo o si la
+verificación encuentra diferencias.
+"""
+import argparse
+import sys
+from app import create_app, db
+from app.models import WorkOrderListing
+from app.utils.read_model import check_listings, rebuild_listings
+
+
+def rebuild_work_order_listings():
+    parser = argparse.ArgumentParser(description='Verificar y reconstruir work_order_listings')
+    parser.add_argument('--check', action='store_true', help='solo verificar, sin modificar')
+    parser.add_argument('--batch-size', type=int, default=1000, help='órdenes por transacción')
+    args = parser.parse_args()
+
+    app = create_app()
+
+    with app.app_context():
+        if args.check:
+            report = check_listings(db.session)
+            counts = report['counts']
+            for name in ('missing', 'orphaned', 'stale'):
+                sample = ', '.join(str(row_id) for row_id in report[name])
+                print(f"   {name}: {counts[name]}" + (f" (IDs: {sample})" if sample else ''))
+
+            if any(counts.values()):
+                print("❌ work_order_listings no coincide con work_orders")
+                sys.exit(1)
+            print("✅ work_order_listings consistente")
+            return
+
+        WorkOrderListing.__table__.create(db.engine, checkfirst=True)
+        for index in WorkOrderListing.__table__.indexes:
+            index.create(db.engine, checkfirst=True)
+
+        written = rebuild_listings(db.session, batch_size=args.batch_size)
+        print(f"✅ work_order_listings reconstruida ({written} órdenes)")
+
+
+if __name__ == '__main__':
+    rebuild_work_order_listings()
@@ -0,0 +1,119 @@
+"""
+Fixtures compartidas para las pruebas de la API
+"""
+from datetime import date
+import pytest
+from flask import current_app
+from app import create_app, db
+from app.models import Role, User, Client, Vehicle, WorkOrder
+from app.utils.auth import create_user_token, get_token_versions
+from app.utils.query_budget import assert_max_queries
+from app.utils.revocation import get_revocations
+from config.config import Config
+
+
+class TestConfig(Config):
+    """Configuración de pruebas con SQLite en memoria"""
+    __test__ = False
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+
+
+@pytest.fixture
+def app_config():
+    return TestConfig
+
+
+@pytest.fixture
+def app(app_config):
+    app = create_app(app_config)
+    with app.app_context():
+        # Solo el bind principal: ``db`` conserva los binds de apps anteriores (réplica)
+        db.create_all(bind_key=None)
+        # Cargar la lista de revocaciones antes de medir sentencias por ruta
+        get_revocations(app).rebuild()
+        yield app
+        db.session.remove()
+        db.drop_all(bind_key=None)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def seed(app):
+    """
+    Datos de prueba con varias filas relacionadas por tabla, de modo que un
+    acceso lazy por fila se note en el número de sentencias ejecutadas.
+    """
+    admin_role = Role(Name='Administrador')
+    mechanic_role = Role(Name='Mecánico')
+    receptionist_role = Role(Name='Recepcionista')
+    db.session.add_all([admin_role, mechanic_role, receptionist_role])
+    db.session.flush()
+
+    users = [
+        User(
+            RUN=f'1111111{i}-{i}',
+            Email=f'mecanico{i}@lubricentro.com',
+            FirstName=f'Mecánico{i}',
+            LastName='Prueba',
+            Password='hash-no-usado',
+            RoleID=mechanic_role.ID
+        )
+        for i in range(3)
+    ]
+    clients = [
+        Client(RUN=f'2222222{i}-{i}', FirstName=f'Cliente{i}', LastName='Prueba')
+        for i in range(3)
+    ]
+    db.session.add_all(users + clients)
+    db.session.flush()
+
+    vehicles = [
+        Vehicle(LicensePlate=f'ABCD1{i}', Brand='Toyota', Model='Corolla', ClientID=c.ID)
+        for i, c in enumerate(clients)
+    ]
+    db.session.add_all(vehicles)
+    db.session.flush()
+
+    orders = [
+        WorkOrder(OrderDate=date(2024, 10, 1 + i), VehicleID=v.ID, UserID=u.ID)
+        for i, (v, u) in enumerate(zip(vehicles, users))
+    ]
+    db.session.add_all(orders)
+    db.session.commit()
+
+    return {
+        'users': [u.ID for u in users],
+        'clients': [c.ID for c in clients],
+        'vehicles': [v.ID for v in vehicles],
+        'work_orders': [o.ID for o in orders],
+    }
+
+
+@pytest.fixture
+def auth_headers(seed):
+    # Mismo token que entrega el login: claims de rol y versión (``ver``)
+    user = db.session.get(User, seed['users'][0])
+    token = create_user_token(user)
+    # Versión ya en caché, como tras la primera petición del usuario: los
+    # presupuestos de sentencias miden el estado estable de cada ruta
+    get_token_versions(current_app).current(user.ID)
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def query_budget(app):
+    """
+    Presupuesto de sentencias SQL sobre ``db.engine``.
+
+        with query_budget(2):
+            client.get('/api/work-orders', headers=auth_headers)
+    """
+    def _budget(max_queries):
+        return assert_max_queries(db.engine, max_queries)
+    return _budget
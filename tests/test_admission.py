@@ -0,0 +1,107 @@
+"""
+Control de admisión y 503 con Retry-After
+"""
+import pytest
+from flask import request
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+from app import db
+from app.utils.admission import DETAIL, LIST, AdmissionController, pool_capacity, pool_saturated, route_class
+from tests.conftest import TestConfig
+
+
+class AdmissionConfig(TestConfig):
+    ADMISSION_MAX_CONCURRENT = 3
+    ADMISSION_RESERVED_SLOTS = 1
+    ADMISSION_WAIT_SECONDS = 0
+
+
+@pytest.fixture
+def app_config():
+    return AdmissionConfig
+
+
+@pytest.fixture
+def controller(app):
+    return app.extensions['admission']
+
+
+def test_lists_cannot_use_reserved_slots(client, auth_headers, seed, controller):
+    client_id = seed['clients'][0]
+    assert controller.acquire(LIST) and controller.acquire(LIST)
+
+    response = client.get('/api/clients', headers=auth_headers)
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '2'
+    assert response.get_json()['success'] is False
+
+    # La plaza reservada sigue disponible para detalle y login
+    assert client.get(f'/api/clients/{client_id}', headers=auth_headers).status_code == 200
+    assert controller.in_flight == 2
+
+    assert controller.acquire(DETAIL)
+    assert client.get(f'/api/clients/{client_id}', headers=auth_headers).status_code == 503
+    assert controller.rejected == {'list': 1, 'detail': 1}
+
+    for _ in range(3):
+        controller.release()
+    assert client.get('/api/clients', headers=auth_headers).status_code == 200
+
+
+def test_exempt_routes(client, controller):
+    for _ in range(3):
+        controller.acquire(DETAIL)
+
+    assert client.get('/').status_code == 200
+
+
+def test_pool_saturation():
+    options = {'pool_size': 1, 'max_overflow': 0}
+    engine = create_engine('sqlite://', poolclass=QueuePool, **options)
+    assert pool_capacity(engine, options) == 1
+    assert not pool_saturated(engine, options)
+
+    with engine.connect():
+        assert pool_saturated(engine, options)
+
+    # Sin max_overflow configurado, el valor por defecto de QueuePool
+    assert pool_capacity(engine) == 11
+    assert pool_capacity(engine, {'max_overflow': -1}) is None
+
+
+def test_listings_with_url_arguments_are_lists(app):
+    for path in ('/api/vehicles/client/1', '/api/work-orders/vehicle/1', '/api/work-orders/user/1'):
+        with app.test_request_context(path):
+            assert route_class(request) == LIST
+    with app.test_request_context('/api/vehicles/1'):
+        assert route_class(request) == DETAIL
+
+
+class TestPoolTimeout:
+    @pytest.fixture
+    def app_config(self, tmp_path):
+        class Config(AdmissionConfig):
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///' + str(tmp_path / 'admission.db')
+            SQLALCHEMY_ENGINE_OPTIONS = {'pool_size': 1, 'max_overflow': 0, 'pool_timeout': 0.05}
+        return Config
+
+    def test_pool_timeout_is_503(self, client, auth_headers, seed):
+        client_id = seed['clients'][0]
+        db.session.close()
+        # Conexión tomada fuera de la admisión (trabajo en segundo plano, SSE)
+        with db.engine.connect():
+            response = client.get(f'/api/clients/{client_id}', headers=auth_headers)
+
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '2'
+        assert response.get_json()['success'] is False
+        assert client.get(f'/api/clients/{client_id}', headers=auth_headers).status_code == 200
+
+
+def test_acquire_waits_for_release():
+    controller = AdmissionController(capacity=1)
+    assert controller.acquire(DETAIL)
+    assert not controller.acquire(DETAIL, timeout=0.01)
+
+    controller.release()
+    assert controller.acquire(DETAIL, timeout=0.01)
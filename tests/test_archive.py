@@ -0,0 +1,74 @@
+"""
+Archivado de órdenes de trabajo antiguas
+"""
+from datetime import date, datetime, timedelta
+import pytest
+from app import db
+from app.models import WorkOrder, WorkOrderArchive
+from app.utils.archive import archive_work_orders, table_sizes
+
+
+@pytest.fixture
+def old_orders(seed):
+    deleted, closed, recent = [db.session.get(WorkOrder, i) for i in seed['work_orders']]
+    deleted.deleted_at = datetime.utcnow() - timedelta(days=400)
+    closed.Status = 'Completada'
+    closed.OrderDate = date.today() - timedelta(days=400)
+    recent.Status = 'Completada'
+    recent.OrderDate = date.today()
+    db.session.commit()
+    return {'deleted': deleted.ID, 'closed': closed.ID, 'recent': recent.ID}
+
+
+def test_archive_moves_old_rows_in_batches(old_orders):
+    moved = archive_work_orders(retention_days=365, closed_statuses=['Completada'], batch_size=1)
+
+    assert moved == 2
+    assert [o.ID for o in WorkOrder.query.all()] == [old_orders['recent']]
+    assert {o.ID for o in WorkOrderArchive.query.all()} == {old_orders['deleted'], old_orders['closed']}
+    assert archive_work_orders(retention_days=365, closed_statuses=['Completada']) == 0
+
+
+def test_archived_ids_are_not_reused(client, auth_headers, seed):
+    newest = db.session.get(WorkOrder, seed['work_orders'][-1])
+    newest.Status = 'Completada'
+    newest.OrderDate = date.today() - timedelta(days=400)
+    db.session.commit()
+    assert archive_work_orders(retention_days=365, closed_statuses=['Completada']) == 1
+
+    response = client.post('/api/work-orders', headers=auth_headers, json={
+        'OrderDate': date.today().isoformat(), 'VehicleID': seed['vehicles'][0], 'UserID': seed['users'][0]
+    })
+    assert response.status_code == 201
+    assert response.get_json()['data']['ID'] > seed['work_orders'][-1]
+
+
+def test_dry_run_does_not_move_rows(old_orders):
+    assert archive_work_orders(retention_days=365, closed_statuses=['Completada'], dry_run=True) == 2
+    assert WorkOrder.query.count() == 3
+
+
+def test_include_archived_read_path(client, auth_headers, seed, old_orders):
+    archive_work_orders(retention_days=365, closed_statuses=['Completada'])
+    closed = WorkOrderArchive.query.get(old_orders['closed'])
+    path = f"/api/work-orders/vehicle/{closed.VehicleID}"
+
+    assert client.get(path, headers=auth_headers).get_json()['count'] == 0
+
+    data = client.get(path + '?include_archived=true', headers=auth_headers).get_json()['data']
+    assert [(o['ID'], o['Archived']) for o in data] == [(closed.ID, True)]
+    assert data[0]['LicensePlate'] is not None
+
+    response = client.get(f"/api/work-orders/{closed.ID}?include_archived=1", headers=auth_headers)
+    assert response.status_code == 200
+
+    # Las órdenes eliminadas siguen ocultas aunque estén archivadas
+    response = client.get(f"/api/work-orders/{old_orders['deleted']}?include_archived=1", headers=auth_headers)
+    assert response.status_code == 404
+
+
+def test_table_sizes_reports_rows(old_orders):
+    report = table_sizes()
+
+    assert report['work_orders']['rows'] == 3
+    assert report['work_orders_archive']['rows'] == 0
@@ -0,0 +1,277 @@
+"""
+El modo ASGI debe devolver el mismo contrato JSON que las rutas Flask
+"""
+from datetime import datetime
+import pytest
+
+pytest.importorskip('starlette')
+pytest.importorskip('aiosqlite')
+pytest.importorskip('a2wsgi')
+pytest.importorskip('httpx')
+
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.testclient import TestClient
+from app import db
+from app.asgi import async_database_url, async_engine_options, create_asgi_app
+from app.models import Client, Role, User
+from app.utils import replica
+from app.utils.admission import LIST
+from app.utils.auth import create_user_token, get_token_versions
+from tests.conftest import TestConfig
+
+
+READ_ROUTES = [
+    ('/api/clients', None),
+    ('/api/clients/{}', 'clients'),
+    ('/api/users', None),
+    ('/api/users/mechanics', None),
+    ('/api/users/{}', 'users'),
+    ('/api/vehicles', None),
+    ('/api/vehicles/{}', 'vehicles'),
+    ('/api/vehicles/client/{}', 'clients'),
+    ('/api/work-orders', None),
+    ('/api/work-orders/{}', 'work_orders'),
+    ('/api/work-orders/vehicle/{}', 'vehicles'),
+    ('/api/work-orders/user/{}', 'users'),
+]
+
+
+@pytest.fixture
+def app_config(tmp_path):
+    # Archivo compartido: el engine asíncrono no ve una base en memoria ajena
+    class FileConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + str(tmp_path / 'asgi.db')
+    return FileConfig
+
+
+@pytest.fixture
+def asgi_client(app_config, seed):
+    with TestClient(create_asgi_app(app_config)) as client:
+        yield client
+
+
+@pytest.mark.parametrize('path, key', READ_ROUTES)
+def test_read_routes_match_flask(client, asgi_client, auth_headers, seed, path, key):
+    if key:
+        path = path.format(seed[key][0])
+
+    expected = client.get(path, headers=auth_headers)
+    response = asgi_client.get(path, headers=auth_headers)
+
+    assert response.status_code == expected.status_code == 200
+    assert response.content == expected.data
+    assert response.headers.get('X-Total-Count') == expected.headers.get('X-Total-Count')
+
+
+FLASK_ONLY_QUERIES = [
+    ('/api/clients?ids={}', 'clients'),
+    ('/api/clients?count_only=true', None),
+    ('/api/work-orders?count_only=true&estimate=true', None),
+    ('/api/vehicles?limit=2&offset=1', None),
+    ('/api/work-orders?from=2024-10-02&to=2024-10-02', None),
+    ('/api/work-orders/{}?include_archived=true', 'work_orders'),
+    ('/api/work-orders/vehicle/{}?include_archived=true', 'vehicles'),
+    ('/api/vehicles/client/{}?count_only=true', 'clients'),
+]
+
+
+@pytest.mark.parametrize('path, key', FLASK_ONLY_QUERIES)
+def test_flask_only_args_are_delegated(client, asgi_client, auth_headers, seed, path, key):
+    if key:
+        path = path.format(seed[key][0])
+
+    expected = client.get(path, headers=auth_headers)
+    response = asgi_client.get(path, headers=auth_headers)
+
+    assert response.status_code == expected.status_code == 200
+    assert response.content == expected.data
+    assert response.headers.get('X-Total-Count') == expected.headers.get('X-Total-Count')
+
+
+def test_multi_get_via_asgi(asgi_client, auth_headers, seed):
+    ids = ','.join(str(client_id) for client_id in seed['clients'][:2])
+    response = asgi_client.get(f'/api/clients?ids={ids}', headers=auth_headers)
+    assert response.json()['count'] == 2
+
+
+def test_paginated_and_count_only_via_asgi(asgi_client, auth_headers):
+    response = asgi_client.get('/api/vehicles?limit=2', headers=auth_headers)
+    assert response.json()['count'] == 2
+    assert response.headers['X-Total-Count'] == '3'
+
+    response = asgi_client.get('/api/work-orders?count_only=true', headers=auth_headers)
+    assert response.json() == {'success': True, 'count': 3, 'estimated': False}
+
+    response = asgi_client.get('/api/work-orders?from=2024-10-02', headers=auth_headers)
+    assert response.json()['count'] == 2
+
+
+def test_not_found_matches_flask(client, asgi_client, auth_headers):
+    expected = client.get('/api/work-orders/999', headers=auth_headers)
+    response = asgi_client.get('/api/work-orders/999', headers=auth_headers)
+
+    assert response.status_code == expected.status_code == 404
+    assert response.json() == expected.get_json()
+
+
+def test_missing_token_is_rejected(asgi_client):
+    response = asgi_client.get('/api/clients')
+
+    assert response.status_code == 401
+
+
+def test_revoked_token_is_rejected(asgi_client, auth_headers):
+    assert asgi_client.get('/api/clients', headers=auth_headers).status_code == 200
+    assert asgi_client.post('/api/auth/logout', headers=auth_headers).status_code == 200
+
+    response = asgi_client.get('/api/clients', headers=auth_headers)
+    assert response.status_code == 401
+    assert response.json()['success'] is False
+
+
+def test_stale_token_version_is_rejected(asgi_client, seed):
+    user = db.session.get(User, seed['users'][0])
+    headers = {'Authorization': f'Bearer {create_user_token(user)}'}
+    assert asgi_client.get('/api/clients', headers=headers).status_code == 200
+
+    # Usuario eliminado desde otra app (otro proceso): vence su caché de versiones
+    user.deleted_at = datetime.utcnow()
+    db.session.commit()
+    get_token_versions(asgi_client.app.state.flask_app).clear()
+
+    response = asgi_client.get('/api/clients', headers=headers)
+    assert response.status_code == 401
+    assert response.json()['success'] is False
+
+
+def test_profiled_requests_are_served_by_flask(asgi_client, seed):
+    role = Role.query.filter_by(Name='Administrador').one()
+    admin = User(RUN='6-K', Email='admin@lubricentro.com', FirstName='Ada', LastName='Admin',
+                 Password='hash-no-usado', RoleID=role.ID)
+    db.session.add(admin)
+    db.session.commit()
+    headers = {'Authorization': f'Bearer {create_user_token(admin)}'}
+
+    for path, extra in (('/api/clients', {'X-Profile': '1'}), ('/api/vehicles?profile=1', {})):
+        response = asgi_client.get(path, headers={**headers, **extra})
+        assert response.status_code == 200
+        profile_id = response.headers['X-Profile-Id']
+        assert asgi_client.get(f'/api/profiles/{profile_id}', headers=headers).json()['data']['sql_statements'] >= 1
+
+
+def test_other_routes_fall_back_to_flask(asgi_client, auth_headers):
+    response = asgi_client.post('/api/clients', headers=auth_headers, json={
+        'RUN': '33333333-3', 'FirstName': 'Nuevo', 'LastName': 'Cliente'
+    })
+
+    assert response.status_code == 201
+    assert asgi_client.get('/api/clients', headers=auth_headers).json()['count'] == 4
+
+
+def test_async_database_url():
+    assert async_database_url('sqlite:///x.db').drivername == 'sqlite+aiosqlite'
+
+    url = async_database_url('postgresql+psycopg://u:p@host/db?sslmode=require&pgbouncer=true')
+    assert url.drivername == 'postgresql+asyncpg'
+    assert dict(url.query) == {'ssl': 'require'}
+
+
+def test_async_engine_options_drop_psycopg_connect_args():
+    config = {'SQLALCHEMY_ENGINE_OPTIONS': {'pool_recycle': 300, 'connect_args': {'prepare_threshold': 5}}}
+
+    assert async_engine_options(config) == {'pool_recycle': 300}
+    assert 'connect_args' in config['SQLALCHEMY_ENGINE_OPTIONS']
+
+
+class TestReplica:
+    """Las rutas ASGI leen de la réplica con las reglas de ``RoutingSession``"""
+
+    @pytest.fixture
+    def app_config(self, tmp_path):
+        class ReplicaConfig(TestConfig):
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///' + str(tmp_path / 'primary.db')
+            SQLALCHEMY_BINDS = {'replica': 'sqlite:///' + str(tmp_path / 'replica.db')}
+        return ReplicaConfig
+
+    @pytest.fixture(autouse=True)
+    def replica_db(self, app, seed, monkeypatch):
+        monkeypatch.setitem(replica._lag_cache, 'checked_at', None)
+        monkeypatch.setattr(replica, '_recent_writers', {})
+
+        # La réplica solo tiene un cliente, distinto de los del primario
+        engine = db.engines['replica']
+        db.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(Client.__table__.insert(), {
+                'RUN': '99999999-9', 'FirstName': 'Solo', 'LastName': 'Replica',
+                'created_at': datetime.utcnow(), 'updated_at': datetime.utcnow()
+            })
+        db.session.remove()
+        yield
+        db.metadata.drop_all(engine)
+
+    def test_get_reads_from_replica(self, asgi_client, auth_headers):
+        response = asgi_client.get('/api/clients', headers=auth_headers)
+
+        assert [c['FirstName'] for c in response.json()['data']] == ['Solo']
+
+    def test_override_header_reads_from_primary(self, asgi_client, auth_headers):
+        response = asgi_client.get('/api/clients', headers={**auth_headers, 'X-DB-Target': 'primary'})
+
+        assert response.json()['count'] == 3
+
+    def test_writer_reads_from_primary(self, asgi_client, auth_headers):
+        response = asgi_client.post('/api/clients', headers=auth_headers, json={
+            'RUN': '44444444-4', 'FirstName': 'Nuevo', 'LastName': 'Cliente'
+        })
+        assert response.status_code == 201
+
+        response = asgi_client.get('/api/clients', headers=auth_headers)
+        assert response.json()['count'] == 4
+
+    def test_lagging_replica_falls_back_to_primary(self, asgi_client, auth_headers, monkeypatch):
+        monkeypatch.setattr(replica, 'replica_lag_seconds', lambda engine: 60.0)
+
+        response = asgi_client.get('/api/clients', headers=auth_headers)
+
+        assert response.json()['count'] == 3
+
+
+class TestAdmission:
+    """Las rutas ASGI comparten las plazas y el 503 del control de admisión"""
+
+    @pytest.fixture
+    def app_config(self, tmp_path):
+        class AdmissionConfig(TestConfig):
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///' + str(tmp_path / 'asgi.db')
+            ADMISSION_MAX_CONCURRENT = 3
+            ADMISSION_RESERVED_SLOTS = 1
+            ADMISSION_WAIT_SECONDS = 0
+        return AdmissionConfig
+
+    def test_lists_cannot_use_reserved_slots(self, asgi_client, auth_headers, seed):
+        controller = asgi_client.app.state.admission
+        assert controller.acquire(LIST) and controller.acquire(LIST)
+
+        response = asgi_client.get('/api/clients', headers=auth_headers)
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '2'
+        assert response.json()['success'] is False
+
+        client_id = seed['clients'][0]
+        assert asgi_client.get(f'/api/clients/{client_id}', headers=auth_headers).status_code == 200
+        assert controller.in_flight == 2
+
+    def test_pool_timeout_is_503(self, asgi_client, auth_headers, seed, monkeypatch):
+        # La conexión se toma del pool en la primera consulta de la sesión
+        async def timeout(*args, **kwargs):
+            raise PoolTimeout('QueuePool limit reached')
+        monkeypatch.setattr(AsyncSession, 'scalars', timeout)
+
+        for path in ('/api/clients', f'/api/clients/{seed["clients"][0]}', '/api/users/mechanics'):
+            response = asgi_client.get(path, headers=auth_headers)
+            assert response.status_code == 503
+            assert response.headers['Retry-After'] == '2'
+
+        assert asgi_client.app.state.admission.in_flight == 0
@@ -0,0 +1,93 @@
+"""
+Claims de rol en el JWT, autorización por rol y versión de tokens
+"""
+from datetime import datetime
+import pytest
+from flask import jsonify
+from flask_jwt_extended import decode_token, jwt_required
+from werkzeug.security import generate_password_hash
+from app import db
+from app.models import Role, User
+from app.utils.auth import create_user_token, role_required
+
+
+@pytest.fixture
+def admin(seed):
+    role = Role.query.filter_by(Name='Administrador').one()
+    user = User(RUN='6-K', Email='admin@lubricentro.com', FirstName='Ada', LastName='Admin',
+                Password=generate_password_hash('clave'), RoleID=role.ID)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def admin_only_route(app):
+    @jwt_required()
+    @role_required('Administrador')
+    def admin_only():
+        return jsonify({'success': True})
+
+    app.add_url_rule('/test/admin-only', view_func=admin_only)
+
+
+def _headers(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_login_token_carries_role_and_name(client, admin):
+    response = client.post('/api/auth/login', json={'rut': '6-K', 'password': 'clave'})
+
+    claims = decode_token(response.get_json()['token'])
+    assert claims['sub'] == str(admin.ID)
+    assert claims['role'] == 'Administrador'
+    assert claims['role_id'] == admin.RoleID
+    assert claims['name'] == 'Ada Admin'
+    assert claims['ver'] == 0
+
+
+def test_role_required_reads_role_from_token(client, admin, seed, admin_only_route, query_budget):
+    admin_headers = _headers(create_user_token(admin))
+    mechanic_headers = _headers(create_user_token(db.session.get(User, seed['users'][0])))
+    client.get('/test/admin-only', headers=admin_headers)
+
+    # Versión ya en memoria: ni la autorización ni la verificación consultan la BD
+    with query_budget(0):
+        assert client.get('/test/admin-only', headers=admin_headers).status_code == 200
+    assert client.get('/test/admin-only', headers=mechanic_headers).status_code == 403
+
+
+def test_role_required_without_claims_loads_role(client, auth_headers, admin_only_route):
+    # Tokens emitidos antes de los claims: solo traen el ID
+    assert client.get('/test/admin-only', headers=auth_headers).status_code == 403
+
+
+def test_role_change_invalidates_previous_tokens(client, admin, seed):
+    headers = _headers(create_user_token(admin))
+    assert client.get('/api/auth/me', headers=headers).status_code == 200
+
+    admin.RoleID = Role.query.filter_by(Name='Mecánico').one().ID
+    db.session.commit()
+
+    response = client.get('/api/auth/me', headers=headers)
+    assert response.status_code == 401
+    assert response.get_json()['success'] is False
+
+    new_token = create_user_token(db.session.get(User, admin.ID))
+    assert decode_token(new_token)['ver'] == 1
+    assert client.get('/api/auth/me', headers=_headers(new_token)).status_code == 200
+
+
+def test_deleted_user_token_is_rejected(client, admin):
+    headers = _headers(create_user_token(admin))
+    admin.deleted_at = datetime.utcnow()
+    db.session.commit()
+
+    assert client.get('/api/clients', headers=headers).status_code == 401
+
+
+def test_same_role_does_not_bump_version(admin):
+    admin.RoleID = admin.RoleID
+    db.session.commit()
+
+    assert admin.TokenVersion == 0
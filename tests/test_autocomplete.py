@@ -0,0 +1,92 @@
+"""
+Autocompletado: índice de prefijos, actualización y ruta /api/autocomplete
+"""
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import update
+from app import db
+from app.models import Client
+from app.utils.autocomplete import PrefixIndex, fold_name, get_autocomplete, name_keys, run_prefix
+
+
+@pytest.fixture
+def index(app, seed):
+    autocomplete = get_autocomplete(app)
+    autocomplete.refresh_seconds = 3600
+    autocomplete.ensure_built()
+    return autocomplete
+
+
+def _search(client, auth_headers, **params):
+    response = client.get('/api/autocomplete', headers=auth_headers, query_string=params)
+    assert response.status_code == 200
+    return response.get_json()['data']
+
+
+def test_key_normalization():
+    assert fold_name('  José   PÉREZ ') == 'jose perez'
+    assert run_prefix('012.345.6') == '123456'
+    assert name_keys('Ana María', 'Soto') == {'ana maria soto', 'maria soto', 'soto', 'soto ana maria'}
+
+
+def test_prefix_index_replaces_and_evicts_oldest():
+    prefix_index = PrefixIndex(('ID', 'Name'), max_entries=2)
+    prefix_index.put(1, ['ana', 'soto'], ('Ana Soto',))
+    prefix_index.put(2, ['andres'], ('Andrés',))
+    prefix_index.put(1, ['anabel'], ('Anabel',))
+
+    assert prefix_index.search('an', 10) == [{'ID': 1, 'Name': 'Anabel'}, {'ID': 2, 'Name': 'Andrés'}]
+    assert prefix_index.search('soto', 10) == []
+
+    # El 2 es el modificado hace más tiempo
+    prefix_index.put(3, ['antonia'], ('Antonia',))
+    assert [entry['ID'] for entry in prefix_index.search('an', 10)] == [1, 3]
+    assert len(prefix_index) == 2
+
+
+def test_search_by_type(client, auth_headers, index):
+    plates = _search(client, auth_headers, q='abcd-1', type='plate')
+    assert [s['LicensePlate'] for s in plates] == ['ABCD10', 'ABCD11', 'ABCD12']
+
+    names = _search(client, auth_headers, q='CLIENTE1', type='client')
+    assert [(s['type'], s['Name']) for s in names] == [('client', 'Cliente1 Prueba')]
+
+    runs = _search(client, auth_headers, q='22.222.22', type='run', limit=2)
+    assert [s['RUN'] for s in runs] == ['22222220-0', '22222221-1']
+
+
+def test_search_does_not_query_database(client, auth_headers, index, query_budget):
+    with query_budget(0):
+        assert _search(client, auth_headers, q='prueba')
+
+
+def test_invalid_type(client, auth_headers, seed):
+    response = client.get('/api/autocomplete?q=a&type=email', headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_create_is_visible_after_commit(client, auth_headers, index):
+    response = client.post('/api/clients', headers=auth_headers, json={
+        'RUN': '12.345.678-5', 'FirstName': 'Ñandú', 'LastName': 'Reciente'
+    })
+    assert response.status_code == 201
+
+    assert [s['Name'] for s in _search(client, auth_headers, q='nandu', type='client')] == ['Ñandú Reciente']
+    assert _search(client, auth_headers, q='12345', type='run')[0]['RUN'] == '12.345.678-5'
+
+
+def test_refresh_picks_up_changes_from_other_processes(index, seed):
+    # Escritura con SQL directo: no pasa por los eventos de la sesión
+    db.session.execute(update(Client.__table__).where(Client.ID == seed['clients'][2]).values(
+        FirstName='Renombrado', updated_at=datetime.utcnow() + timedelta(seconds=1)
+    ))
+    db.session.execute(update(Client.__table__).where(Client.ID == seed['clients'][0]).values(
+        deleted_at=datetime.utcnow(), updated_at=datetime.utcnow() + timedelta(seconds=1)
+    ))
+    db.session.commit()
+    assert index.search('renombrado', ['client']) == []
+
+    index.refresh()
+
+    assert [s['ID'] for s in index.search('renombrado', ['client'])] == [seed['clients'][2]]
+    assert [s['ID'] for s in index.search('cliente', ['client'])] == [seed['clients'][1]]
@@ -0,0 +1,67 @@
+"""
+Peticiones agrupadas en /api/batch
+"""
+from unittest import mock
+from flask_jwt_extended import JWTManager
+
+
+def test_batch_returns_responses_in_order(client, auth_headers, seed):
+    client_id = seed['clients'][0]
+    requests = [
+        {'method': 'GET', 'path': f'/api/clients/{client_id}'},
+        {'method': 'GET', 'path': '/api/vehicles?ids=999'},
+        {'method': 'GET', 'path': '/api/clients/999'},
+    ]
+
+    body = client.post('/api/batch', headers=auth_headers, json={'requests': requests}).get_json()
+
+    assert body['count'] == 3
+    first, second, third = body['responses']
+    assert first['status'] == 200 and first['body']['data']['ID'] == client_id
+    assert second['status'] == 200 and second['body']['missing'] == [999]
+    assert third['status'] == 404
+
+
+def test_reads_after_write_see_the_write(client, auth_headers, seed):
+    requests = [
+        {'method': 'POST', 'path': '/api/vehicles', 'body': {'LicensePlate': 'ZZZZ99', 'ClientID': seed['clients'][0]}},
+        {'method': 'GET', 'path': '/api/vehicles'},
+    ]
+
+    body = client.post('/api/batch', headers=auth_headers, json={'requests': requests}).get_json()
+
+    created, listing = body['responses']
+    assert created['status'] == 201
+    assert 'ZZZZ99' in [vehicle['LicensePlate'] for vehicle in listing['body']['data']]
+
+
+def test_subrequests_reuse_verified_token(client, auth_headers, seed):
+    requests = [{'method': 'GET', 'path': '/api/clients'} for _ in range(5)]
+
+    with mock.patch.object(JWTManager, '_decode_jwt_from_config', autospec=True,
+                           side_effect=JWTManager._decode_jwt_from_config) as decode:
+        body = client.post('/api/batch', headers=auth_headers, json={'requests': requests}).get_json()
+
+    assert [response['status'] for response in body['responses']] == [200] * 5
+    # Solo la petición batch decodifica el token
+    assert decode.call_count == 1
+
+
+def test_batch_requires_token(client):
+    response = client.post('/api/batch', json={'requests': [{'method': 'GET', 'path': '/api/clients'}]})
+
+    assert response.status_code == 401
+
+
+def test_invalid_batches(client, auth_headers, app):
+    def post(requests):
+        return client.post('/api/batch', headers=auth_headers, json={'requests': requests})
+
+    assert post([]).status_code == 400
+    assert post([{'method': 'GET'}]).status_code == 400
+    assert post([{'method': 'TRACE', 'path': '/api/clients'}]).status_code == 400
+    assert post([{'method': 'POST', 'path': '/api/batch'}]).status_code == 400
+    assert post([{'method': 'GET', 'path': '/api/work-orders/events'}]).status_code == 400
+
+    too_many = [{'method': 'GET', 'path': '/'}] * (app.config['BATCH_MAX_REQUESTS'] + 1)
+    assert post(too_many).status_code == 400
@@ -0,0 +1,80 @@
+"""
+Feed incremental /api/changes
+"""
+from datetime import date, datetime, timedelta
+import pytest
+from app import db
+from app.models import Client, Vehicle, WorkOrder, WorkOrderArchive
+from app.utils.archive import archive_work_orders
+
+
+@pytest.fixture(autouse=True)
+def no_settle_window(app):
+    app.config['CHANGE_FEED_SETTLE_SECONDS'] = 0
+
+
+def _changes(client, headers, **params):
+    response = client.get('/api/changes', headers=headers, query_string=params)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_initial_sync_returns_everything(client, auth_headers, seed):
+    body = _changes(client, auth_headers)
+
+    assert [len(body['data'][name]) for name in ('clients', 'vehicles', 'work_orders', 'users')] == [3, 3, 3, 3]
+    assert body['has_more'] is False
+    assert _changes(client, auth_headers, since=body['next'])['count'] == 0
+
+
+def test_only_changes_since_token(client, auth_headers, seed):
+    token = _changes(client, auth_headers)['next']
+
+    db.session.get(Vehicle, seed['vehicles'][1]).Color = 'Azul'
+    db.session.get(Client, seed['clients'][2]).deleted_at = datetime.utcnow()
+    db.session.commit()
+
+    body = _changes(client, auth_headers, since=token)
+    assert [v['Color'] for v in body['data']['vehicles']] == ['Azul']
+    assert body['deleted']['clients'] == [seed['clients'][2]]
+    assert body['data']['work_orders'] == []
+    assert body['count'] == 2
+
+
+def test_archived_orders_are_reported_as_deleted(client, auth_headers, seed):
+    old = WorkOrder.query.order_by(WorkOrder.ID).first()
+    old.Status = 'Completada'
+    old.OrderDate = date.today() - timedelta(days=400)
+    db.session.commit()
+    old_id = old.ID
+    token = _changes(client, auth_headers)['next']
+
+    assert archive_work_orders(retention_days=365, closed_statuses=['Completada']) == 1
+    body = _changes(client, auth_headers, since=token)
+    assert body['deleted']['work_orders'] == [old_id]
+    assert _changes(client, auth_headers, since=body['next'])['deleted']['work_orders'] == []
+
+    # La sincronización inicial no recibe el historial archivado
+    assert WorkOrderArchive.query.count() == 1
+    assert _changes(client, auth_headers)['deleted']['work_orders'] == []
+
+
+def test_pagination_with_limit(client, auth_headers, seed):
+    first = _changes(client, auth_headers, limit=2)
+    second = _changes(client, auth_headers, limit=2, since=first['next'])
+
+    assert first['has_more'] is True
+    ids = [c['ID'] for c in first['data']['clients'] + second['data']['clients']]
+    assert ids == seed['clients']
+    assert second['has_more'] is False
+
+
+def test_invalid_token(client, auth_headers):
+    response = client.get('/api/changes?since=no-es-un-token', headers=auth_headers)
+
+    assert response.status_code == 400
+
+
+def test_change_feed_query_budget(client, auth_headers, seed, query_budget):
+    with query_budget(5):
+        _changes(client, auth_headers)
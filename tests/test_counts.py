@@ -0,0 +1,88 @@
+"""
+Totales de las rutas de colección: count_only, X-Total-Count y estimación
+"""
+from datetime import datetime
+import pytest
+from app import db
+from app.models import Client
+from app.utils import counts
+
+
+COLLECTIONS = [
+    ('/api/clients', 3),
+    ('/api/users', 3),
+    ('/api/vehicles', 3),
+    ('/api/work-orders', 3),
+]
+
+
+@pytest.mark.parametrize('path, total', COLLECTIONS)
+def test_count_only_runs_a_single_count(client, auth_headers, seed, query_budget, path, total):
+    with query_budget(1):
+        response = client.get(f'{path}?count_only=true', headers=auth_headers)
+    body = response.get_json()
+    assert body == {'success': True, 'count': total, 'estimated': False}
+    assert response.headers['X-Total-Count'] == str(total)
+
+
+def test_count_only_uses_the_same_filters(client, auth_headers, seed):
+    db.session.get(Client, seed['clients'][0]).deleted_at = datetime.utcnow()
+    db.session.commit()
+    assert client.get('/api/clients?count_only=true', headers=auth_headers).get_json()['count'] == 2
+
+    body = client.get('/api/work-orders?count_only=true&from=2024-10-02', headers=auth_headers).get_json()
+    assert body['count'] == 2
+
+    vehicle_id = seed['vehicles'][0]
+    body = client.get(f'/api/work-orders/vehicle/{vehicle_id}?count_only=true', headers=auth_headers).get_json()
+    assert body['count'] == 1
+
+
+@pytest.mark.parametrize('path, total', COLLECTIONS)
+def test_paginated_list_reports_total(client, auth_headers, seed, path, total):
+    response = client.get(f'{path}?limit=2', headers=auth_headers)
+    body = response.get_json()
+    assert body['count'] == 2
+    assert response.headers['X-Total-Count'] == str(total)
+
+    response = client.get(f'{path}?limit=2&offset=2', headers=auth_headers)
+    assert response.get_json()['count'] == 1
+    assert response.headers['X-Total-Count'] == str(total)
+
+    # Las páginas juntas son el listado completo
+    first = client.get(f'{path}?limit=2', headers=auth_headers).get_json()['data']
+    rest = response.get_json()['data']
+    assert sorted(row['ID'] for row in first + rest) == sorted(
+        row['ID'] for row in client.get(path, headers=auth_headers).get_json()['data'])
+
+
+def test_last_page_total_needs_no_count(client, auth_headers, seed, query_budget):
+    with query_budget(1):
+        response = client.get('/api/clients?limit=50', headers=auth_headers)
+    assert response.headers['X-Total-Count'] == '3'
+
+
+def test_full_list_carries_total_header(client, auth_headers, seed):
+    response = client.get('/api/vehicles', headers=auth_headers)
+    assert response.headers['X-Total-Count'] == '3'
+
+
+@pytest.mark.parametrize('query', ['limit=0', 'limit=abc', 'limit=2&offset=-1', 'limit=5000'])
+def test_invalid_pagination(client, auth_headers, seed, query):
+    assert client.get(f'/api/clients?{query}', headers=auth_headers).status_code == 400
+
+
+def test_estimate_uses_planner_statistics(client, auth_headers, seed, monkeypatch):
+    monkeypatch.setattr(counts, 'estimated_count', lambda model: 120000)
+    body = client.get('/api/work-orders?count_only=true&estimate=true', headers=auth_headers).get_json()
+    assert body == {'success': True, 'count': 120000, 'estimated': True}
+
+    # Con filtros propios del listado se cuenta exacto
+    body = client.get('/api/work-orders?count_only=true&estimate=true&from=2024-10-02',
+                      headers=auth_headers).get_json()
+    assert body == {'success': True, 'count': 2, 'estimated': False}
+
+
+def test_estimate_falls_back_to_exact_count_without_postgres(client, auth_headers, seed):
+    body = client.get('/api/clients?count_only=true&estimate=true', headers=auth_headers).get_json()
+    assert body == {'success': True, 'count': 3, 'estimated': False}
@@ -0,0 +1,114 @@
+"""
+Eventos SSE de órdenes de trabajo
+"""
+import pytest
+from app import db
+from app.models import User, WorkOrder
+from app.utils.auth import create_user_token, get_token_versions
+from app.utils.events import EventBackend, EventBroker, WORK_ORDER_CREATED, WORK_ORDER_STATUS_CHANGED, get_broker
+
+
+@pytest.fixture(autouse=True)
+def short_streams(app):
+    app.config['SSE_HEARTBEAT_SECONDS'] = 0.05
+    app.config['SSE_MAX_STREAM_SECONDS'] = 0.12
+
+
+def test_commits_publish_created_and_status_changed(client, auth_headers, seed):
+    start = get_broker().latest_event_id
+    response = client.post('/api/work-orders', headers=auth_headers, json={
+        'OrderDate': '2024-10-26', 'VehicleID': seed['vehicles'][0], 'UserID': seed['users'][0]
+    })
+    assert response.status_code == 201
+
+    order = db.session.get(WorkOrder, response.get_json()['data']['ID'])
+    order.Status = 'Completada'
+    db.session.commit()
+
+    # Un rollback no publica nada
+    order.Status = 'Cancelada'
+    db.session.flush()
+    db.session.rollback()
+
+    replay = get_broker().subscribe(start).replay
+    assert [name for _, name, _ in replay] == [WORK_ORDER_CREATED, WORK_ORDER_STATUS_CHANGED]
+    assert replay[1][2]['PreviousStatus'] == 'Pendiente'
+    assert replay[1][2]['Status'] == 'Completada'
+
+
+def test_stream_replays_from_last_event_id(client, auth_headers):
+    broker = get_broker()
+    start = broker.latest_event_id
+    for i in range(3):
+        broker.publish(WORK_ORDER_CREATED, {'ID': i})
+
+    headers = {**auth_headers, 'Last-Event-ID': str(start + 1)}
+    response = client.get('/api/work-orders/events', headers=headers)
+    body = response.get_data(as_text=True)
+
+    assert response.mimetype == 'text/event-stream'
+    assert f'id: {start + 1}\n' not in body
+    assert f'id: {start + 2}\nevent: work_order.created\ndata: {{"ID":1}}' in body
+    assert f'id: {start + 3}\n' in body
+    assert ': heartbeat' in body
+    assert broker.subscriber_count == 0
+
+
+def test_stream_accepts_token_in_query_string(client, auth_headers):
+    token = auth_headers['Authorization'].split()[1]
+
+    response = client.get(f'/api/work-orders/events?jwt={token}')
+
+    assert response.status_code == 200
+
+
+class TestPoolCheckout:
+    @pytest.fixture
+    def app_config(self, tmp_path):
+        from tests.conftest import TestConfig
+
+        # Archivo: QueuePool con conteo de conexiones (la base en memoria usa StaticPool)
+        class Config(TestConfig):
+            __test__ = False
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///' + str(tmp_path / 'events.db')
+
+        return Config
+
+    def test_stream_does_not_hold_a_connection(self, app, client, seed):
+        user = db.session.get(User, seed['users'][0])
+        headers = {'Authorization': f'Bearer {create_user_token(user)}'}
+        db.session.commit()
+        get_token_versions(app).clear()
+
+        response = client.get('/api/work-orders/events', headers=headers, buffered=False)
+        assert next(iter(response.response)) == b'retry: 3000\n\n'
+        assert db.engine.pool.checkedout() == 0
+        response.close()
+
+
+def test_reset_when_history_was_lost():
+    broker = EventBroker(replay_size=2)
+    for i in range(5):
+        broker.publish(WORK_ORDER_CREATED, {'ID': i})
+
+    assert broker.subscribe(1).reset is True
+    assert broker.subscribe(3).reset is False
+    assert [event_id for event_id, _, _ in broker.subscribe(3).replay] == [4, 5]
+
+
+def test_slow_subscriber_is_flagged():
+    broker = EventBroker(queue_size=1)
+    subscription = broker.subscribe()
+    broker.publish(WORK_ORDER_CREATED, {})
+    broker.publish(WORK_ORDER_CREATED, {})
+
+    assert subscription.overflowed is True
+
+
+def test_incomplete_backend_fails_at_construction():
+    class StartOnly(EventBackend):
+        def start(self, dispatch):
+            pass
+
+    with pytest.raises(TypeError):
+        StartOnly()
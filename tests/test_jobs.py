@@ -0,0 +1,133 @@
+"""
+Trabajos en segundo plano: exportaciones y reportes mensuales
+"""
+import csv
+import io
+from datetime import datetime, timedelta
+import pytest
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from app import db
+from app.models import Job
+from app.utils.jobs import FAILED, QUEUED, RUNNING, SUCCEEDED, get_runner
+from tests.conftest import TestConfig
+
+
+@pytest.fixture
+def app_config(tmp_path):
+    # Archivo en lugar de memoria: cada hilo del runner usa su propia conexión
+    class JobsConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'jobs.db'}"
+    return JobsConfig
+
+
+@pytest.fixture
+def runner(app):
+    return get_runner(app)
+
+
+def _submit(client, headers, job_type, params):
+    return client.post('/api/jobs', headers=headers, json={'type': job_type, 'params': params})
+
+
+def test_export_job_lifecycle(client, auth_headers, seed, runner):
+    response = _submit(client, auth_headers, 'work_orders_export', {'from': '2024-10-02'})
+    assert response.status_code == 202
+    job_id = response.get_json()['data']['ID']
+    assert response.headers['Location'] == f'/api/jobs/{job_id}'
+
+    runner.wait(timeout=5)
+    db.session.expire_all()
+
+    status = client.get(f'/api/jobs/{job_id}', headers=auth_headers).get_json()['data']
+    assert status['Status'] == 'succeeded'
+    assert status['result_url'] == f'/api/jobs/{job_id}/result'
+
+    result = client.get(status['result_url'], headers=auth_headers)
+    assert result.mimetype == 'text/csv'
+    rows = list(csv.DictReader(io.StringIO(result.get_data().decode('utf-8-sig'))))
+    assert [int(row['ID']) for row in rows] == seed['work_orders'][1:]
+    assert rows[0]['LicensePlate'] == 'ABCD11'
+
+
+def test_status_poll_does_not_load_result(client, auth_headers, seed):
+    job = Job(Type='work_orders_export', Params='{}', Status=SUCCEEDED, UserID=seed['users'][0],
+              Result=b'x' * 1024, ResultMimetype='text/csv', ResultFilename='ordenes.csv')
+    db.session.add(job)
+    db.session.commit()
+    db.session.expire_all()
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        assert client.get(f'/api/jobs/{job.ID}', headers=auth_headers).status_code == 200
+        assert not [s for s in statements if '"Result"' in s]
+
+        assert client.get(f'/api/jobs/{job.ID}/result', headers=auth_headers).get_data() == b'x' * 1024
+        assert len([s for s in statements if '"Result"' in s]) == 1
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+
+
+def test_job_fails_if_it_cannot_be_marked_running(client, auth_headers, runner):
+    def reject_running(session, flush_context, instances):
+        if any(isinstance(obj, Job) and obj.Status == RUNNING for obj in session.dirty):
+            raise RuntimeError('Base de datos no disponible')
+
+    event.listen(Session, 'before_flush', reject_running)
+    try:
+        job_id = _submit(client, auth_headers, 'monthly_report', {'year': 2024, 'month': 10}).get_json()['data']['ID']
+        runner.wait(timeout=5)
+    finally:
+        event.remove(Session, 'before_flush', reject_running)
+
+    db.session.expire_all()
+    status = client.get(f'/api/jobs/{job_id}', headers=auth_headers).get_json()['data']
+    assert status['Status'] == FAILED
+    assert status['Error'] == 'Base de datos no disponible'
+
+
+def test_monthly_report_job(client, auth_headers, seed, runner):
+    job_id = _submit(client, auth_headers, 'monthly_report', {'year': 2024, 'month': 10}).get_json()['data']['ID']
+    runner.wait(timeout=5)
+
+    report = client.get(f'/api/jobs/{job_id}/result', headers=auth_headers).get_json()
+    assert report['month'] == '2024-10'
+    assert report['total'] == 3
+    assert report['by_status'] == [{'Orders': 3, 'Status': 'Pendiente'}]
+    assert report['by_brand'] == [{'Brand': 'Toyota', 'Orders': 3}]
+    assert [row['Orders'] for row in report['by_mechanic']] == [1, 1, 1]
+
+
+def test_invalid_jobs(client, auth_headers):
+    assert _submit(client, auth_headers, 'desconocido', {}).status_code == 400
+    assert _submit(client, auth_headers, 'monthly_report', {'year': 2024, 'month': 13}).status_code == 400
+    assert _submit(client, auth_headers, 'work_orders_export', {'from': '01-10-2024'}).status_code == 400
+
+
+def test_jobs_are_private(client, auth_headers, seed):
+    job = Job(Type='monthly_report', Params='{}', Status=QUEUED, UserID=seed['users'][1])
+    db.session.add(job)
+    db.session.commit()
+
+    assert client.get(f'/api/jobs/{job.ID}', headers=auth_headers).status_code == 404
+    assert client.get(f'/api/jobs/{job.ID}/result', headers=auth_headers).status_code == 404
+
+
+def test_cleanup_expires_results_and_abandoned_jobs(seed, runner):
+    now = datetime.utcnow()
+    user_id = seed['users'][0]
+    expired = Job(Type='monthly_report', Status='succeeded', UserID=user_id, expires_at=now - timedelta(seconds=1))
+    stuck = Job(Type='monthly_report', Status=RUNNING, UserID=user_id, started_at=now - timedelta(hours=2))
+    fresh = Job(Type='monthly_report', Status=RUNNING, UserID=user_id, started_at=now)
+    db.session.add_all([expired, stuck, fresh])
+    db.session.commit()
+    ids = (expired.ID, stuck.ID, fresh.ID)
+
+    assert runner.cleanup(now) == (1, 1)
+
+    db.session.expire_all()
+    assert db.session.get(Job, ids[0]) is None
+    assert db.session.get(Job, ids[1]).Status == FAILED
+    assert db.session.get(Job, ids[2]).Status == RUNNING
@@ -0,0 +1,44 @@
+"""
+Búsquedas con sentencias preconstruidas
+"""
+from datetime import datetime
+from app import db
+from app.models import Client, Job
+from app.utils.lookups import job_for_user, lookup
+from config.config import postgres_url
+
+
+def test_lookup_returns_active_rows_only(seed):
+    client = lookup('client_by_id', seed['clients'][0])
+    assert client.FirstName == 'Cliente0'
+    assert lookup('client_by_run', '22222221-1').ID == seed['clients'][1]
+
+    db.session.get(Client, seed['clients'][0]).deleted_at = datetime.utcnow()
+    db.session.commit()
+
+    assert lookup('client_by_id', seed['clients'][0]) is None
+    assert lookup('client_by_run', None) is None
+
+
+def test_lookup_loads_relations_in_same_query(seed, query_budget):
+    db.session.expunge_all()
+    with query_budget(1):
+        order = lookup('work_order_by_id', seed['work_orders'][0])
+        assert order.vehicle.LicensePlate == 'ABCD10'
+        assert order.user.FirstName == 'Mecánico0'
+
+
+def test_job_for_user_checks_owner(seed):
+    job = Job(Type='monthly_report', Status='queued', UserID=seed['users'][0])
+    db.session.add(job)
+    db.session.commit()
+
+    assert job_for_user(job.ID, seed['users'][0]) is job
+    assert job_for_user(job.ID, seed['users'][1]) is None
+
+
+def test_postgres_urls_use_psycopg3():
+    assert postgres_url('postgres://u:p@host/db') == 'postgresql+psycopg://u:p@host/db'
+    assert postgres_url('postgresql://u:p@host/db?sslmode=require') == 'postgresql+psycopg://u:p@host/db?sslmode=require'
+    assert postgres_url('postgresql+psycopg2://u:p@host/db') == 'postgresql+psycopg2://u:p@host/db'
+    assert postgres_url('sqlite:///x.db') == 'sqlite:///x.db'
@@ -0,0 +1,57 @@
+"""
+Consulta por lista de IDs en las rutas de colección
+"""
+import pytest
+
+
+@pytest.mark.parametrize('path, key', [
+    ('/api/clients', 'clients'),
+    ('/api/users', 'users'),
+    ('/api/vehicles', 'vehicles'),
+    ('/api/work-orders', 'work_orders'),
+])
+def test_ids_query_preserves_order_and_reports_missing(client, auth_headers, seed, query_budget, path, key):
+    first, second, third = seed[key]
+    ids = f'{third},999,{first},{third}'
+
+    with query_budget(1):
+        body = client.get(f'{path}?ids={ids}', headers=auth_headers).get_json()
+
+    assert [row['ID'] for row in body['data']] == [third, first]
+    assert body['missing'] == [999]
+    assert body['count'] == 2
+
+    with query_budget(1):
+        body = client.post(f'{path}/by-ids', headers=auth_headers, json={'ids': [second, first]}).get_json()
+
+    assert [row['ID'] for row in body['data']] == [second, first]
+
+
+def test_invalid_ids(client, auth_headers):
+    assert client.get('/api/clients?ids=1,a', headers=auth_headers).status_code == 400
+    assert client.post('/api/clients/by-ids', headers=auth_headers, json={'ids': '1,2'}).status_code == 400
+
+    response = client.post('/api/clients/by-ids', headers=auth_headers, json={'ids': list(range(1001))})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('ids', [[True, 2], [2.5], [1.9, 2], ['  7'], [None]])
+def test_non_integer_json_ids_are_rejected(client, auth_headers, ids):
+    response = client.post('/api/clients/by-ids', headers=auth_headers, json={'ids': ids})
+
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def test_ids_query_rejects_non_digits(client, auth_headers, seed):
+    assert client.get('/api/clients?ids=1.5', headers=auth_headers).status_code == 400
+    assert client.get('/api/clients?ids=-1', headers=auth_headers).status_code == 400
+
+    first = seed['clients'][0]
+    assert client.get(f'/api/clients?ids=%20{first}', headers=auth_headers).get_json()['count'] == 1
+
+
+def test_empty_ids(client, auth_headers, seed):
+    body = client.get('/api/vehicles?ids=', headers=auth_headers).get_json()
+
+    assert body['data'] == [] and body['missing'] == []
@@ -0,0 +1,54 @@
+"""
+Particionado de work_orders: utilidades y fallback en SQLite
+"""
+from datetime import date
+from unittest import mock
+from app import db
+from app.models import WorkOrder
+from app.utils import partitions
+from app.utils.partitions import add_months, ensure_future_partitions, is_partitioned, partition_name
+
+
+def test_month_helpers():
+    assert add_months(date(2024, 11, 1), 2) == date(2025, 1, 1)
+    assert add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+    assert partition_name(date(2024, 3, 1)) == 'work_orders_y2024m03'
+
+
+def test_sqlite_fallback_is_noop(app):
+    assert is_partitioned() is False
+    assert ensure_future_partitions() == []
+
+
+def test_work_orders_date_range_filter(client, auth_headers, seed):
+    response = client.get('/api/work-orders?from=2024-10-02&to=2024-10-02', headers=auth_headers)
+    assert [o['OrderDate'] for o in response.get_json()['data']] == ['2024-10-02']
+
+    user_id = seed['users'][0]
+    response = client.get(f'/api/work-orders/user/{user_id}?from=2024-10-02', headers=auth_headers)
+    assert response.get_json()['count'] == 0
+
+    response = client.get('/api/work-orders?from=02-10-2024', headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_migration_moves_every_model_index(app, monkeypatch):
+    statements = []
+
+    def execute(statement, params=None):
+        statements.append(str(statement))
+        result = mock.MagicMock()
+        result.one.return_value = (None, None)
+        return result
+
+    monkeypatch.setattr(partitions, 'supports_partitioning', lambda: True)
+    monkeypatch.setattr(partitions, 'is_partitioned', lambda: False)
+    monkeypatch.setattr(db.session, 'execute', execute)
+    partitions.migrate_to_partitioned(months_ahead=0)
+
+    names = {index.name for index in WorkOrder.__table__.indexes}
+    assert {'ix_work_orders_OrderDate', 'ix_work_orders_updated_at'} <= names
+    for name in names:
+        legacy = name.replace('work_orders', 'work_orders_unpartitioned')
+        assert f'ALTER INDEX IF EXISTS "{name}" RENAME TO "{legacy}"' in statements
+        assert any(statement.startswith(f'CREATE INDEX "{name}" ON work_orders (') for statement in statements)
@@ -0,0 +1,157 @@
+"""
+Política de hash de contraseñas, rehash al iniciar sesión y pool de verificación
+"""
+import threading
+import time
+import pytest
+from werkzeug.security import generate_password_hash
+from app import db
+from app.models import Role, User
+from app.utils.auth import create_user_token
+from app.utils.passwords import PasswordPool, PasswordPoolBusy, get_password_pool, hash_method, needs_rehash
+from tests.conftest import TestConfig
+
+
+class CheapHashConfig(TestConfig):
+    """Costo bajo para que las pruebas no dependan del costo real"""
+    __test__ = False
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
+    PASSWORD_VERIFY_WORKERS = 2
+    PASSWORD_VERIFY_MAX_QUEUE = 1
+
+
+@pytest.fixture
+def app_config():
+    return CheapHashConfig
+
+
+@pytest.fixture
+def admin(seed):
+    role = Role.query.filter_by(Name='Administrador').one()
+    user = User(RUN='6-K', Email='admin@lubricentro.com', FirstName='Ada', LastName='Admin',
+                Password=generate_password_hash('clave', 'pbkdf2:sha256:1000'), RoleID=role.ID)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def _login(client, password='clave'):
+    return client.post('/api/auth/login', json={'rut': '6-K', 'password': password})
+
+
+def test_needs_rehash_compares_method_and_cost():
+    pwhash = generate_password_hash('clave', 'pbkdf2:sha256:1000')
+    assert hash_method(pwhash) == 'pbkdf2:sha256:1000'
+    assert not needs_rehash(pwhash, 'pbkdf2:sha256:1000')
+    assert needs_rehash(pwhash, 'pbkdf2:sha256:2000')
+    assert needs_rehash(pwhash, 'scrypt:16384:8:1')
+
+
+def test_register_uses_configured_method(client, seed):
+    response = client.post('/api/auth/register', json={
+        'rut': '7-8', 'email': 'nuevo@lubricentro.com', 'firstName': 'Nuevo',
+        'lastName': 'Usuario', 'password': 'clave'
+    })
+    assert response.status_code == 201
+    user = db.session.get(User, response.get_json()['user']['id'])
+    assert hash_method(user.Password) == 'pbkdf2:sha256:1000'
+
+
+def test_login_rehashes_when_policy_changes(app, client, admin):
+    old_hash = admin.Password
+    assert _login(client).status_code == 200
+    db.session.refresh(admin)
+    assert admin.Password == old_hash
+
+    get_password_pool(app).method = 'pbkdf2:sha256:2000'
+    assert _login(client).status_code == 200
+    db.session.refresh(admin)
+    assert hash_method(admin.Password) == 'pbkdf2:sha256:2000'
+    assert get_password_pool(app).stats()['rehashed'] == 1
+
+    # La contraseña sigue siendo válida con el hash nuevo
+    assert _login(client).status_code == 200
+    assert _login(client, 'otra').status_code == 401
+
+
+def test_wrong_password_does_not_rehash(app, client, admin):
+    old_hash = admin.Password
+    get_password_pool(app).method = 'pbkdf2:sha256:2000'
+    assert _login(client, 'otra').status_code == 401
+    db.session.refresh(admin)
+    assert admin.Password == old_hash
+
+
+def test_pool_rejects_when_queue_is_full():
+    pool = PasswordPool('pbkdf2:sha256:1000', workers=1, max_queue=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocking():
+        started.set()
+        release.wait(5)
+
+    first = threading.Thread(target=pool._run, args=(blocking,))
+    second = threading.Thread(target=pool._run, args=(release.wait, 5))
+    first.start()
+    started.wait(5)
+    second.start()
+    while pool.stats()['queue_depth'] < 1:
+        time.sleep(0.001)
+
+    with pytest.raises(PasswordPoolBusy):
+        pool.verify('x', 'y')
+    release.set()
+    first.join()
+    second.join()
+
+    stats = pool.stats()
+    assert stats['rejected'] == 1
+    assert stats['completed'] == 2
+    assert stats['max_queue_depth'] == 1
+    assert stats['queue_depth'] == 0 and stats['running'] == 0
+
+
+def test_login_returns_503_when_pool_is_busy(app, client, admin, monkeypatch):
+    def busy(*args):
+        raise PasswordPoolBusy('Demasiados inicios de sesión simultáneos, intente nuevamente')
+
+    monkeypatch.setattr(get_password_pool(app), 'verify_and_update', busy)
+    response = _login(client)
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == str(app.config['PASSWORD_RETRY_AFTER'])
+
+
+def test_user_creation_returns_503_when_pool_is_busy(app, client, admin, monkeypatch):
+    def busy(*args):
+        raise PasswordPoolBusy('Demasiadas contraseñas en proceso, intente nuevamente')
+
+    monkeypatch.setattr(get_password_pool(app), 'hash', busy)
+    headers = {'Authorization': f'Bearer {create_user_token(admin)}'}
+    responses = [
+        client.post('/api/auth/register', json={
+            'rut': '7-8', 'email': 'nuevo@lubricentro.com', 'firstName': 'Nuevo',
+            'lastName': 'Usuario', 'password': 'clave'
+        }),
+        client.post('/api/users', headers=headers, json={
+            'RUN': '7-8', 'Email': 'nuevo@lubricentro.com', 'FirstName': 'Nuevo',
+            'LastName': 'Usuario', 'Password': 'clave', 'RoleID': admin.RoleID
+        }),
+    ]
+    for response in responses:
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == str(app.config['PASSWORD_RETRY_AFTER'])
+    assert User.query.filter_by(Email='nuevo@lubricentro.com').count() == 0
+
+
+def test_metrics_are_admin_only(app, client, admin, auth_headers):
+    assert client.get('/api/metrics/password-hashing', headers=auth_headers).status_code == 403
+
+    _login(client)
+    response = client.get('/api/metrics/password-hashing',
+                          headers={'Authorization': f'Bearer {create_user_token(admin)}'})
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert data['method'] == 'pbkdf2:sha256:1000'
+    assert data['workers'] == 2
+    assert data['completed'] >= 1
@@ -0,0 +1,65 @@
+"""
+Patente normalizada: búsqueda, duplicados y migración
+"""
+from datetime import datetime
+import pytest
+from sqlalchemy import update
+from app import db
+from app.models import Vehicle
+from app.utils.normalize import normalize_plate
+from migrations.backfill import backfill_normalized
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('ab-cd 12', 'ABCD12'),
+    (' ABCD12 ', 'ABCD12'),
+    ('ab.cd.12', 'ABCD12'),
+    ('--', None),
+    (None, None),
+])
+def test_normalize_plate(value, expected):
+    assert normalize_plate(value) == expected
+
+
+def test_lookup_by_plate_is_single_query(client, auth_headers, seed, query_budget):
+    with query_budget(1):
+        response = client.get('/api/vehicles/plate/ab-cd 10', headers=auth_headers)
+
+    body = response.get_json()
+    assert body['data']['LicensePlate'] == 'ABCD10'
+    assert body['data']['ClientName'] == 'Cliente0 Prueba'
+    assert client.get('/api/vehicles/plate/ZZZZ99', headers=auth_headers).status_code == 404
+
+
+def test_create_rejects_differently_formatted_duplicate(client, auth_headers, seed):
+    response = client.post('/api/vehicles', headers=auth_headers, json={
+        'LicensePlate': 'abcd-10', 'ClientID': seed['clients'][0]
+    })
+
+    assert response.status_code == 400
+    assert 'patente' in response.get_json()['error']
+
+
+def test_bulk_insert_fills_normalized_plate(seed):
+    now = datetime.utcnow()
+    db.session.execute(Vehicle.__table__.insert(), [
+        {'LicensePlate': 'xy-zw 1', 'ClientID': seed['clients'][0], 'created_at': now, 'updated_at': now},
+        {'LicensePlate': 'xy-zw 2', 'ClientID': seed['clients'][0], 'created_at': now, 'updated_at': now},
+    ])
+    db.session.commit()
+
+    assert Vehicle.query.filter_by(PlateNormalized='XYZW2').one().LicensePlate == 'xy-zw 2'
+
+
+def test_backfill_reports_conflicts(seed):
+    # Filas creadas antes de la columna: sin valor normalizado
+    db.session.execute(update(Vehicle.__table__).values(PlateNormalized=None))
+    db.session.add(Vehicle(LicensePlate='abcd-11', ClientID=seed['clients'][0]))
+    db.session.commit()
+    duplicate = Vehicle.query.filter_by(LicensePlate='abcd-11').one()
+
+    updated, conflicts = backfill_normalized(Vehicle, 'LicensePlate', 'PlateNormalized', normalize_plate, batch_size=2)
+
+    assert updated == 2
+    assert conflicts == [(seed['vehicles'][1], 'ABCD11', 'ABCD11', duplicate.ID)]
+    assert Vehicle.query.filter(Vehicle.PlateNormalized.is_(None)).count() == 1
@@ -0,0 +1,108 @@
+"""
+Perfilado bajo demanda de una petición (solo Administrador)
+"""
+import marshal
+import pytest
+from app import db
+from app.models import Role, User
+from app.utils import profiling
+from app.utils.auth import create_user_token
+
+
+@pytest.fixture
+def admin_headers(seed):
+    role = Role.query.filter_by(Name='Administrador').one()
+    user = User(RUN='6-K', Email='admin@lubricentro.com', FirstName='Ada', LastName='Admin',
+                Password='hash-no-usado', RoleID=role.ID)
+    db.session.add(user)
+    db.session.commit()
+    return {'Authorization': f'Bearer {create_user_token(user)}'}
+
+
+def test_admin_request_is_profiled(client, admin_headers):
+    response = client.get('/api/clients', headers={**admin_headers, 'X-Profile': '1'})
+    assert response.status_code == 200
+    profile_id = response.headers['X-Profile-Id']
+
+    data = client.get(f'/api/profiles/{profile_id}', headers=admin_headers).get_json()['data']
+    assert data['path'] == '/api/clients'
+    assert data['status'] == 200
+    assert data['sql_statements'] == len(data['sql']) >= 1
+    assert any('FROM clients' in entry['statement'] for entry in data['sql'])
+    assert all(entry['start_ms'] >= 0 and entry['duration_ms'] >= 0 for entry in data['sql'])
+
+    # pstats: mismo formato que Profile.dump_stats
+    raw = client.get(f'/api/profiles/{profile_id}?format=pstats', headers=admin_headers).get_data()
+    functions = {name for (_, _, name) in marshal.loads(raw)}
+    assert 'get_clients' in functions
+
+    text = client.get(f'/api/profiles/{profile_id}?format=text', headers=admin_headers).get_data(as_text=True)
+    assert 'get_clients' in text
+
+    collapsed = client.get(f'/api/profiles/{profile_id}?format=collapsed', headers=admin_headers)
+    assert collapsed.status_code == 200 and collapsed.mimetype == 'text/plain'
+
+    listing = client.get('/api/profiles', headers=admin_headers).get_json()
+    assert listing['data'][0]['id'] == profile_id
+
+
+def test_query_flag_and_invalid_format(client, admin_headers):
+    response = client.get('/api/vehicles?profile=1', headers=admin_headers)
+    profile_id = response.headers['X-Profile-Id']
+    assert client.get(f'/api/profiles/{profile_id}?format=svg', headers=admin_headers).status_code == 400
+    assert client.get('/api/profiles/no-existe', headers=admin_headers).status_code == 404
+
+
+def test_batch_subrequests_are_not_profiled_separately(client, admin_headers):
+    requests = [{'method': 'GET', 'path': '/api/clients', 'headers': {'X-Profile': '1'}} for _ in range(2)]
+    requests.append({'method': 'GET', 'path': '/api/vehicles?profile=1'})
+    response = client.post('/api/batch', headers={**admin_headers, 'X-Profile': '1'}, json={'requests': requests})
+
+    assert response.status_code == 200
+    assert all('X-Profile-Id' not in sub['headers'] for sub in response.get_json()['responses'])
+    listing = client.get('/api/profiles', headers=admin_headers).get_json()['data']
+    assert [entry['id'] for entry in listing] == [response.headers['X-Profile-Id']]
+    assert listing[0]['path'] == '/api/batch'
+
+
+def test_non_admin_flag_is_ignored(client, auth_headers):
+    response = client.get('/api/clients', headers={**auth_headers, 'X-Profile': '1'})
+    assert response.status_code == 200
+    assert 'X-Profile-Id' not in response.headers
+    assert client.get('/api/profiles', headers=auth_headers).status_code == 403
+
+
+def test_no_profiler_without_flag(client, admin_headers, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError('RequestProfile sin el flag')
+
+    monkeypatch.setattr(profiling, 'RequestProfile', fail)
+    response = client.get('/api/clients', headers=admin_headers)
+    assert response.status_code == 200
+    assert 'X-Profile-Id' not in response.headers
+
+
+def test_listeners_are_removed_after_request(client, admin_headers):
+    listeners = len(db.engine.dispatch.before_cursor_execute), len(db.engine.dispatch.after_cursor_execute)
+    response = client.get('/api/clients', headers={**admin_headers, 'X-Profile': '1'})
+    assert 'X-Profile-Id' in response.headers
+    assert (len(db.engine.dispatch.before_cursor_execute), len(db.engine.dispatch.after_cursor_execute)) == listeners
+
+
+class TestProfilingDir:
+    @pytest.fixture
+    def app_config(self, tmp_path):
+        from tests.conftest import TestConfig
+
+        class Config(TestConfig):
+            __test__ = False
+            PROFILING_DIR = str(tmp_path)
+
+        return Config
+
+    def test_profiles_are_written_to_disk(self, client, admin_headers, tmp_path):
+        response = client.get('/api/users', headers={**admin_headers, 'X-Profile': '1'})
+        profile_id = response.headers['X-Profile-Id']
+        assert sorted(path.name for path in tmp_path.iterdir()) == [
+            f'{profile_id}.collapsed', f'{profile_id}.pstats', f'{profile_id}.sql.json'
+        ]
@@ -0,0 +1,78 @@
+"""
+Presupuestos de sentencias SQL para las rutas de listado y detalle
+"""
+import pytest
+from app import db
+from app.utils.query_budget import QueryBudgetExceeded, assert_max_queries, count_queries
+from app.models import WorkOrder
+from app.utils.auth import get_token_versions
+
+
+LIST_ROUTES = [
+    ('/api/roles', 1),
+    ('/api/clients', 1),
+    ('/api/users', 1),
+    ('/api/users/mechanics', 2),
+    ('/api/vehicles', 1),
+    ('/api/work-orders', 1),
+]
+
+DETAIL_ROUTES = [
+    ('/api/auth/me', None, 1),
+    ('/api/clients/{}', 'clients', 1),
+    ('/api/users/{}', 'users', 1),
+    ('/api/vehicles/{}', 'vehicles', 1),
+    ('/api/vehicles/client/{}', 'clients', 1),
+    ('/api/work-orders/{}', 'work_orders', 1),
+    ('/api/work-orders/vehicle/{}', 'vehicles', 1),
+    ('/api/work-orders/user/{}', 'users', 1),
+]
+
+
+@pytest.mark.parametrize('path, budget', LIST_ROUTES)
+def test_list_routes_query_budget(client, auth_headers, query_budget, path, budget):
+    with query_budget(budget):
+        response = client.get(path, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.get_json()['count'] > 0
+
+
+@pytest.mark.parametrize('path, key, budget', DETAIL_ROUTES)
+def test_detail_routes_query_budget(client, auth_headers, seed, query_budget, path, key, budget):
+    if key:
+        path = path.format(seed[key][0])
+    with query_budget(budget):
+        response = client.get(path, headers=auth_headers)
+    assert response.status_code == 200
+
+
+def test_token_version_check_is_cached(app, client, auth_headers):
+    # Caché vencida: una sola consulta extra por la versión del token
+    get_token_versions(app).clear()
+    with count_queries(db.engine) as recorder:
+        assert client.get('/api/clients', headers=auth_headers).status_code == 200
+    assert recorder.count == 2
+    assert 'FROM users' in recorder.statements[0]
+
+    with count_queries(db.engine) as recorder:
+        assert client.get('/api/clients', headers=auth_headers).status_code == 200
+    assert recorder.count == 1
+
+
+def test_budget_exceeded_reports_statements(app, seed):
+    with pytest.raises(QueryBudgetExceeded) as excinfo:
+        with assert_max_queries(db.engine, 1):
+            orders = WorkOrder.query.all()
+            for order in orders:
+                order.vehicle.LicensePlate
+
+    assert len(excinfo.value.statements) == 1 + len(seed['work_orders'])
+    assert 'FROM vehicles' in str(excinfo.value)
+
+
+def test_count_queries_records_statements(app, seed):
+    with count_queries(db.engine) as recorder:
+        WorkOrder.query.filter_by(ID=seed['work_orders'][0]).first()
+
+    assert recorder.count == 1
+    assert recorder.statements[0].startswith('SELECT')
@@ -0,0 +1,75 @@
+"""
+Modelo de lectura work_order_listings
+"""
+from sqlalchemy import update
+from app import db
+from app.models import Client, User, Vehicle, WorkOrder, WorkOrderListing
+from app.utils.read_model import check_listings, rebuild_listings
+
+
+def _listing(order_id):
+    db.session.expire_all()
+    return db.session.get(WorkOrderListing, order_id)
+
+
+def test_listing_follows_writes(seed):
+    order_id = seed['work_orders'][0]
+    order = db.session.get(WorkOrder, order_id)
+
+    listing = _listing(order_id)
+    assert listing.LicensePlate == 'ABCD10'
+    assert listing.ClientName == 'Cliente0 Prueba'
+    assert listing.TechnicianName == 'Mecánico0 Prueba'
+
+    order.Status = 'En Proceso'
+    db.session.get(Vehicle, order.VehicleID).LicensePlate = 'WXYZ99'
+    db.session.get(Client, seed['clients'][0]).FirstName = 'Juana'
+    db.session.get(User, order.UserID).LastName = 'Soto'
+    db.session.commit()
+
+    listing = _listing(order_id)
+    assert (listing.Status, listing.LicensePlate) == ('En Proceso', 'WXYZ99')
+    assert (listing.ClientName, listing.TechnicianName) == ('Juana Prueba', 'Mecánico0 Soto')
+
+    db.session.delete(db.session.get(WorkOrder, order_id))
+    db.session.commit()
+    assert _listing(order_id) is None
+
+
+def test_rollback_discards_listing_changes(seed):
+    order_id = seed['work_orders'][0]
+    db.session.get(WorkOrder, order_id).Status = 'Cancelada'
+    db.session.flush()
+    db.session.rollback()
+
+    assert _listing(order_id).Status == 'Pendiente'
+
+
+def test_list_routes_read_single_table(client, auth_headers, seed, query_budget):
+    vehicle_id = seed['vehicles'][1]
+
+    with query_budget(1):
+        body = client.get(f'/api/work-orders/vehicle/{vehicle_id}', headers=auth_headers).get_json()
+
+    assert [row['LicensePlate'] for row in body['data']] == ['ABCD11']
+    assert body['data'][0]['ClientName'] == 'Cliente1 Prueba'
+
+    body = client.get('/api/work-orders?from=2024-10-02', headers=auth_headers).get_json()
+    assert [row['ID'] for row in body['data']] == seed['work_orders'][1:]
+
+
+def test_check_and_rebuild(seed):
+    assert check_listings(db.session)['counts'] == {'missing': 0, 'orphaned': 0, 'stale': 0}
+
+    first, second, third = seed['work_orders']
+    # Escrituras con SQL directo no pasan por el flush del ORM
+    db.session.execute(update(WorkOrder.__table__).where(WorkOrder.ID == first).values(Status='Lista'))
+    db.session.execute(WorkOrderListing.__table__.delete().where(WorkOrderListing.ID == second))
+    db.session.commit()
+
+    report = check_listings(db.session)
+    assert report['counts'] == {'missing': 1, 'orphaned': 0, 'stale': 1}
+    assert (report['missing'], report['stale']) == ([second], [first])
+
+    assert rebuild_listings(db.session, batch_size=2) == 3
+    assert check_listings(db.session)['counts'] == {'missing': 0, 'orphaned': 0, 'stale': 0}
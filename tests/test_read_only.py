@@ -0,0 +1,116 @@
+"""
+Modo de solo lectura de las rutas GET
+"""
+from types import SimpleNamespace
+import pytest
+from flask_sqlalchemy.session import Session
+from sqlalchemy import delete, event, func, select
+from app import db
+from app.models import Client, Role
+from app.utils.read_only import AUTOCOMMIT, READ_ONLY, ReadOnlyRequestError, _set_transaction_read_only
+from tests.conftest import TestConfig
+
+
+class AutocommitConfig(TestConfig):
+    __test__ = False
+    READ_ONLY_GET_MODE = 'autocommit'
+
+
+@pytest.fixture
+def session_states():
+    """Modo, autoflush y aislamiento de la sesión en cada consulta del ORM"""
+    states = []
+
+    def record(orm_execute_state):
+        session = orm_execute_state.session
+        states.append((session.info.get('read_only'), session.autoflush,
+                       session.connection().get_execution_options().get('isolation_level')))
+
+    event.listen(Session, 'do_orm_execute', record)
+    yield states
+    event.remove(Session, 'do_orm_execute', record)
+
+
+def test_get_routes_run_read_only(client, auth_headers, session_states):
+    db.session.commit()
+    assert client.get('/api/clients', headers=auth_headers).status_code == 200
+    assert session_states and all(mode == READ_ONLY and not autoflush for mode, autoflush, _ in session_states)
+
+    # Al terminar la petición la sesión vuelve a su configuración
+    session = db.session()
+    assert session.autoflush and session.expire_on_commit and 'read_only' not in session.info
+
+
+def test_writes_keep_read_write_session(client, auth_headers, session_states):
+    response = client.post('/api/clients', headers=auth_headers,
+                           json={'RUN': '5-1', 'FirstName': 'Nuevo', 'LastName': 'Cliente'})
+    assert response.status_code == 201
+    assert all(mode is None for mode, _, _ in session_states)
+
+
+def test_get_route_marked_read_write_can_commit(client, seed):
+    response = client.get('/api/init-data')
+    assert response.status_code == 200
+    assert response.get_json()['user_created'] is True
+
+
+def test_flush_is_rejected_in_read_only_session(app, seed):
+    session = db.session()
+    session.info['read_only'] = READ_ONLY
+    try:
+        session.add(Client(RUN='5-1', FirstName='No', LastName='Guardado'))
+        with pytest.raises(ReadOnlyRequestError):
+            session.flush()
+    finally:
+        session.info.pop('read_only')
+        session.rollback()
+
+
+def test_core_dml_is_rejected_in_read_only_session(app, seed):
+    session = db.session()
+    session.info['read_only'] = READ_ONLY
+    try:
+        with pytest.raises(ReadOnlyRequestError):
+            session.execute(delete(Client).where(Client.ID == seed['clients'][0]))
+        # Las lecturas siguen permitidas
+        assert session.scalar(select(func.count()).select_from(Client)) == 3
+    finally:
+        session.info.pop('read_only')
+        session.rollback()
+
+
+def test_job_status_route_can_clean_up(client, auth_headers):
+    # GET /api/jobs/<id> limpia trabajos vencidos (DELETE/UPDATE sobre ``jobs``)
+    response = client.get('/api/jobs/999', headers=auth_headers)
+    assert response.status_code == 404
+
+
+def test_postgres_transactions_start_read_only():
+    statements = []
+    connection = SimpleNamespace(dialect=SimpleNamespace(name='postgresql'), exec_driver_sql=statements.append)
+    _set_transaction_read_only(SimpleNamespace(info={'read_only': READ_ONLY}), None, connection)
+    _set_transaction_read_only(SimpleNamespace(info={}), None, connection)
+    assert statements == ['SET TRANSACTION READ ONLY']
+
+
+def test_roles_are_plain_rows(client, auth_headers):
+    data = client.get('/api/roles', headers=auth_headers).get_json()['data']
+    assert data == [{'ID': role.ID, 'Name': role.Name} for role in Role.query.order_by(Role.ID)]
+
+
+class TestAutocommit:
+    @pytest.fixture
+    def app_config(self):
+        return AutocommitConfig
+
+    def test_get_routes_use_autocommit_connection(self, client, auth_headers, session_states):
+        db.session.commit()
+        assert client.get('/api/vehicles', headers=auth_headers).status_code == 200
+        assert session_states
+        assert all(mode == AUTOCOMMIT and level == 'AUTOCOMMIT' for mode, _, level in session_states)
+
+        # La conexión vuelve al pool con su aislamiento normal
+        assert db.session.connection().get_execution_options().get('isolation_level') is None
+        response = client.post('/api/clients', headers=auth_headers,
+                               json={'RUN': '5-1', 'FirstName': 'Nuevo', 'LastName': 'Cliente'})
+        assert response.status_code == 201
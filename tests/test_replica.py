@@ -0,0 +1,82 @@
+"""
+Enrutamiento de lecturas a la réplica con dos archivos SQLite
+"""
+from datetime import datetime
+import pytest
+from app import db
+from app.models import Client
+from app.utils import replica
+from tests.conftest import TestConfig
+
+
+@pytest.fixture
+def app_config(tmp_path):
+    class ReplicaConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + str(tmp_path / 'primary.db')
+        SQLALCHEMY_BINDS = {'replica': 'sqlite:///' + str(tmp_path / 'replica.db')}
+    return ReplicaConfig
+
+
+@pytest.fixture(autouse=True)
+def replica_db(app, seed, monkeypatch):
+    monkeypatch.setitem(replica._lag_cache, 'checked_at', None)
+    monkeypatch.setattr(replica, '_recent_writers', {})
+
+    # La réplica solo tiene un cliente, distinto de los del primario
+    engine = db.engines['replica']
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(Client.__table__.insert(), {
+            'RUN': '99999999-9', 'FirstName': 'Solo', 'LastName': 'Replica',
+            'created_at': datetime.utcnow(), 'updated_at': datetime.utcnow()
+        })
+    # Sesión nueva, como al inicio de una petición real
+    db.session.remove()
+    yield
+    db.metadata.drop_all(engine)
+
+
+def _client_names(response):
+    return [c['FirstName'] for c in response.get_json()['data']]
+
+
+def test_get_reads_from_replica(client, auth_headers):
+    response = client.get('/api/clients', headers=auth_headers)
+
+    assert _client_names(response) == ['Solo']
+
+
+def test_override_header_reads_from_primary(client, auth_headers):
+    headers = {**auth_headers, 'X-DB-Target': 'primary'}
+    response = client.get('/api/clients', headers=headers)
+
+    assert response.get_json()['count'] == 3
+
+
+def test_write_goes_to_primary_and_sticks(client, auth_headers):
+    response = client.post('/api/clients', headers=auth_headers, json={
+        'RUN': '44444444-4', 'FirstName': 'Nuevo', 'LastName': 'Cliente'
+    })
+    assert response.status_code == 201
+
+    with db.engines['replica'].connect() as conn:
+        assert conn.execute(db.select(db.func.count()).select_from(Client.__table__)).scalar() == 1
+
+    # El mismo usuario lee sus propias escrituras desde el primario
+    response = client.get('/api/clients', headers=auth_headers)
+    assert 'Nuevo' in _client_names(response)
+
+
+def test_lagging_replica_falls_back_to_primary(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(replica, 'replica_lag_seconds', lambda engine: 60.0)
+
+    response = client.get('/api/clients', headers=auth_headers)
+
+    assert response.get_json()['count'] == 3
+
+
+def test_use_primary_route(client, auth_headers):
+    # El usuario autenticado solo existe en el primario
+    response = client.get('/api/auth/me', headers=auth_headers)
+
+    assert response.status_code == 200
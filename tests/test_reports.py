@@ -0,0 +1,96 @@
+"""
+Reportes mensuales de órdenes en CSV y XLSX
+"""
+import csv
+import io
+import tracemalloc
+import zipfile
+from datetime import date
+from xml.etree import ElementTree
+import pytest
+from app import db
+from app.models import WorkOrder
+from app.utils.spreadsheet import iter_csv, iter_xlsx
+
+NS = {'x': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+
+
+@pytest.fixture
+def year_of_orders(seed):
+    vehicles, users = seed['vehicles'], seed['users']
+    statuses = ['Pendiente', 'En Proceso', 'Completada']
+    db.session.add_all([
+        WorkOrder(
+            OrderDate=date(2023, 1 + i % 12, 1 + i % 28),
+            Status=statuses[(i // 12) % 3],
+            VehicleID=vehicles[i % 3],
+            UserID=users[(i // 12) % 2]
+        )
+        for i in range(600)
+    ])
+    db.session.commit()
+
+
+def _csv_rows(response):
+    text = response.get_data(as_text=True)
+    assert text.startswith('﻿')
+    return list(csv.DictReader(io.StringIO(text[1:])))
+
+
+def test_status_report_csv(client, auth_headers, year_of_orders):
+    response = client.get('/api/reports/work-orders/by-status?from=2023-01&to=2023-12', headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    assert 'ordenes_by_status_2023-01_2023-12.csv' in response.headers['Content-Disposition']
+
+    rows = _csv_rows(response)
+    assert len(rows) == 36
+    assert rows[0] == {'Month': '2023-01', 'Status': 'Completada', 'Orders': '16'}
+    assert sum(int(row['Orders']) for row in rows) == 600
+
+
+def test_mechanic_report_xlsx(client, auth_headers, seed, year_of_orders):
+    response = client.get('/api/reports/work-orders/by-mechanic?from=2023-03&format=xlsx', headers=auth_headers)
+
+    assert response.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(response.get_data())) as workbook:
+        sheet = ElementTree.fromstring(workbook.read('xl/worksheets/sheet1.xml'))
+
+    rows = [[cell.findtext('.//x:t', namespaces=NS) or cell.findtext('x:v', namespaces=NS)
+             for cell in row.findall('x:c', NS)] for row in sheet.findall('.//x:row', NS)]
+    assert rows[0] == ['Month', 'UserID', 'TechnicianName', 'Orders']
+    assert rows[1:] == [
+        ['2023-03', str(seed['users'][0]), 'Mecánico0 Prueba', '25'],
+        ['2023-03', str(seed['users'][1]), 'Mecánico1 Prueba', '25'],
+    ]
+
+
+def test_brand_report_defaults_to_one_month(client, auth_headers, year_of_orders):
+    response = client.get('/api/reports/work-orders/by-brand?from=2024-10', headers=auth_headers)
+
+    assert _csv_rows(response) == [{'Month': '2024-10', 'Brand': 'Toyota', 'Orders': '3'}]
+
+
+def test_invalid_report_requests(client, auth_headers):
+    path = '/api/reports/work-orders'
+    assert client.get(f'{path}/by-color', headers=auth_headers).status_code == 404
+    assert client.get(f'{path}/by-status?format=pdf', headers=auth_headers).status_code == 400
+    assert client.get(f'{path}/by-status?from=2024-13', headers=auth_headers).status_code == 400
+    assert client.get(f'{path}/by-status?from=2024-05&to=2024-01', headers=auth_headers).status_code == 400
+
+
+@pytest.mark.parametrize('write', [iter_csv, iter_xlsx])
+def test_writers_stream_with_flat_memory(write):
+    rows = ((i, f'Mecánico {i % 50}', 'Completada', date(2024, 1 + i % 12, 1)) for i in range(50000))
+
+    tracemalloc.start()
+    chunks = 0
+    for chunk in write(['ID', 'TechnicianName', 'Status', 'OrderDate'], rows):
+        chunks += 1
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    assert chunks > 2
+    # En memoria solo hay un bloque a la vez, no el archivo completo
+    assert peak < 1024 * 1024
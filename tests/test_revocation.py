@@ -0,0 +1,111 @@
+"""
+Revocación de tokens: logout, filtro de Bloom y conjunto exacto
+"""
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from flask_jwt_extended import create_access_token, decode_token
+from app import db
+from app.models import Role, RevokedToken, User
+from app.utils.auth import create_user_token
+from app.utils.revocation import BloomFilter, get_revocations
+
+
+@pytest.fixture
+def revocations(app):
+    revocations = get_revocations(app)
+    revocations.refresh_seconds = 3600
+    return revocations
+
+
+def _headers(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def _revoke_elsewhere(jti, expires_at=None):
+    """Revocación escrita por otro worker: no pasa por este proceso"""
+    now = datetime.utcnow()
+    db.session.execute(RevokedToken.__table__.insert(), {
+        'Jti': jti, 'ExpiresAt': expires_at or now + timedelta(hours=1), 'created_at': now
+    })
+    db.session.commit()
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(10000, 0.001)
+    values = [str(uuid.uuid4()) for _ in range(10000)]
+    for value in values:
+        bloom.add(value)
+
+    assert all(value in bloom for value in values)
+    false_positives = sum(str(uuid.uuid4()) in bloom for _ in range(10000))
+    assert false_positives < 50
+
+
+def test_logout_revokes_only_current_token(client, seed, revocations):
+    token = create_access_token(identity=str(seed['users'][0]))
+    other = create_access_token(identity=str(seed['users'][0]))
+
+    assert client.post('/api/auth/logout', headers=_headers(token)).status_code == 200
+
+    response = client.get('/api/clients', headers=_headers(token))
+    assert response.status_code == 401
+    assert 'revocado' in response.get_json()['error']
+    assert client.get('/api/clients', headers=_headers(other)).status_code == 200
+    assert RevokedToken.query.one().UserID == seed['users'][0]
+
+
+def test_not_revoked_check_does_not_query_database(client, auth_headers, revocations, query_budget):
+    _revoke_elsewhere('otro-jti')
+    revocations.refresh()
+
+    with query_budget(1):
+        assert client.get('/api/clients', headers=auth_headers).status_code == 200
+    assert revocations.database_checks == 0
+
+
+def test_revocations_from_other_processes_apply_on_refresh(client, seed, revocations):
+    token = create_access_token(identity=str(seed['users'][0]))
+    _revoke_elsewhere(decode_token(token)['jti'])
+
+    # Aún no leída por este proceso
+    assert client.get('/api/clients', headers=_headers(token)).status_code == 200
+
+    revocations.refresh()
+
+    assert client.get('/api/clients', headers=_headers(token)).status_code == 401
+
+
+def test_bloom_hit_outside_exact_set_checks_database(app, revocations):
+    revocations.exact_max = 0
+    _revoke_elsewhere('revocado')
+    revocations.rebuild()
+
+    assert revocations.is_revoked('revocado') is True
+    assert revocations.database_checks == 1
+
+
+def test_rebuild_drops_expired_tokens(revocations):
+    _revoke_elsewhere('vencido', expires_at=datetime.utcnow() - timedelta(minutes=1))
+    _revoke_elsewhere('vigente')
+
+    revocations.rebuild()
+
+    assert revocations.exact == {'vigente'}
+
+
+def test_admin_can_revoke_all_tokens_of_a_user(client, seed):
+    admin_role = Role.query.filter_by(Name='Administrador').one()
+    admin = User(RUN='6-K', Email='admin@lubricentro.com', FirstName='Ada', LastName='Admin',
+                 Password='x', RoleID=admin_role.ID)
+    db.session.add(admin)
+    db.session.commit()
+    mechanic = db.session.get(User, seed['users'][0])
+    mechanic_headers = _headers(create_user_token(mechanic))
+
+    forbidden = client.post(f'/api/users/{admin.ID}/revoke-tokens', headers=mechanic_headers)
+    assert forbidden.status_code == 403
+
+    response = client.post(f'/api/users/{mechanic.ID}/revoke-tokens', headers=_headers(create_user_token(admin)))
+    assert response.status_code == 200
+    assert client.get('/api/clients', headers=mechanic_headers).status_code == 401
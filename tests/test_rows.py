@@ -0,0 +1,48 @@
+"""
+Filas livianas de los listados: mismo JSON que las instancias del ORM
+"""
+import pytest
+from sqlalchemy.orm import joinedload
+from app import db
+from app.models import Client, User, Vehicle, WorkOrderListing
+from app.utils.rows import CLIENT_ROWS, USER_ROWS, VEHICLE_ROWS, WORK_ORDER_LISTING_ROWS
+from app.utils.serializers import client_to_dict, user_to_dict, vehicle_to_dict, work_order_listing_to_dict
+
+
+CASES = [
+    (CLIENT_ROWS, lambda: Client.query, client_to_dict),
+    (USER_ROWS, lambda: User.query, user_to_dict),
+    (VEHICLE_ROWS, lambda: Vehicle.query.options(joinedload(Vehicle.client)), vehicle_to_dict),
+    (WORK_ORDER_LISTING_ROWS, lambda: WorkOrderListing.query, work_order_listing_to_dict),
+]
+
+
+@pytest.mark.parametrize('rows, query, serialize', CASES)
+def test_rows_serialize_like_orm_instances(seed, rows, query, serialize):
+    model = rows.model
+    expected = [serialize(obj) for obj in query().order_by(model.ID)]
+    db.session.expunge_all()
+
+    loaded = rows.load(rows.select().order_by(model.ID))
+    assert [serialize(row) for row in loaded] == expected
+    # Sin instancias en el mapa de identidad ni __dict__ por fila
+    assert len(db.session.identity_map) == 0
+    assert not hasattr(loaded[0], '__dict__')
+
+
+def test_list_routes_match_orm_contract(client, auth_headers, seed):
+    body = client.get('/api/vehicles', headers=auth_headers).get_json()
+    expected = [vehicle_to_dict(vehicle) for vehicle in
+                Vehicle.query.options(joinedload(Vehicle.client)).order_by(Vehicle.ID)]
+    assert body['data'] == expected
+
+    body = client.get('/api/users/mechanics', headers=auth_headers).get_json()
+    assert [row['ID'] for row in body['data']] == seed['users']
+    assert all(row['RoleName'] == 'Mecánico' for row in body['data'])
+
+
+def test_vehicle_row_criteria_and_client(seed):
+    client_id = seed['clients'][1]
+    (row,) = VEHICLE_ROWS.load(VEHICLE_ROWS.select(Vehicle.ClientID == client_id))
+    assert row.client.FirstName == 'Cliente1'
+    assert vehicle_to_dict(row)['ClientName'] == 'Cliente1 Prueba'
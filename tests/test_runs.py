@@ -0,0 +1,114 @@
+"""
+RUT normalizado: validación, búsqueda, duplicados, login y migración
+"""
+from datetime import datetime
+import pytest
+from sqlalchemy import update
+from werkzeug.security import generate_password_hash
+from app import db
+from app.models import Client, User
+from app.utils.normalize import is_valid_run, normalize_run
+from migrations.backfill import backfill_normalized
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('12.345.678-5', '12345678-5'),
+    ('12345678k', '12345678-K'),
+    (' 6-k ', '6-K'),
+    ('012.345.678-5', '12345678-5'),
+    ('12.345.678-X', None),
+    ('abc-1', None),
+    (None, None),
+])
+def test_normalize_run(value, expected):
+    assert normalize_run(value) == expected
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('12.345.678-5', True),
+    ('6-K', True),
+    ('11111111-1', True),
+    ('12345678-9', False),
+    ('0-0', False),
+    ('no-es-rut', False),
+])
+def test_is_valid_run(value, expected):
+    assert is_valid_run(value) is expected
+
+
+def test_lookup_by_run_is_single_query(client, auth_headers, seed, query_budget):
+    with query_budget(1):
+        response = client.get('/api/clients/run/22.222.221-1', headers=auth_headers)
+
+    assert response.get_json()['data']['FirstName'] == 'Cliente1'
+    assert client.get('/api/clients/run/99999999-9', headers=auth_headers).status_code == 404
+
+
+def test_create_client_validates_check_digit_and_duplicates(client, auth_headers, seed):
+    invalid = client.post('/api/clients', headers=auth_headers, json={
+        'RUN': '12345678-9', 'FirstName': 'Dígito', 'LastName': 'Malo'
+    })
+    assert invalid.status_code == 400
+    assert invalid.get_json()['error'] == 'RUN inválido'
+
+    created = client.post('/api/clients', headers=auth_headers, json={
+        'RUN': '12.345.678-5', 'FirstName': 'Nuevo', 'LastName': 'Cliente'
+    })
+    assert created.status_code == 201
+
+    duplicate = client.post('/api/clients', headers=auth_headers, json={
+        'RUN': '012345678-5', 'FirstName': 'Otro', 'LastName': 'Cliente'
+    })
+    assert duplicate.status_code == 400
+    assert 'Ya existe' in duplicate.get_json()['error']
+
+
+def test_login_accepts_any_run_format(client, seed):
+    db.session.add(User(
+        RUN='6-K', Email='k@lubricentro.com', FirstName='Con', LastName='K',
+        Password=generate_password_hash('clave'), RoleID=1
+    ))
+    db.session.commit()
+
+    response = client.post('/api/auth/login', json={'rut': '0.000.006k', 'password': 'clave'})
+
+    assert response.status_code == 200
+    assert response.get_json()['success'] is True
+
+
+def test_login_with_run_that_does_not_normalize(client, seed):
+    # RUN sin forma de RUT: RunNormalized queda vacío (normalize_runs.py lo informa)
+    db.session.add(User(
+        RUN='EXT-42', Email='ext@lubricentro.com', FirstName='Sin', LastName='Rut',
+        Password=generate_password_hash('clave'), RoleID=1
+    ))
+    db.session.commit()
+    assert User.query.filter_by(RUN='EXT-42').one().RunNormalized is None
+
+    response = client.post('/api/auth/login', json={'rut': 'EXT-42', 'password': 'clave'})
+    assert response.status_code == 200
+    assert client.post('/api/auth/login', json={'rut': 'EXT-43', 'password': 'clave'}).status_code == 401
+
+
+def test_bulk_insert_fills_normalized_run(seed):
+    now = datetime.utcnow()
+    db.session.execute(Client.__table__.insert(), [
+        {'RUN': '10.000.000-8', 'FirstName': 'Masivo', 'LastName': 'Uno', 'created_at': now, 'updated_at': now},
+    ])
+    db.session.commit()
+
+    assert Client.query.filter_by(RunNormalized='10000000-8').one().FirstName == 'Masivo'
+
+
+def test_backfill_reports_conflicts(seed):
+    # Filas creadas antes de la columna: sin valor normalizado
+    db.session.execute(update(Client.__table__).values(RunNormalized=None))
+    db.session.add(Client(RUN='22.222.221-1', FirstName='Repetido', LastName='Prueba'))
+    db.session.commit()
+    duplicate = Client.query.filter_by(RUN='22.222.221-1').one()
+
+    updated, conflicts = backfill_normalized(Client, 'RUN', 'RunNormalized', normalize_run, batch_size=2)
+
+    assert updated == 2
+    assert conflicts == [(seed['clients'][1], '22222221-1', '22222221-1', duplicate.ID)]
+    assert Client.query.filter(Client.RunNormalized.is_(None)).count() == 1
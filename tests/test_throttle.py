@@ -0,0 +1,143 @@
+"""
+Límite de intentos de login por RUT y por IP
+"""
+import pytest
+from werkzeug.security import generate_password_hash
+from app import db
+from app.models import Role, User
+from app.utils.throttle import LocalThrottleStore, ThrottleStore
+from tests.conftest import TestConfig
+
+
+class ThrottleConfig(TestConfig):
+    __test__ = False
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
+    LOGIN_THROTTLE_RUN_LIMIT = 3
+    LOGIN_THROTTLE_IP_LIMIT = 5
+
+
+@pytest.fixture
+def app_config():
+    return ThrottleConfig
+
+
+@pytest.fixture
+def user(seed):
+    role = Role.query.filter_by(Name='Mecánico').one()
+    user = User(RUN='6-K', Email='ana@lubricentro.com', FirstName='Ana', LastName='Prueba',
+                Password=generate_password_hash('clave', 'pbkdf2:sha256:1000'), RoleID=role.ID)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def _login(client, rut='6-K', password='otra', ip='10.0.0.1'):
+    return client.post('/api/auth/login', json={'rut': rut, 'password': password},
+                       environ_base={'REMOTE_ADDR': ip})
+
+
+def test_sliding_window_limits_and_expires():
+    store = LocalThrottleStore(window_seconds=10)
+    keys = [('run:1-9', 3)]
+    assert [store.attempt(keys, now=t) for t in (0, 1, 2)] == [0, 0, 0]
+    assert store.attempt(keys, now=3) > 0
+
+    # En la ventana siguiente los 3 intentos anteriores pesan 3 * (1 - 5/10) = 1.5
+    assert store.attempt(keys, now=15) == 0
+    assert store.attempt(keys, now=15) == 0
+    assert store.attempt(keys, now=15) > 0
+    assert store.attempt(keys, now=19) == 0
+
+    # Tras dos ventanas sin intentos la clave se descarta
+    store.attempt([('run:2-7', 3)], now=40)
+    assert len(store) == 1
+
+
+def test_rejected_attempt_is_not_counted_on_other_keys():
+    store = LocalThrottleStore(window_seconds=10)
+    store.attempt([('ip:a', 1)], now=0)
+    assert store.attempt([('ip:a', 1), ('run:1-9', 1)], now=1) > 0
+    assert store.attempt([('ip:b', 1), ('run:1-9', 1)], now=1) == 0
+
+
+def test_max_keys_evicts_oldest():
+    store = LocalThrottleStore(window_seconds=10, max_keys=2)
+    for i, key in enumerate(('ip:a', 'ip:b', 'ip:c')):
+        store.attempt([(key, 1)], now=i)
+    assert len(store) == 2
+    assert store.attempt([('ip:a', 1)], now=3) == 0
+
+
+def test_login_rejected_per_run_before_database(app, client, user, query_budget):
+    for _ in range(3):
+        assert _login(client, rut='6-k').status_code == 401
+
+    # Mismo RUT con otro formato y otra IP: se rechaza sin consultas
+    with query_budget(0):
+        response = _login(client, rut='6-K', ip='10.0.0.2')
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+
+    # Otro RUT desde la misma IP sigue permitido
+    assert _login(client, rut='7-8').status_code == 401
+
+
+def test_login_rejected_per_ip(client, user):
+    for i in range(5):
+        assert _login(client, rut=f'{i + 1}-9').status_code == 401
+    assert _login(client, rut='6-K', password='clave').status_code == 429
+    assert _login(client, rut='6-K', password='clave', ip='10.0.0.9').status_code == 200
+
+
+def test_successful_login_resets_run_window(client, user):
+    for _ in range(2):
+        assert _login(client).status_code == 401
+    assert _login(client, password='clave').status_code == 200
+    for _ in range(3):
+        assert _login(client, ip='10.0.0.2').status_code == 401
+    assert _login(client, ip='10.0.0.2').status_code == 429
+
+
+def test_successful_logins_do_not_fill_ip_window(client, user):
+    # Mismo NAT: muchos más logins exitosos que LOGIN_THROTTLE_IP_LIMIT
+    for _ in range(12):
+        assert _login(client, password='clave').status_code == 200
+
+    # Los intentos fallidos de esa IP siguen limitados
+    for i in range(5):
+        assert _login(client, rut=f'{i + 1}-9').status_code == 401
+    assert _login(client, password='clave').status_code == 429
+
+
+def test_refund_discounts_one_attempt():
+    store = LocalThrottleStore(window_seconds=10)
+    keys = [('ip:a', 2)]
+    assert store.attempt(keys, now=0) == 0
+    assert store.attempt(keys, now=1) == 0
+    assert store.attempt(keys, now=2) > 0
+
+    store.refund('ip:a', now=2)
+    assert store.attempt(keys, now=2) == 0
+    assert store.attempt(keys, now=2) > 0
+    store.refund('ip:b', now=2)
+
+
+def test_batch_logins_count_against_caller_ip(client, user, auth_headers):
+    requests = [{'method': 'POST', 'path': '/api/auth/login', 'body': {'rut': f'{i + 1}-9', 'password': 'x'}}
+                for i in range(5)]
+    body = client.post('/api/batch', headers=auth_headers, json={'requests': requests},
+                       environ_base={'REMOTE_ADDR': '10.0.0.3'}).get_json()
+    assert [response['status'] for response in body['responses']] == [401] * 5
+
+    assert _login(client, password='clave', ip='10.0.0.3').status_code == 429
+    # Otra IP no queda bloqueada por los logins del batch
+    assert _login(client, password='clave', ip='10.0.0.4').status_code == 200
+
+
+def test_incomplete_store_fails_at_construction():
+    class AttemptOnly(ThrottleStore):
+        def attempt(self, keys, now=None):
+            return 0
+
+    with pytest.raises(TypeError):
+        AttemptOnly()